@@ -1,54 +1,23 @@
 # ==== Playwright 브라우저 부트스트랩 (Cloud 안전모드) ====
-import os, sys, subprocess, pathlib
-
-# 브라우저 캐시 경로 고정
-BROWSERS_DIR = os.environ.get("PLAYWRIGHT_BROWSERS_PATH") or "/home/appuser/.cache/ms-playwright"
-os.environ["PLAYWRIGHT_BROWSERS_PATH"] = BROWSERS_DIR
-
-def _chromium_missing() -> bool:
-    p = pathlib.Path(BROWSERS_DIR)
-    if not p.exists():
-        return True
-    patterns = [
-        "**/chromium-*/chrome-linux/headless_shell",
-        "**/chromium-*/chrome-linux/chrome",
-        "**/chrome-linux/headless_shell",
-        "**/chrome-linux/chrome",
-    ]
-    for pat in patterns:
-        if list(p.glob(pat)):
-            return False
-    return True
-
-def _ensure_playwright_chromium():
-    try:
-        if _chromium_missing() or os.environ.get("FORCE_PW_INSTALL") == "1":
-            subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=True)
-    except Exception as e:
-        try:
-            subprocess.run([sys.executable, "-m", "playwright", "install"], check=True)
-        except Exception as e2:
-            raise RuntimeError(f"Playwright 브라우저 설치 실패: {e} / {e2}")
-
-_ensure_playwright_chromium()
-PLAYWRIGHT_LAUNCH_KW = {"headless": True, "args": ["--no-sandbox", "--disable-dev-shm-usage"]}
+# 프로세스당 1번 확인 (+ BROWSERS_DIR 의 playwright 버전 스탬프) — rerun 마다 파일 스캔/설치 확인 없음
+import pw_bootstrap
+pw_bootstrap.ensure_chromium()
+PLAYWRIGHT_LAUNCH_KW = pw_bootstrap.LAUNCH_KW
 # ==== /부트스트랩 끝 ====
 
 
 # app.py — Streamlit + Playwright (UK ↔ SG)
-# Network-first + DOM fallback + deep JSON (__NEXT_DATA__/window)
-# GraphQL sniffing + PDP 폴백 + 재시도/타임아웃/리소스차단
-# CTA(Button/Text, Rounded/Squared) 판정 + Compare 위치(Top/Middle/Bottom × Left/Center/Right)
+# 수집/판정/매칭은 plp_engine (Streamlit 없이 import 가능) — 여기는 위젯 → FetchOptions, 실행은 jobs 백그라운드 작업 + 진행 현황 표시
 
 import sys, asyncio
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-import re, time, json
-import pandas as pd
+import os, json
 import streamlit as st
-from urllib.parse import urlparse
-from playwright.sync_api import sync_playwright
+from browser_pool import BrowserPool
+import result_cache, har_replay, jobs
+from plp_engine import PlpEngine, FetchOptions, VIEWPORTS, match_rows
 
 # ========================= UI =========================
 st.set_page_config(page_title="PLP 카드 비교 (UK ↔ SG)", layout="wide")
@@ -64,10 +33,16 @@ with st.sidebar:
     st.markdown("### 실행 옵션")
     fast_mode  = st.toggle("⚡ Fast Mode (이미지/폰트/애널리틱스 차단)", value=False)
     debug_log  = st.toggle("🐞 Debug 로그", value=True)
-    viewport_choice = st.selectbox("뷰포트", ["desktop 1440x900", "desktop 1280x900", "mobile 390x844"], index=0)
+    keep_raw_json = st.checkbox("🧾 원본 JSON 보관 (디버그용, 메모리 사용 증가)", value=False)
+    capture_mb = st.number_input("JSON 캡처 메모리 상한(MB/페이지)", min_value=8, max_value=512, value=64, step=8)
+    viewport_choice = st.selectbox("뷰포트", VIEWPORTS, index=0)
     take_screens = st.checkbox("카드 스크린샷 저장", value=False)
     timeout_sec = st.number_input("⏱ 페이지 대기 시간(초)", min_value=5, max_value=60, value=30, step=1)
     retries     = st.slider("🔄 재시도 횟수", min_value=0, max_value=3, value=1)
+    api_direct  = st.toggle("🛰 API 직접 수집 (학습된 엔드포인트, 실패 시 브라우저)", value=False)
+    force_refresh = st.checkbox("🔁 강제 새로고침 (결과 캐시 무시)", value=False)
+    har_mode = st.selectbox("🎞 HAR 모드", list(har_replay.MODES), index=0,
+                            help="record: outputs/har 에 네트워크 번들 저장 / replay: 번들로만 재실행 (네트워크·캐시·API 직접 호출 없음)")
 
 col1, col2 = st.columns(2)
 with col1:
@@ -85,746 +60,108 @@ try:
 except Exception:
     pass
 
-run_btn = st.button("실행 (Network-first)", key="run_main")
-
-# ========================= 공통 상수/유틸 =========================
-MODEL_PATTERNS = [
-    r"(?:OLED|QNED|NANO)\d{2,3}[A-Z0-9]+(?:[.\-][A-Z0-9]+)*",
-    r"[LU][A-Z]{1,2}\d{2,3}[A-Z0-9]{1,4}",
-    r"\b[A-Z]{2,}\d{2,}\b"
-]
-UNKNOWN = "Unknown"
-UNSET = object()
-
-PRODUCT_ALLOW = ("/api/","/v1/","/v2/","/graphql","/search","/catalog","/commerce",
-                 "/product","/plp","/listing","/lgecom","/pim","/sku","/model","/category")
-ANALYTICS_BLOCK = ("mpulse.net","onetrust.com","omtrdc.net","adobedtm.com",
-                   "googletagmanager.com","google-analytics.com","hotjar.com","doubleclick.net")
-
-PRIMARY_BTN_RE   = re.compile(r"\b(c-button--primary|c-btn--primary)\b", re.I)
-SECONDARY_BTN_RE = re.compile(r"\b(c-button--secondary|c-btn--secondary)\b", re.I)
-
-def _is_blocked_analytics(url: str) -> bool:
-    return any(d in url.lower() for d in ANALYTICS_BLOCK)
-
-def _looks_like_product_api(url: str) -> bool:
-    return any(k in url.lower() for k in PRODUCT_ALLOW)
-
-def _guess_market_and_lang(url: str):
-    try:
-        parsed = urlparse(url)
-        host = (parsed.hostname or "").lower()
-        path = (parsed.path or "").strip("/")
-        first = (path.split("/", 1)[0] if path else "").lower()
-        market = first if len(first) in (2,3) else ""
-        if not market:
-            if host.endswith(".sg"): market="sg"
-            elif host.endswith(".uk") or host.endswith(".co.uk"): market="uk"
-            elif host.endswith(".de"): market="de"
-            elif host.endswith(".fr"): market="fr"
-            elif host.endswith(".it"): market="it"
-            elif host.endswith(".es"): market="es"
-        market = market or "uk"
-        lang = {
-            "uk":"en-GB,en;q=0.8","sg":"en-SG,en;q=0.8","de":"de-DE,de;q=0.9,en;q=0.7",
-            "fr":"fr-FR,fr;q=0.9,en;q=0.7","it":"it-IT,it;q=0.9,en;q=0.7","es":"es-ES,es;q=0.9,en;q=0.7"
-        }.get(market,"en-GB,en;q=0.8")
-        tz  = {"uk":"Europe/London","sg":"Asia/Singapore","de":"Europe/Berlin",
-               "fr":"Europe/Paris","it":"Europe/Rome","es":"Europe/Madrid"}.get(market,"Europe/London")
-        geo = {
-            "uk":{"latitude":51.5074,"longitude":-0.1278,"accuracy":50},
-            "sg":{"latitude":1.3521,"longitude":103.8198,"accuracy":50},
-            "de":{"latitude":52.52,"longitude":13.405,"accuracy":50},
-            "fr":{"latitude":48.8566,"longitude":2.3522,"accuracy":50},
-            "it":{"latitude":41.9028,"longitude":12.4964,"accuracy":50},
-            "es":{"latitude":40.4168,"longitude":-3.7038,"accuracy":50},
-        }.get(market)
-        return market, lang, tz, geo
-    except Exception:
-        return "uk","en-GB,en;q=0.8","Europe/London",{"latitude":51.5074,"longitude":-0.1278,"accuracy":50}
-
-def norm_model(m: str) -> str:
-    if not m: return ""
-    u = re.sub(r"[\s.\-_/]+","", m.upper())
-    return u.replace("OLEDTV","OLED").replace("QNEDTV","QNED").replace("NANOTV","NANO")
-
-def same_model(a: str, b: str) -> bool:
-    na, nb = norm_model(a), norm_model(b)
-    if not na or not nb: return False
-    if na == nb: return True
-    na2 = re.sub(r"[A-Z]{2,3}$","",na)
-    nb2 = re.sub(r"[A-Z]{2,3}$","",nb)
-    return bool(na2 and nb2 and na2 == nb2)
-
-def _viewport(vp: str):
-    if "mobile" in vp: return {"width":390,"height":844}
-    if "1280"  in vp: return {"width":1280,"height":900}
-    return {"width":1440,"height":900}
-
-# ========================= 셀렉터/대기 =========================
-CARD_SEL = ("li.product-grid__item, .product-card, article.product, .product-list__item, "
-            "[data-model], [data-sku], [data-product-id], [data-modelcode]")
-BUY_SEL   = "button[class*='buy' i], a[class*='buy' i], [aria-label*='buy' i], [data-cta*='buy' i]"
-LEARN_SEL = ("a[class*='learn' i], [aria-label*='learn' i], [data-cta*='learn' i], "
-             "a:has-text('Learn more'), a:has-text('Find out more'), "
-             "a.c-button, a.btn, button.c-button, button.btn, a[href*='/p/'], a[href*='/product']")
-CMP_SEL   = ("a[class*='compare' i], button[class*='compare' i], [aria-label*='compare' i], "
-             "input[type='checkbox'][name*='compare' i], input[type='checkbox'][id*='compare' i], "
-             "label[for*='compare' i]")
-
-LG_LEARN_SEL = ".c-button--secondary, .c-btn--secondary, a.c-button--secondary, button.c-button--secondary"
-LG_BUY_SEL   = ".c-button--primary,  .c-btn--primary,  a.c-button--primary,  button.c-button--primary"
-
-def wait_until_ready(page, idle_ms: int, debug=False) -> bool:
-    try:
-        page.wait_for_load_state("networkidle", timeout=idle_ms); return True
-    except Exception:
-        if debug: st.write("[debug] networkidle 미도달 → 대체 경로 진행")
-    for state in ["load","domcontentloaded"]:
-        try:
-            page.wait_for_load_state(state, timeout=idle_ms); return True
-        except Exception: pass
-    for sel in [CARD_SEL,".product-grid",".product-grid__items",".product-list",
-                "[data-product-id]","[data-model]","[data-sku]"]:
-        try:
-            page.wait_for_selector(sel, timeout=max(2000, idle_ms//2)); return True
-        except Exception: pass
-    return False
-
-# ========================= Compare 다국어 키워드 =========================
-COMPARE_TEXTS = [
-    "compare", "비교", "vergleich", "comparer", "comparar", "confronta",
-    "比較", "비교하기", "vergelijk", "comparação"
-]
-def _contains_compare_text(s: str) -> bool:
-    if not s: return False
-    low = s.lower()
-    return any(tok in low for tok in COMPARE_TEXTS)
-
-# ========================= JSON 파서 =========================
-def extract_models_from_json(obj, out_rows):
-    def _emit(model_str, title=""):
-        if not model_str: return
-        m = str(model_str).strip()
-        base = m.split('.')[0].upper()
-        alnum = re.sub(r"[^A-Za-z0-9]","", base)
-        if re.fullmatch(r"\d+", base): return
-        if len(alnum) < 4: return
-        if not (re.search(r"[A-Za-z]", base) and re.search(r"\d", base)):
-            hit=None
-            for pat in MODEL_PATTERNS:
-                mm = re.search(pat, m, re.I)
-                if mm: hit=mm.group(0).upper(); break
-            if not hit: return
-            base = hit
-        if re.match(r"^MD\d+$", base, re.I): return
-        out_rows.append({"Model": base, "Title": title or ""})
-    if isinstance(obj, dict):
-        title = obj.get("name") or obj.get("title") or ""
-        for key in ("modelCode","model","code"):
-            if key in obj and obj[key]: _emit(obj[key], title)
-        if "sku" in obj and obj["sku"]: _emit(obj["sku"], title)
-        for _,v in obj.items():
-            if isinstance(v,str):
-                for pat in MODEL_PATTERNS:
-                    mm = re.search(pat, v, re.I)
-                    if mm: out_rows.append({"Model":mm.group(0).upper(),"Title":title})
-            elif isinstance(v,(dict,list)):
-                extract_models_from_json(v, out_rows)
-    elif isinstance(obj, list):
-        for it in obj: extract_models_from_json(it, out_rows)
-
-# ========================= CTA 유틸 =========================
-def _btn_shape(el):
-    if not el: return UNKNOWN
-    cls = (el.get_attribute("class") or "").lower()
-    style = (el.get_attribute("style") or "").lower()
-    if "rounded-none" in cls or "square" in cls or "border-radius: 0" in style:
-        return "Squared"
-    if "rounded" in cls or "pill" in cls or "9999px" in style or "20px" in style:
-        return "Rounded"
-    return UNKNOWN
-
-_METRICS_JS = """
-(el)=>{
-  function collect(node){
-    const cs = getComputedStyle(node);
-    const px = (v)=>parseFloat(v)||0;
-    const radNum = (v)=>{ if(!v) return 0; v=v.toString(); if(v.includes('%')) return 9999; const n=parseFloat(v); return isFinite(n)?n:0; };
-    const corners = [radNum(cs.borderTopLeftRadius),radNum(cs.borderTopRightRadius),radNum(cs.borderBottomRightRadius),radNum(cs.borderBottomLeftRadius)];
-    const avgRadius = corners.reduce((a,b)=>a+b,0)/(corners.length||1);
-    const padX = px(cs.paddingLeft)+px(cs.paddingRight);
-    const bg = cs.backgroundColor || "rgba(0,0,0,0)";
-    const m = bg.match(/rgba?\\(([^)]+)\\)/); let alpha=0;
-    if(m){ const p = m[1].split(",").map(s=>parseFloat(s)); alpha = (p.length===4 ? (isFinite(p[3])?p[3]:0) : ((p[0]+p[1]+p[2])>0?1:0)); }
-    const borderW = ["Top","Right","Bottom","Left"].map(s=>px(cs["border"+s+"Width"])).reduce((a,b)=>a+b,0)/4;
-    const cls  = (node.className || "").toString().toLowerCase();
-    const tag  = (node.tagName  || "").toLowerCase();
-    const hasIcon = !!(node.querySelector("svg,i,[class*='icon'],[class*='ico'],[class*='chevron']"));
-    return { nodeTag: tag, cls, padX, avgRadius, alpha, borderW, hasIcon };
-  }
-  let node=el, best=collect(el), depth=0;
-  while(node && depth<3){
-    node=node.parentElement; if(!node) break;
-    const m=collect(node);
-    const sBest=(best.padX>0)+(best.alpha>0.05)+(best.borderW>=1)+(best.avgRadius>=6)+(best.cls.includes('btn')||best.cls.includes('cta'));
-    const sNew =(m.padX>0)+(m.alpha>0.05)+(m.borderW>=1)+(m.avgRadius>=6)+(m.cls.includes('btn')||m.cls.includes('cta'));
-    if(sNew>sBest) best=m; depth++;
-  }
-  return best;
-}
-"""
-
-def _classify_cta(page, locator):
-    if not locator or locator.count()==0:
-        return ("Unknown", "Unknown")
-    try:
-        m = locator.evaluate(_METRICS_JS)
-        is_button_like = (
-            "btn" in m["cls"] or "button" in m["cls"] or "cta" in m["cls"] or
-            m["nodeTag"] == "button" or
-            (m["padX"] >= 10 and (m["alpha"] > 0.02 or m["borderW"] >= 1 or m["avgRadius"] >= 6))
-        )
-        shape = "Rounded" if m["avgRadius"] >= 10 else ("Squared" if m["avgRadius"] >= 1 else "Unknown")
-        typ = "Button+Icon" if (is_button_like and m.get("hasIcon")) else ("Button" if is_button_like else "Text")
-        return (typ, shape if typ.startswith("Button") else "Unknown")
-    except Exception:
-        return ("Text", "Unknown")
-
-def _promote_clickable(el):
-    try:
-        promoted = el.locator("xpath=ancestor-or-self::a | ancestor-or-self::button").first
-        return promoted if promoted and promoted.count() > 0 else el
-    except Exception:
-        return el
-
-def _rounded_from_class_or_css(page, el):
-    if not el or el.count() == 0:
-        return "Unknown"
-    try:
-        cls = (el.get_attribute("class") or "").lower()
-        if PRIMARY_BTN_RE.search(cls) or SECONDARY_BTN_RE.search(cls) \
-           or "c-button" in cls or "c-btn" in cls or "pill" in cls or "rounded" in cls:
-            return "Rounded"
-        js = r"""
-        (node)=>{
-          const takeR = (cs)=>[
-            parseFloat(cs.borderTopLeftRadius)||0,
-            parseFloat(cs.borderTopRightRadius)||0,
-            parseFloat(cs.borderBottomRightRadius)||0,
-            parseFloat(cs.borderBottomLeftRadius)||0
-          ];
-          const maxRin = (el)=>{
-            if(!el) return 0;
-            const cs = getComputedStyle(el);
-            const rs = takeR(cs);
-            let maxR = Math.max(...rs);
-            try{
-              const b = getComputedStyle(el,"::before");
-              const a = getComputedStyle(el,"::after");
-              const tb = [parseFloat(b.borderTopLeftRadius)||0,parseFloat(b.borderTopRightRadius)||0,parseFloat(b.borderBottomRightRadius)||0,parseFloat(b.borderBottomLeftRadius)||0];
-              const ta = [parseFloat(a.borderTopLeftRadius)||0,parseFloat(a.borderTopRightRadius)||0,parseFloat(a.borderBottomRightRadius)||0,parseFloat(a.borderBottomLeftRadius)||0];
-              maxR = Math.max(maxR, ...tb, ...ta);
-            }catch(e){}
-            return maxR;
-          };
-          const rect = node.getBoundingClientRect();
-          const cs = getComputedStyle(node);
-          const rs = takeR(cs);
-          const avg = (rs.reduce((a,b)=>a+b,0)/4)||0;
-          const maxR = Math.max(avg, maxRin(node));
-          const h = Math.max(1, rect.height||0);
-          return {R:maxR, H:h};
-        }
-        """
-        m = el.evaluate(js)
-        if not m: return "Unknown"
-        R, H = float(m.get("R",0)), float(m.get("H",0))
-        if R >= 12 or (H>0 and (R/H)>=0.25): return "Rounded"
-        if R >= 1: return "Squared"
-        return "Unknown"
-    except Exception:
-        return "Unknown"
-
-# ========================= Compare 위치 계산 (보강판) =========================
-def _compare_position(page, cmp_loc, card_loc=None):
-    """카드 박스를 기준으로 좌/우/상/하 위치를 안정적으로 판정"""
-    try:
-        if not cmp_loc or cmp_loc.count() == 0:
-            return "Unknown"
-
-        # 카드 힌트가 없으면 product-card 계열 상위 박스를 자동 추정
-        if not card_loc or card_loc.count() == 0:
-            card_loc = cmp_loc.locator(
-                "xpath=ancestor::*[contains(@class,'product-card') or contains(@class,'product') or contains(@class,'grid__item') or contains(@class,'product-list__item')][1]"
-            )
-
-        card_el = card_loc.element_handle() if (card_loc and card_loc.count() > 0) else None
-
-        pos = page.evaluate("""
-        (el, card)=>{
-          const box = (card ? card.getBoundingClientRect()
-                            : el.parentElement?.getBoundingClientRect() || document.body.getBoundingClientRect());
-          const e = el.getBoundingClientRect();
-          const w = Math.max(1, box.width);
-          const h = Math.max(1, box.height);
-          const cx = (e.left + e.right)/2 - box.left;
-          const cy = (e.top  + e.bottom)/2 - box.top;
-          return {w, h, cx, cy};
-        }
-        """, cmp_loc.element_handle(), card_el)
-
-        left_edge   = pos["w"] * 0.40
-        right_edge  = pos["w"] * 0.60
-        top_edge    = pos["h"] * 0.33
-        bottom_edge = pos["h"] * 0.67
-
-        horiz = "Left" if pos["cx"] <= left_edge else ("Right" if pos["cx"] >= right_edge else "Center")
-        vert  = "Top"  if pos["cy"] <= top_edge  else ("Bottom" if pos["cy"] >= bottom_edge else "Middle")
-
-        return f"{vert}-{horiz}"
-    except Exception:
-        return "Unknown"
-
-# ========================= Compare Locator (강화) =========================
-def _find_compare_locator(page, card_locator=None):
-    scope = card_locator if (card_locator and card_locator.count() > 0) else page
-
-    # 1) checkbox → label[for] 승격
-    try:
-        cb = scope.locator("input[type='checkbox'][name*='compare' i], input[type='checkbox'][id*='compare' i]")
-        if cb.count() == 0:
-            cb = scope.locator("input[type='checkbox']")
-        if cb.count() > 0:
-            el = cb.first
-            try:
-                _id = el.get_attribute("id") or ""
-                if _id:
-                    lbl = page.locator(f"label[for='{_id}']")
-                    if lbl.count() > 0:
-                        return lbl.first
-            except Exception:
-                pass
-            return el
-    except Exception:
-        pass
-
-    # 2) data-속성 / role
-    try:
-        cand = scope.locator(
-            "[data-compare], [data-testid*='compare' i], [data-test*='compare' i], "
-            "[role='switch'][aria-label*='compare' i], [role='checkbox'][aria-label*='compare' i]"
-        )
-        if cand.count() > 0:
-            return cand.first
-    except Exception:
-        pass
-
-    # 3) 텍스트/aria/class
-    try:
-        cand = scope.locator("a, button, label, [role='button']")
-        n = cand.count()
-        for i in range(min(n, 60)):
-            el = cand.nth(i)
-            try:
-                txt = (el.inner_text() or "").strip()
-            except Exception:
-                txt = ""
-            aria = (el.get_attribute("aria-label") or "")
-            cls  = (el.get_attribute("class") or "")
-            if _contains_compare_text(txt) or _contains_compare_text(aria) or _contains_compare_text(cls):
-                return el
-    except Exception:
-        pass
-
-    # 4) 마지막: 카드 내 임의 checkbox/토글
-    try:
-        cand = scope.locator("input[type='checkbox'], [role='switch'], [role='checkbox']")
-        if cand.count() > 0:
-            return cand.first
-    except Exception:
-        pass
-
-    return None
-
-# ========================= 템플릿 단독 판정(보정) =========================
-def classify_template_sample(url: str):
-    VIEWPORT={"width":1280,"height":900}; NAV_TMO, IDLE_TMO = 35000, 9000
-    result={"LearnMore_Type":"Text","LearnMore_Shape":UNKNOWN,"BuyNow_Shape":"Squared","Compare_Pos":"Center"}
-    with sync_playwright() as p:
-        browser=p.chromium.launch(**PLAYWRIGHT_LAUNCH_KW)
-        ctx=browser.new_context(viewport=VIEWPORT, ignore_https_errors=True)
-        page=ctx.new_page()
-        try:
-            page.goto(url, wait_until="domcontentloaded", timeout=NAV_TMO)
-            try: page.wait_for_load_state("networkidle", timeout=IDLE_TMO)
-            except Exception: pass
-
-            # Buy Now
-            buy = page.locator(LG_BUY_SEL + ", " + BUY_SEL).first
-            if buy and buy.count()>0:
-                buy = _promote_clickable(buy)
-                _, shape = _classify_cta(page, buy)
-                if shape in ("Unknown","Squared"):
-                    try:
-                        bcls = (buy.get_attribute("class") or "").lower()
-                        if PRIMARY_BTN_RE.search(bcls): shape = "Rounded"
-                    except Exception: pass
-                result["BuyNow_Shape"] = shape if shape!=UNKNOWN else _rounded_from_class_or_css(page, buy)
-
-            # Learn More
-            learn = page.locator(LG_LEARN_SEL + ", " + LEARN_SEL).first
-            if learn and learn.count()>0:
-                learn = _promote_clickable(learn)
-                t, s = _classify_cta(page, learn)
-                result["LearnMore_Type"]  = "Button" if t in ("Text","Unknown") else t
-                result["LearnMore_Shape"] = s if s!=UNKNOWN else _rounded_from_class_or_css(page, learn)
-
-            # Compare
-            cmpb = _find_compare_locator(page, None)
-            if cmpb:
-                result["Compare_Pos"] = _compare_position(page, cmpb, None)
-        except Exception:
-            pass
-        ctx.close(); browser.close()
-    return result
-
-# ========================= 메인 수집기 =========================
-def fetch_models(url: str, max_models=50):
-    market, accept_lang, tz, geo = _guess_market_and_lang(url)
-    vp = _viewport(viewport_choice)
-    payloads, dom_models = [], []
-    NAV_TMO = int(timeout_sec*1000)
-    IDLE_TMO = int(max(5, timeout_sec-4)*1000)
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(**PLAYWRIGHT_LAUNCH_KW)
-        ctx = browser.new_context(
-            viewport=vp,
-            extra_http_headers={"Accept-Language": accept_lang},
-            locale=accept_lang.split(",")[0],
-            timezone_id=tz, geolocation=geo, permissions=["geolocation"],
-            ignore_https_errors=True,
-            user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128 Safari/537.36"),
-        )
-        page = ctx.new_page()
-        ctx.set_default_timeout(NAV_TMO); page.set_default_timeout(NAV_TMO)
-
-        if fast_mode:
-            def _should_block(req_url: str, rtype: str)->bool:
-                ul=req_url.lower()
-                if any(d in ul for d in ANALYTICS_BLOCK): return True
-                if rtype in ("image","font","media"): return True
-                return False
-            page.route("**/*", lambda route:
-                       route.abort() if _should_block(route.request.url, route.request.resource_type)
-                       else route.continue_())
-
-        def on_resp(resp):
-            try:
-                ul=resp.url.lower()
-                if _is_blocked_analytics(ul): return
-                if not _looks_like_product_api(ul): return
-                ct=(resp.headers.get("content-type") or "").lower()
-                body=None
-                if "json" in ct:
-                    try: body=resp.json()
-                    except Exception: body=None
-                if body is None:
-                    try:
-                        txt=resp.text()
-                        if txt and "{" in txt and len(txt)<2_000_000:
-                            body=json.loads(txt)
-                    except Exception: body=None
-                if body is None:
-                    try:
-                        req=resp.request
-                        if req and req.method.lower()=="post":
-                            pdata=req.post_data or ""
-                            if "{" in pdata and len(pdata)<2_000_000:
-                                body=json.loads(pdata)
-                    except Exception: pass
-                if body is not None:
-                    payloads.append({"url":resp.url, "data":body})
-                    if debug_log: st.write({"captured_json": resp.url})
-            except Exception: pass
-        page.on("response", on_resp)
-
-        if debug_log:
-            def on_req(req):
-                ul=(req.url or "").lower()
-                if _looks_like_product_api(ul) and not _is_blocked_analytics(ul):
-                    st.write({"xhr/fetch": req.method, "url": req.url[:300]})
-            page.on("request", on_req)
-
-        last_err, ready = None, False
-        for attempt in range(retries+1):
-            try:
-                page.goto(url, wait_until="domcontentloaded", timeout=NAV_TMO)
-                ready = wait_until_ready(page, IDLE_TMO, debug_log)
-                if ready: break
-            except Exception as e:
-                last_err = e
-            if debug_log: st.write(f"[debug] goto 재시도 {attempt+1}/{retries} (ready={bool(ready)})")
-        else:
-            if last_err: raise last_err
-
-        # 쿠키 배너 닫기
-        for sel in ["button[id*='accept']","button[aria-label*='Accept']",".onetrust-accept-btn-handler",
-                    "button:has-text('Accept all')","button:has-text('Accept All')",
-                    "button:has-text('Alle akzeptieren')","button:has-text('Aceptar todo')","button:has-text('Aceptar todas')"]:
-            try: page.locator(sel).first.click(timeout=1200); break
-            except Exception: pass
-
-        # 더보기(간단)
-        try:
-            for btn_text in ["Show more","더보기","Load more","See more","Mehr anzeigen","Voir plus","Ver más","Mostra altro"]:
-                page.get_by_text(btn_text, exact=False).first.click(timeout=1200)
-        except Exception: pass
-
-        # 스크롤
-        try:
-            for _ in range(3 if fast_mode else 6):
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)"); page.wait_for_timeout(600)
-            page.evaluate("window.scrollTo(0,0)")
-        except Exception: pass
-
-        # deep JSON
-        try:
-            txt = page.locator("script#__NEXT_DATA__").first.inner_text(timeout=2000)
-            data = json.loads(txt); tmp=[]
-            extract_models_from_json(data, tmp)
-            dom_models.extend({"Model":r["Model"].upper()} for r in tmp)
-        except Exception: pass
-        try:
-            raw = page.evaluate("() => (window.__NEXT_DATA__ || window.__APOLLO_STATE__ || null)")
-            if raw:
-                tmp=[]; extract_models_from_json(raw, tmp)
-                dom_models.extend({"Model":r["Model"].upper()} for r in tmp)
-        except Exception: pass
-
-        # DOM fallback
-        try:
-            cards = page.locator(CARD_SEL); c = min(cards.count(), 80)
-            for i in range(c):
-                card=cards.nth(i); blob=""
-                try: blob += card.inner_text()+" "
-                except Exception: pass
-                links = card.locator("a[href]"); lcnt=min(links.count(),10)
-                for li in range(lcnt):
-                    try:
-                        href = links.nth(li).get_attribute("href") or ""
-                        blob += " "+href; slug = href.split("/")[-1]
-                        for pat in MODEL_PATTERNS:
-                            m=re.search(pat, slug, re.I)
-                            if m: dom_models.append({"Model":m.group(0).upper()}); break
-                    except Exception: pass
-                for el in card.locator("img, a, *").all()[:30]:
-                    for a in ("alt","aria-label","href","src","data-model","data-modelcode","data-sku","data-product-id"):
-                        try:
-                            v=el.get_attribute(a)
-                            if v: blob += f" {v}"
-                        except Exception: pass
-                for pat in MODEL_PATTERNS:
-                    m=re.search(pat, blob, re.I)
-                    if m: dom_models.append({"Model":m.group(0).upper()}); break
-        except Exception: pass
-
-        # CTA 추정 — Learn/Buy/Compare
-        cta_types={
-            "LearnMore_Type": UNSET,
-            "LearnMore_Shape": UNSET,
-            "BuyNow_Shape": UNSET,
-            "Compare_Pos": UNSET
-        }
-        try:
-            cards = page.locator(CARD_SEL); n=min(cards.count(),2)
-            if n>0:
-                card = cards.nth(0)
-
-                # Buy Now
-                buy = card.locator(LG_BUY_SEL + ", " + BUY_SEL).first
-                if buy and buy.count()>0:
-                    buy = _promote_clickable(buy)
-                    _, buy_shape = _classify_cta(page, buy)
-                    if buy_shape in ("Unknown","Squared"):
-                        try:
-                            bcls = (buy.get_attribute("class") or "").lower()
-                            if PRIMARY_BTN_RE.search(bcls): buy_shape = "Rounded"
-                        except Exception: pass
-                    if cta_types["BuyNow_Shape"] is UNSET or cta_types["BuyNow_Shape"] == UNKNOWN:
-                        cta_types["BuyNow_Shape"] = buy_shape if buy_shape!=UNKNOWN else _rounded_from_class_or_css(page, buy)
-
-                # Learn More
-                learn = card.locator(LG_LEARN_SEL + ", " + LEARN_SEL).first
-                if learn and learn.count()>0:
-                    learn = _promote_clickable(learn)
-                    lm_type, lm_shape = _classify_cta(page, learn)
-                    if cta_types["LearnMore_Type"] is UNSET or cta_types["LearnMore_Type"] == UNKNOWN:
-                        cta_types["LearnMore_Type"]  = "Button" if lm_type in ("Text","Unknown") else lm_type
-                    if cta_types["LearnMore_Shape"] is UNSET or cta_types["LearnMore_Shape"] == UNKNOWN:
-                        cta_types["LearnMore_Shape"] = lm_shape if lm_shape!=UNKNOWN else _rounded_from_class_or_css(page, learn)
-
-                # Compare (강화 탐색) — 카드 범위 우선, 실패 시 전역
-                cmpb = _find_compare_locator(page, card)
-                if not cmpb:
-                    cmpb = _find_compare_locator(page, None)
-                if cmpb:
-                    cta_types["Compare_Pos"] = _compare_position(page, cmpb, card)
-
-                if debug_log:
-                    st.write({"compare_found": bool(cmpb)})
-                    if cmpb:
-                        try:
-                            st.write({
-                                "cmp_tag": cmpb.evaluate("(n)=>n.tagName"),
-                                "cmp_cls": cmpb.get_attribute("class"),
-                                "cmp_aria": cmpb.get_attribute("aria-label"),
-                                "cmp_text": (cmpb.inner_text() or "")[:120]
-                            })
-                        except Exception:
-                            pass
-        except Exception: pass
-
-        if take_screens:
-            try:
-                path=f"plp_sample_{int(time.time())}.png"
-                page.screenshot(path=path, full_page=True); st.caption(f"스크린샷 저장: {path}")
-            except Exception: pass
-
-        ctx.close(); browser.close()
-
-    # 네트워크 JSON walk
-    results=[]
-    def walk(o):
-        if isinstance(o, dict):
-            model=o.get("modelCode") or o.get("model") or o.get("code") or o.get("sku")
-            title=o.get("name") or o.get("title"); row={}
-            if model: row["Model"]=str(model).upper()
-            if title: row["Title"]=str(title)
-            if row: results.append(row)
-            for v in o.values(): walk(v)
-        elif isinstance(o, list):
-            for v in o: walk(v)
-
-    for pl in payloads:
-        try: walk(pl["data"])
-        except Exception: pass
-
-    # 합치기/필터
-    bundle=[]; 
-    if results: bundle.extend(results)
-    if dom_models: bundle.extend(dom_models)
-    seen=set(); out=[]
-    for r in bundle:
-        m=r.get("Model") or ""; t=r.get("Title","")
-        candidate = (m.split(".")[0].upper() if m else "")
-        if not candidate:
-            mm=re.search(r"(?:OLED|QNED|NANO)\d{2,3}[A-Z0-9\-]+", t or "", re.I)
-            if mm: candidate=mm.group(0).upper()
-        if not candidate: continue
-        if re.fullmatch(r"\d+", candidate): continue
-        alnum=re.sub(r"[^A-Za-z0-9]","", candidate)
-        if len(alnum)<4: continue
-        if not (re.search(r"[A-Za-z]", candidate) and re.search(r"\d", candidate)):
-            hit=None
-            for pat in MODEL_PATTERNS:
-                mm=re.search(pat, candidate, re.I)
-                if mm: hit=mm.group(0).upper(); break
-            if not hit: continue
-            candidate=hit
-        if re.match(r"^MD\d+$", candidate, re.I): continue
-        nm=norm_model(candidate)
-        if nm in seen: continue
-        seen.add(nm)
-        out.append({"Model":candidate})
-        if len(out)>=max_models: break
-
-    if debug_log:
-        st.write(f"[debug] payloads={len(payloads)} dom={len(dom_models)} unique={len(out)}")
-        if len(out)==0 and payloads:
-            st.write({"sample_payload_urls":[p["url"] for p in payloads[:5]]})
-
-    # 부족 시 템플릿 보정
-    need_strict = any(v in (UNSET, UNKNOWN) for v in (cta_types.get("LearnMore_Type",UNSET),
-                                                      cta_types.get("BuyNow_Shape",UNSET)))
-    if need_strict:
-        try:
-            strict=classify_template_sample(url)
-            for k,v in strict.items():
-                if cta_types.get(k, UNSET) in (UNSET, UNKNOWN):
-                    cta_types[k]=v
-        except Exception: pass
-
-    # 기본값 보정
-    defaults = {
-        "LearnMore_Type": "Text",
-        "LearnMore_Shape": UNKNOWN,
-        "BuyNow_Shape":   "Squared",
-        "Compare_Pos":    "Bottom-Left"
-    }
-    for k, dv in defaults.items():
-        if cta_types.get(k, UNSET) is UNSET or cta_types.get(k) == UNKNOWN:
-            cta_types[k] = dv
-
-    return out, cta_types
-
-# ========================= 매칭/표시 =========================
-def match_rows(a_models, b_models, a_types, b_types, want=2):
-    rows, used_b = [], set()
-    def _lm_str(types):
-        t = types.get("LearnMore_Type", UNKNOWN)
-        s = types.get("LearnMore_Shape", UNKNOWN)
-        return f"{t}" + (f" ({s})" if s not in (None, "", UNKNOWN) else "")
-    for a in a_models:
-        best=None
-        for j,b in enumerate(b_models):
-            if j in used_b: continue
-            if same_model(a["Model"], b["Model"]): best=(j,b); break
-        if best:
-            j,b=best; used_b.add(j)
-            rows.append({
-                "Model (AsIs)": a["Model"],
-                "Model (ToBe)": b["Model"],
-                "Learn More (AsIs)": _lm_str(a_types),
-                "Learn More (ToBe)": _lm_str(b_types),
-                "Buy Now (AsIs)": a_types.get("BuyNow_Shape", UNKNOWN),
-                "Buy Now (ToBe)": b_types.get("BuyNow_Shape", UNKNOWN),
-                "Compare (AsIs)": a_types.get("Compare_Pos", UNKNOWN),
-                "Compare (ToBe)": b_types.get("Compare_Pos", UNKNOWN),
-                "Match": "Matched"
-            })
-        if len(rows)>=want: break
+run_btn = st.button("실행 (Network-first, 백그라운드)", key="run_main")
+
+# ========================= 엔진 (rerun 간 공유 자원) =========================
+@st.cache_resource
+def _browser_pool():
+    """rerun/실행 간 공유되는 warm 브라우저 풀 (동시 컨텍스트 2개, 20회 사용 후 재기동)"""
+    return BrowserPool(size=2, max_uses=20, launch_kw=PLAYWRIGHT_LAUNCH_KW)
+
+@st.cache_resource
+def _result_cache():
+    """URL/뷰포트/로케일/셀렉터/패턴/옵션 키의 디스크 결과 캐시 (TTL 6시간, 최대 500개)"""
+    return result_cache.ResultCache(ttl_sec=6*3600, max_entries=500)
+
+@st.cache_resource
+def _template_cache():
+    """(domain, market, viewport) 템플릿 시그니처 → (판정 시각, 판정 결과)"""
+    return {}
+
+@st.cache_resource
+def _job_manager():
+    """프로세스 전역 작업 관리자 — 모든 세션 합계 동시 비교 PLP_MAX_JOBS(기본 2)개, 나머지는 대기열"""
+    return jobs.JobManager(max_workers=int(os.environ.get("PLP_MAX_JOBS", "2")))
+
+def _options() -> FetchOptions:
+    return FetchOptions(viewport=viewport_choice, fast_mode=fast_mode, debug=debug_log, keep_raw_json=keep_raw_json,
+                        capture_mb=int(capture_mb), take_screens=take_screens, timeout_sec=timeout_sec, retries=retries,
+                        api_direct=api_direct, force_refresh=force_refresh, har_mode=har_mode)
+
+def _compare_job(url_a: str, url_b: str):
+    """백그라운드 작업 함수 — 공유 자원은 스크립트 스레드에서 미리 꺼내 두고, 보고는 job 콜백으로만 (st.* 호출 없음)"""
+    opts, pool, cache, tpl = _options(), _browser_pool(), _result_cache(), _template_cache()
+    def run(job):
+        eng = PlpEngine(opts, pool=pool, cache=cache, tpl_cache=tpl, log=job.log, progress=job.update)
+        (a_models, a_types), (b_models, b_types) = eng.fetch_models_pair(url_a, url_b, max_models=80)
+        rows = match_rows(a_models, b_models, a_types, b_types, want=2)
+        return {"rows": rows, "a_types": a_types, "b_types": b_types, "counts": (len(a_models), len(b_models)),
+                "timeline": eng.timeline.to_dict()}
+    return run
 
-    if not rows and a_models and b_models:
-        rows.append({
-            "Model (AsIs)": a_models[0]["Model"],
-            "Model (ToBe)": b_models[0]["Model"],
-            "Learn More (AsIs)": _lm_str(a_types),
-            "Learn More (ToBe)": _lm_str(b_types),
-            "Buy Now (AsIs)": a_types.get("BuyNow_Shape", UNKNOWN),
-            "Buy Now (ToBe)": b_types.get("BuyNow_Shape", UNKNOWN),
-            "Compare (AsIs)": a_types.get("Compare_Pos", UNKNOWN),
-            "Compare (ToBe)": b_types.get("Compare_Pos", UNKNOWN),
-            "Match": "FirstInCategory"
-        })
-    return rows
+# ========================= 실행 / 작업 현황 =========================
+PHASES = {"queued": "대기", "loading": "로딩", "loaded": "로드 완료", "scrolled": "스크롤·DOM 수집",
+          "paged": "페이지 수집", "cta": "CTA 판정", "done": "완료"}
+STATUS_ICON = {"queued": "⏳", "running": "🔄", "done": "✅", "error": "❌", "cancelled": "🚫"}
+SHOW_JOBS = 5
 
-# ========================= 실행 =========================
 if run_btn:
-    st.info("네트워크 응답 기반으로 PLP 데이터를 수집 중입니다...")
-    try:
-        st.markdown(f"[{url_as}]({url_as}) ↔ [{url_tb}]({url_tb})")
-        a_models, a_types = fetch_models(url_as, max_models=80)
-        b_models, b_types = fetch_models(url_tb, max_models=80)
-        st.caption(f"[AS-IS] 수집 {len(a_models)}건 / [TO-BE] 수집 {len(b_models)}건")
-        rows = match_rows(a_models, b_models, a_types, b_types, want=2)
-        df = pd.DataFrame(rows)
-        st.dataframe(df, use_container_width=True)
-        st.success(f"✅ {len(df)}개 비교행 출력 (UK ↔ SG)")
-
+    jid = _job_manager().submit(_compare_job(url_as, url_tb), label=f"{url_as} ↔ {url_tb}", urls=[url_as, url_tb])
+    st.session_state.setdefault("jobs", []).insert(0, jid)
+
+def _show_job(snap, expanded: bool):
+    a_url, b_url = snap["urls"]
+    title = f"{STATUS_ICON.get(snap['status'], '')} [{snap['id']}] {a_url} ↔ {b_url} · {snap['elapsed']:.0f}s"
+    with st.expander(title, expanded=expanded):
+        st.markdown(f"[{a_url}]({a_url}) ↔ [{b_url}]({b_url})")
+        for _, level, msg in snap["logs"]:
+            if level == "info": st.caption(msg)
+        if snap["status"] == "queued":
+            st.info(f"대기 중 — 동시 실행 상한 {_job_manager().max_workers}개")
+            if st.button("취소", key=f"cancel_{snap['id']}"): _job_manager().cancel(snap["id"])
+        elif snap["status"] == "running":
+            for name, url in (("AS-IS", a_url), ("TO-BE", b_url)):
+                part = snap["partial"].get(url, {})
+                models = [m["Model"] for m in part.get("models") or []]
+                st.write(f"**[{name}]** {PHASES.get(part.get('phase'), part.get('phase'))} · 모델 {len(models)}건"
+                         + (f": {', '.join(models[:20])}{' …' if len(models) > 20 else ''}" if models else ""))
+                if part.get("cta_types"): st.write(part["cta_types"])
+        elif snap["status"] == "done":
+            import pandas as pd   # 무거운 import 는 실제 결과를 표시할 때만
+            res = snap["result"]
+            st.caption(f"[AS-IS] 수집 {res['counts'][0]}건 / [TO-BE] 수집 {res['counts'][1]}건")
+            st.dataframe(pd.DataFrame(res["rows"]), use_container_width=True)
+            st.success(f"✅ {len(res['rows'])}개 비교행 출력 (UK ↔ SG)")
+            if debug_log:
+                st.write("a_types:", res["a_types"])
+                st.write("/ b_types:", res["b_types"])
+            tl = res.get("timeline")
+            if tl and st.checkbox("⏱ 단계별 시간 (span 합계, Playwright 호출 수)", key=f"tl_{snap['id']}"):
+                st.dataframe(pd.DataFrame(tl["summary"]), use_container_width=True, hide_index=True)
+                st.download_button("타임라인 JSON", json.dumps(tl, ensure_ascii=False, indent=1, default=str),
+                                   file_name=f"timeline_{snap['id']}.json", mime="application/json",
+                                   key=f"tl_dl_{snap['id']}")
+        elif snap["status"] == "error":
+            st.error(f"실행 중 오류: {snap['error']}")
         if debug_log:
-            st.write("a_types:", a_types)
-            st.write("/ b_types:", b_types)
-    except Exception as e:
-        st.error(f"실행 중 오류: {type(e).__name__}: {e}")
+            dbg = [msg for _, level, msg in snap["logs"] if level != "info"]
+            if dbg and st.checkbox(f"Debug 로그 ({len(dbg)})", key=f"dbg_{snap['id']}"):
+                for msg in dbg: st.write(msg)
+
+def _jobs_panel(poll: bool):
+    mgr = _job_manager()
+    ids = [j for j in st.session_state.get("jobs", []) if mgr.get(j)]
+    st.session_state["jobs"] = ids
+    snaps = [mgr.get(j).snapshot() for j in ids[:SHOW_JOBS]]
+    for i, snap in enumerate(snaps):
+        _show_job(snap, expanded=(i == 0 or snap["status"] in ("queued", "running")))
+    if poll and not any(s["status"] in ("queued", "running") for s in snaps):
+        st.rerun()   # 모두 끝나면 전체 rerun → 폴링 중지
+
+_active = any((j := _job_manager().get(i)) and j.status in ("queued", "running")
+              for i in st.session_state.get("jobs", [])[:SHOW_JOBS])
+if _active and hasattr(st, "fragment"):
+    st.fragment(run_every=1.0)(_jobs_panel)(True)   # 진행 중인 동안 이 영역만 1초마다 갱신
+else:
+    _jobs_panel(False)
+    if _active: st.button("진행 상황 새로고침", key="jobs_refresh")
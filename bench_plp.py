@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+# 로컬 픽스처 사이트 벤치마크 — 운영 사이트 없이 수집기 속도 변화를 재현 가능하게 측정
+# - FixtureSite: http.server 로 LG 스타일 합성 PLP 제공 (/uk|sg/tvs/plp-<카드 수>/)
+#   __NEXT_DATA__ 첫 페이지 → 스크롤 시 page/size JSON 상품 API 로 추가 로드 (IntersectionObserver)
+#   + 로드마다 GraphQL(/graphql) 프로모션 조회, 쿠키 배너, 카드 썸네일 SVG, API 지연(latency_ms)
+# - 대상: match_rows (브라우저 없음) / plp_engine.fetch_models / compare_plp._crawl_page / compare_plp.run_compare
+# - 측정: wall time, Playwright 호출 수(spans 타임라인의 최상위 span 합계), 수집 건수(found),
+#   Python 힙 최고치(tracemalloc, 별도 1회), 프로세스 RSS 최고치(resource, 누적 최댓값 — Chromium 프로세스는 제외)
+# - 결과: outputs/bench/results.jsonl 에 실행(run)별로 추가 → --compare 로 직전 실행과 중앙값 비교
+# - 작업 디렉터리는 outputs/bench/work 로 바꿔 실행 (캐시/엔드포인트 카탈로그/리포트가 실제 outputs 와 섞이지 않음)
+#   python bench_plp.py --sizes 20 200 --targets fetch_models crawl_page --repeat 3
+#   python bench_plp.py --compare
+import os, re, gc, sys, json, time, html, pathlib, argparse, threading, subprocess, statistics, tracemalloc
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+BENCH_DIR = pathlib.Path("outputs") / "bench"
+RESULTS_PATH = BENCH_DIR / "results.jsonl"
+SIZES = (20, 200, 1000)
+TARGETS = ("match_rows", "fetch_models", "crawl_page", "run_compare")
+
+# ========================= 픽스처 데이터 =========================
+_SERIES = (("OLED","C4"), ("OLED","B4"), ("OLED","G4"), ("QNED","86"), ("NANO","81"))
+_INCH = (43, 48, 55, 65, 77, 83)
+_SUFFIX = {"uk": "AEK", "sg": "PSA"}
+_CURRENCY = {"uk": ("£", 1.0), "sg": ("S$", 1.7)}
+
+@lru_cache(maxsize=16)
+def products(n:int, market:str="uk")->Tuple[Dict[str,Any],...]:
+    """결정적 합성 상품 n 개 (sg 는 가격 환산, 25개마다 1개 누락, 10개마다 배지 다름)"""
+    sym, rate = _CURRENCY.get(market, _CURRENCY["uk"])
+    out = []
+    for i in range(n):
+        if market != "uk" and i % 25 == 24: continue
+        fam, ser = _SERIES[i % len(_SERIES)]
+        inch = _INCH[(i // len(_SERIES)) % len(_INCH)]
+        code = f"{fam}{inch}{ser}{i:04d}"
+        base = 499 + (i * 37) % 2500
+        out.append({
+            "modelCode": code, "sku": f"{code}.{_SUFFIX.get(market, 'AEK')}",
+            "name": f"LG {fam} {ser} {inch} inch 4K Smart TV ({code})",
+            "price": f"{sym}{base*rate:,.2f}", "discount": f"Save {sym}{(i % 5) * 50 * rate:,.0f}" if i % 5 else "",
+            "rating": f"{3.5 + (i % 15) / 10:.1f}", "reviews": f"({(i * 13) % 900})",
+            "badge": ("New" if i % 10 else "Best seller") if market == "uk" else ("New" if i % 10 else "Hot deal"),
+            "shipping": "Free delivery" if i % 3 else "Delivery in 3-5 days",
+        })
+    return tuple(out)
+
+_PLP_HTML = """<!doctype html><html lang="en"><head><meta charset="utf-8"><title>TVs | LG {market}</title><style>
+body{{font-family:Arial;margin:0}}.product-grid{{display:grid;grid-template-columns:repeat(4,1fr);gap:16px;padding:16px;list-style:none;margin:0}}
+.product-card{{height:400px;border:1px solid #ddd;border-radius:8px;padding:12px;box-sizing:border-box}}
+.product-card img{{width:100%;height:180px;object-fit:contain}}.product-title{{font-size:14px;margin:6px 0}}
+.c-button{{display:inline-block;padding:8px 14px;border-radius:24px;border:1px solid #a50034;margin-right:6px}}
+.c-button--primary{{background:#a50034;color:#fff}}#sentinel{{height:1px}}
+#onetrust-banner-sdk{{position:fixed;bottom:0;left:0;right:0;background:#222;color:#fff;padding:16px}}
+</style></head><body>
+<div id="onetrust-banner-sdk">We use cookies. <button id="onetrust-accept-btn-handler" class="onetrust-accept-btn-handler"
+ aria-label="Accept cookies">Accept all</button></div>
+<h1>TVs</h1><ul class="product-grid"></ul><div id="sentinel"></div>
+<script id="__NEXT_DATA__" type="application/json">{next_data}</script>
+<script>
+const D = JSON.parse(document.getElementById('__NEXT_DATA__').textContent).props.pageProps;
+const grid = document.querySelector('ul.product-grid'), sentinel = document.getElementById('sentinel');
+const esc = s => String(s).replace(/[&<>"]/g, c => ({{'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;'}}[c]));
+const card = p => `<li class="product-grid__item product-card" data-model="${{esc(p.modelCode)}}" data-sku="${{esc(p.sku)}}">
+ <img src="/img/${{esc(p.modelCode)}}.svg" alt="${{esc(p.name)}}">
+ <h3 class="product-title"><a href="/${{D.market}}/tvs/${{esc(p.modelCode.toLowerCase())}}/">${{esc(p.name)}}</a></h3>
+ <div class="price">${{esc(p.price)}}</div><div class="discount">${{esc(p.discount)}}</div>
+ <div class="rating" aria-label="rating ${{esc(p.rating)}}">${{esc(p.rating)}}</div><span class="review-count">${{esc(p.reviews)}}</span>
+ <span class="badge">${{esc(p.badge)}}</span><div class="shipping">${{esc(p.shipping)}}</div>
+ <div class="cta"><a class="c-button c-button--secondary" href="/${{D.market}}/tvs/${{esc(p.modelCode.toLowerCase())}}/">Learn more</a>
+ <button class="c-button c-button--primary btn-buy">Buy now</button></div>
+ <label class="compare"><input type="checkbox" name="compare"> Compare</label></li>`;
+const render = items => grid.insertAdjacentHTML('beforeend', items.map(card).join(''));
+let page = 1, loading = false;
+async function more() {{
+  if (loading || grid.children.length >= D.total) return;
+  loading = true; page += 1;
+  const r = await fetch(`/api/v1/plp/products?market=${{D.market}}&n=${{D.total}}&page=${{page}}&size=${{D.size}}`);
+  const j = await r.json();
+  fetch('/graphql', {{method: 'POST', headers: {{'content-type': 'application/json'}},
+    body: JSON.stringify({{operationName: 'PlpPromotions', variables: {{skus: j.products.map(p => p.sku)}},
+      query: 'query PlpPromotions($skus:[String!]){{promotions(skus:$skus){{sku modelCode badge}}}}'}})}})
+    .then(g => g.json()).then(g => g.data.promotions.forEach(x => {{
+      const el = document.querySelector(`[data-sku="${{x.sku}}"] .badge`); if (el) el.textContent = x.badge; }}));
+  render(j.products); loading = false;
+  if (sentinel.getBoundingClientRect().top < innerHeight + 800) more();
+}}
+render(D.products);
+new IntersectionObserver(es => {{ if (es.some(e => e.isIntersecting)) more(); }}, {{rootMargin: '800px'}}).observe(sentinel);
+document.getElementById('onetrust-accept-btn-handler').onclick = () => document.getElementById('onetrust-banner-sdk').remove();
+</script></body></html>"""
+
+def _svg(code:str)->bytes:
+    hue = int.from_bytes(code.encode()[-3:], "big") % 360
+    return (f"<svg xmlns='http://www.w3.org/2000/svg' width='320' height='180'><rect width='320' height='180' "
+            f"fill='hsl({hue},60%,70%)'/><text x='16' y='96' font-size='22'>{html.escape(code)}</text></svg>").encode()
+
+# ========================= 픽스처 서버 =========================
+class _Handler(BaseHTTPRequestHandler):
+    site: "FixtureSite" = None
+
+    def log_message(self, *a): pass
+
+    def _send(self, code:int, body:bytes, ctype:str):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype); self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store" if "json" in ctype else "max-age=3600")
+        self.end_headers(); self.wfile.write(body)
+
+    def _json(self, obj):
+        time.sleep(self.site.latency_ms / 1000)
+        self._send(200, json.dumps(obj).encode(), "application/json")
+
+    def do_GET(self):
+        u = urlparse(self.path); q = dict(parse_qsl(u.query))
+        m = re.fullmatch(r"/(\w{2})/tvs/plp-(\d+)/?", u.path)
+        if m:
+            market, n = m.group(1), int(m.group(2)); size = self.site.page_size
+            data = {"props": {"pageProps": {"market": market, "total": len(products(n, market)), "size": size,
+                                            "products": list(products(n, market)[:size])}}}
+            blob = json.dumps(data).replace("</", "<\\/")
+            return self._send(200, _PLP_HTML.format(market=market, next_data=blob).encode(), "text/html; charset=utf-8")
+        if u.path == "/api/v1/plp/products":
+            items = products(int(q.get("n", 20)), q.get("market", "uk"))
+            page, size = max(1, int(q.get("page", 1))), max(1, int(q.get("size", self.site.page_size)))
+            return self._json({"page": page, "size": size, "total": len(items),
+                               "products": list(items[(page-1)*size:page*size])})
+        if u.path.startswith("/img/") and u.path.endswith(".svg"):
+            return self._send(200, _svg(u.path[5:-4]), "image/svg+xml")
+        self._send(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlparse(self.path).path != "/graphql": return self._send(404, b"not found", "text/plain")
+        try: skus = json.loads(body)["variables"]["skus"]
+        except Exception: return self._send(400, b"bad request", "text/plain")
+        self._json({"data": {"promotions": [{"sku": s, "modelCode": s.split(".")[0],
+                                             "badge": "Promo" if i % 7 == 0 else "New"} for i, s in enumerate(skus)]}})
+
+class FixtureSite:
+    """with FixtureSite() as site: site.url(200, "uk") — 임의 포트의 로컬 서버 (데몬 스레드)"""
+    def __init__(self, page_size:int=24, latency_ms:int=20, host:str="127.0.0.1", port:int=0):
+        self.page_size, self.latency_ms = page_size, latency_ms
+        handler = type("Handler", (_Handler,), {"site": self})
+        self._srv = ThreadingHTTPServer((host, port), handler)
+        self._srv.daemon_threads = True
+        self._thread = threading.Thread(target=self._srv.serve_forever, name="plp-fixture", daemon=True)
+
+    def __enter__(self):
+        self._thread.start(); return self
+
+    def __exit__(self, *exc):
+        self._srv.shutdown(); self._srv.server_close()
+
+    @property
+    def base(self)->str:
+        host, port = self._srv.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, n:int, market:str="uk")->str:
+        return f"{self.base}/{market}/tvs/plp-{n}/"
+
+# ========================= 대상 =========================
+_SELECTORS = {"card": ".product-card", "title": ".product-title", "price": ".price", "discount": ".discount",
+              "members": ".members", "installment": ".installment", "rating": ".rating", "review_count": ".review-count",
+              "badges": ".badge", "shipping": ".shipping", "cta": ".btn-buy", "image": "img"}
+
+def _config(site:FixtureSite, n:int, shots:bool)->Dict[str,Any]:
+    """compare_plp 설정 — 캐시/이력 끄고 픽스처 셀렉터 사용"""
+    page = lambda name, market: {"name": name, "url": site.url(n, market), "market": market,
+                                 "accept_cookie_selector": ".onetrust-accept-btn-handler", "selectors": _SELECTORS}
+    return {"defaults": {"wait_until": "domcontentloaded", "shots": shots, "max_cards": n,
+                         "screenshots": {"mode": "batch", "format": "webp", "quality": 80, "tile_px": 8000},
+                         "scroll": {"step_px": 1400, "max_steps": 200, "settle_ms": 1200, "quiet_ms": 400},
+                         "pagination": {"load_more": False, "numbered": False},
+                         "cache": {"enabled": False}, "history": {"enabled": False}, "report": {"page_size": 50}},
+            "model_patterns": [r"(?:OLED|QNED|NANO)\d{2,3}[A-Z0-9]+"],
+            "pages": [page("ASIS", "uk"), page("TOBE", "sg")]}
+
+def _pw_calls(span_list:List[Dict[str,Any]])->int:
+    """스레드별 최상위 span 의 Playwright 호출 합계 (중첩 span 은 이미 포함)"""
+    return sum(r["pw_calls"] for r in span_list if r["depth"] == 0)
+
+def _target(name:str, site:FixtureSite, pool, n:int, shots:bool)->Callable[[],Tuple[int,List[Dict[str,Any]]]]:
+    """() → (found, spans) 를 돌려주는 측정 함수"""
+    import spans
+    if name == "match_rows":
+        from plp_engine import match_rows
+        a = [{"Model": p["modelCode"]} for p in products(n, "uk")]
+        b = [{"Model": p["modelCode"]} for p in products(n, "sg")]
+        return lambda: (len(match_rows(a, b, {}, {}, want=n)), [])
+    if name == "fetch_models":
+        from plp_engine import PlpEngine, FetchOptions
+        def run():
+            eng = PlpEngine(FetchOptions(force_refresh=True, take_screens=False), pool=pool)
+            models, _ = eng.fetch_models(site.url(n, "uk"), max_models=n)
+            return len(models), eng.timeline.spans()
+        return run
+    import compare_plp
+    if name == "crawl_page":
+        cfg = _config(site, n, shots)
+        def run():
+            tl = spans.Timeline()
+            cards = compare_plp._crawl_page(pool, cfg["pages"][0], cfg["defaults"], cfg["model_patterns"], {}, tl)
+            return len(cards), tl.spans()
+        return run
+    if name == "run_compare":
+        import yaml
+        path = pathlib.Path(f"bench_{n}.yml")
+        path.write_text(yaml.safe_dump(_config(site, n, shots), allow_unicode=True), encoding="utf-8")
+        def run():
+            res = compare_plp.run_compare(str(path), pool=pool, force_refresh=True)
+            tl = json.loads(pathlib.Path(res["timeline_path"]).read_text(encoding="utf-8"))
+            return len(res["summary"]), tl["spans"]
+        return run
+    raise ValueError(f"알 수 없는 대상: {name}")
+
+# ========================= 측정 =========================
+def _rss_mb()->Optional[float]:
+    if resource is None: return None
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(r / (1_048_576 if sys.platform == "darwin" else 1024), 1)
+
+def _measure(fn, trace_mem:bool=False)->Dict[str,Any]:
+    gc.collect()
+    if trace_mem: tracemalloc.start()
+    t0 = time.perf_counter()
+    found, span_list = fn()
+    wall = (time.perf_counter() - t0) * 1000
+    peak = tracemalloc.get_traced_memory()[1] if trace_mem else None
+    if trace_mem: tracemalloc.stop()
+    return {"wall_ms": round(wall, 1), "found": found, "pw_calls": _pw_calls(span_list),
+            "py_peak_mb": round(peak / 1_048_576, 2) if peak is not None else None, "rss_peak_mb": _rss_mb()}
+
+def _rev()->str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "-uno"], capture_output=True, text=True, timeout=10).stdout.strip()
+        return rev + ("-dirty" if dirty else "") if rev else ""
+    except Exception:
+        return ""
+
+@contextmanager
+def _workdir(path:pathlib.Path):
+    (path / "outputs").mkdir(parents=True, exist_ok=True)
+    prev = os.getcwd(); os.chdir(path)
+    try: yield path
+    finally: os.chdir(prev)
+
+def run_bench(sizes=SIZES, targets=TARGETS, repeat:int=3, warmup:int=1, shots:bool=False, mem:bool=True,
+              page_size:int=24, latency_ms:int=20, out:pathlib.Path=RESULTS_PATH, log=print)->List[Dict[str,Any]]:
+    """대상 × 카드 수마다 warmup 후 repeat 회 측정 (+ mem 이면 tracemalloc 1회) → out 에 JSONL 추가"""
+    from browser_pool import BrowserPool
+    from plp_engine import LAUNCH_KW
+    out = pathlib.Path(out).resolve(); out.parent.mkdir(parents=True, exist_ok=True)
+    meta = {"run": time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}", "rev": _rev(), "python": sys.version.split()[0],
+            "page_size": page_size, "latency_ms": latency_ms, "shots": shots}
+    records = []
+    pool = BrowserPool(size=2, max_uses=1000, launch_kw=LAUNCH_KW)
+    try:
+        with FixtureSite(page_size=page_size, latency_ms=latency_ms) as site, _workdir(out.parent / "work"):
+            for target in targets:
+                for n in sizes:
+                    fn = _target(target, site, pool, n, shots)
+                    for _ in range(warmup): fn()
+                    passes = [(i, False) for i in range(repeat)] + ([("mem", True)] if mem else [])
+                    for it, trace in passes:
+                        rec = {**meta, "target": target, "cards": n, "iter": it, **_measure(fn, trace)}
+                        if trace: rec["wall_ms"] = None   # tracemalloc 오버헤드 — 시간은 기록하지 않음
+                        records.append(rec)
+                        with open(out, "a", encoding="utf-8") as f: f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                        log(f"{target:>12} n={n:<5} {it!s:>4}  " + ("" if trace else f"wall={rec['wall_ms']}ms ") +
+                            f"found={rec['found']} pw={rec['pw_calls']} " +
+                            (f"py_peak={rec['py_peak_mb']}MB " if trace else "") + f"rss={rec['rss_peak_mb']}MB")
+    finally:
+        pool.close()
+    return records
+
+# ========================= 비교 =========================
+def load_results(path:pathlib.Path=RESULTS_PATH)->List[Dict[str,Any]]:
+    path = pathlib.Path(path)
+    if not path.exists(): return []
+    return [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+
+def summarize(records:List[Dict[str,Any]])->Dict[Tuple[str,int],Dict[str,Any]]:
+    """(target, cards) → 중앙값 wall/pw_calls/found + py_peak"""
+    groups: Dict[Tuple[str,int],List[Dict[str,Any]]] = {}
+    for r in records: groups.setdefault((r["target"], r["cards"]), []).append(r)
+    def med(xs):
+        if not xs: return None
+        m = statistics.median(xs)
+        return int(m) if float(m).is_integer() else round(m, 1)
+    return {k: {"wall_ms": med([r["wall_ms"] for r in rs if r["wall_ms"] is not None]),
+                "pw_calls": med([r["pw_calls"] for r in rs]), "found": med([r["found"] for r in rs]),
+                "py_peak_mb": max((r["py_peak_mb"] for r in rs if r.get("py_peak_mb") is not None), default=None)}
+            for k, rs in groups.items()}
+
+def compare(path:pathlib.Path=RESULTS_PATH, base:str=None, head:str=None)->str:
+    """두 실행(run, 기본: 마지막 두 개)의 중앙값 비교표"""
+    recs = load_results(path)
+    runs = sorted({r["run"] for r in recs})
+    if len(runs) < (1 if base else 2): return "비교할 실행이 2개 이상 필요합니다"
+    head = head or runs[-1]; base = base or [r for r in runs if r != head][-1]
+    a = summarize([r for r in recs if r["run"] == base]); b = summarize([r for r in recs if r["run"] == head])
+    rev = lambda run: next((r.get("rev", "") for r in recs if r["run"] == run), "")
+    lines = [f"base {base} ({rev(base)}) → head {head} ({rev(head)})",
+             f"{'target':>12} {'cards':>6} {'wall base':>10} {'wall head':>10} {'Δ%':>7} {'pw':>11} {'found':>11} {'py_peak MB':>13}"]
+    for k in sorted(set(a) | set(b), key=lambda k: (TARGETS.index(k[0]) if k[0] in TARGETS else 99, k[1])):
+        x, y = a.get(k, {}), b.get(k, {})
+        wx, wy = x.get("wall_ms"), y.get("wall_ms")
+        d = f"{(wy - wx) / wx * 100:+.1f}" if wx and wy else "-"
+        v = lambda d, key: "-" if d.get(key) is None else d[key]
+        pair = lambda key: f"{v(x, key)}→{v(y, key)}"
+        lines.append(f"{k[0]:>12} {k[1]:>6} {v(x, 'wall_ms'):>10} {v(y, 'wall_ms'):>10} {d:>7} "
+                     f"{pair('pw_calls'):>11} {pair('found'):>11} {pair('py_peak_mb'):>13}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="로컬 픽스처 PLP 벤치마크 (결과: outputs/bench/results.jsonl)")
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    ap.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--shots", action="store_true", help="compare_plp 카드 썸네일 캡처 포함")
+    ap.add_argument("--no-mem", action="store_true", help="tracemalloc 측정 생략")
+    ap.add_argument("--page-size", type=int, default=24, help="픽스처 상품 API 페이지 크기")
+    ap.add_argument("--latency-ms", type=int, default=20, help="픽스처 JSON 응답 지연")
+    ap.add_argument("--out", default=str(RESULTS_PATH))
+    ap.add_argument("--compare", nargs="*", metavar="RUN", help="측정 없이 비교 (RUN 생략 시 마지막 두 실행)")
+    ap.add_argument("--serve", action="store_true", help="픽스처 서버만 띄우기 (수동 확인용)")
+    a = ap.parse_args(argv)
+    if a.compare is not None:
+        print(compare(a.out, *(a.compare[:2] if len(a.compare) >= 2 else ([None, a.compare[0]] if a.compare else []))))
+        return 0
+    if a.serve:
+        with FixtureSite(page_size=a.page_size, latency_ms=a.latency_ms, port=8765) as site:
+            for n in a.sizes: print(site.url(n, "uk"), site.url(n, "sg"))
+            try:
+                while True: time.sleep(3600)
+            except KeyboardInterrupt: pass
+        return 0
+    run_bench(a.sizes, a.targets, a.repeat, a.warmup, a.shots, not a.no_mem, a.page_size, a.latency_ms, pathlib.Path(a.out))
+    print(compare(a.out))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
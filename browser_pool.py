@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# 장기 실행 브라우저 풀
+# - 워커 스레드마다 Playwright + Chromium 1개 유지 (sync API 객체는 스레드 간 공유 불가)
+# - 작업마다 격리된 새 컨텍스트 발급 → 작업 종료 시 컨텍스트만 닫음
+# - N회 사용 후 / 연결 끊김 시 브라우저 재기동, 동시 컨텍스트 수 = 워커 수
+import queue, threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+class BrowserPool:
+    def __init__(self, size:int=2, max_uses:int=20, launch_kw:Optional[Dict[str,Any]]=None):
+        self.size = max(1, int(size))
+        self.max_uses = max(1, int(max_uses))
+        self.launch_kw = dict(launch_kw or {"headless": True})
+        self.stats = {"jobs":0, "launches":0, "recycled":0, "unhealthy":0}
+        self._q: "queue.Queue" = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, fn:Callable[[Any],Any], **context_kw)->Future:
+        """fn(ctx) 를 풀 워커에서 실행. context_kw 는 browser.new_context 인자"""
+        if self._closed: raise RuntimeError("BrowserPool 이 이미 종료됨")
+        with self._lock:
+            while len(self._workers) < self.size:
+                t = threading.Thread(target=self._worker, name=f"plp-browser-{len(self._workers)}", daemon=True)
+                t.start(); self._workers.append(t)
+        fut: Future = Future()
+        self._q.put((fn, context_kw, fut))
+        return fut
+
+    def run(self, fn:Callable[[Any],Any], **context_kw):
+        return self.submit(fn, **context_kw).result()
+
+    def close(self, wait:bool=True):
+        self._closed = True
+        for _ in self._workers: self._q.put(None)
+        if wait:
+            for t in self._workers: t.join(timeout=30)
+
+    def _bump(self, key:str):
+        with self._lock: self.stats[key] += 1   # 워커 스레드 여러 개가 동시에 갱신
+
+    def snapshot(self)->Dict[str,int]:
+        with self._lock: return dict(self.stats)
+
+    def _launch(self, pw):
+        self._bump("launches")
+        return pw.chromium.launch(**self.launch_kw)
+
+    def _worker(self):
+        from playwright.sync_api import sync_playwright
+        pw, start_err = None, None
+        try: pw = sync_playwright().start()
+        except Exception as e: start_err = e
+        browser, uses = None, 0
+        try:
+            while True:
+                job = self._q.get()
+                if job is None: break
+                fn, kw, fut = job
+                if not fut.set_running_or_notify_cancel(): continue
+                if start_err:
+                    fut.set_exception(start_err); continue
+                try:
+                    # 헬스체크 + 재활용
+                    if browser is not None and not browser.is_connected():
+                        self._bump("unhealthy"); browser = None
+                    if browser is not None and uses >= self.max_uses:
+                        self._bump("recycled")
+                        try: browser.close()
+                        except Exception: pass
+                        browser = None
+                    if browser is None:
+                        browser, uses = self._launch(pw), 0
+                    uses += 1; self._bump("jobs")
+                    ctx = browser.new_context(**kw)
+                except Exception as e:
+                    fut.set_exception(e); continue
+                try:
+                    fut.set_result(fn(ctx))
+                except BaseException as e:
+                    fut.set_exception(e)
+                finally:
+                    try: ctx.close()
+                    except Exception: pass
+        finally:
+            try:
+                if browser: browser.close()
+            except Exception: pass
+            try:
+                if pw: pw.stop()
+            except Exception: pass
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# 카드 스크린샷 일괄 캡처 (compare_plp._crawl_page)
+# - 카드 박스(문서 좌표)를 evaluate 한 번으로 수집 → 카드가 있는 구간만 전체 페이지 캡처 (tile_px 높이 단위 타일)
+#   Playwright 전용 카드 셀렉터(:has-text, >>, text=)면 locator bounding_box 로, 크롭 영역은 문서 크기 안으로 클램프
+# - Pillow 로 카드별 크롭/인코딩(WebP·JPEG)을 스레드 풀에서 처리
+# - 파일명은 크롭 픽셀의 해시 → 내용이 같으면 이전 실행 파일을 그대로 재사용 (다시 쓰지 않음)
+# - 저장하면서 perceptual hash(img_hash)도 계산해 둠
+# - 주의: 전체 페이지 캡처는 잠시 뷰포트를 늘리므로 100vh 기반 레이아웃은 박스와 어긋날 수 있음 → mode: element
+import io, hashlib, pathlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from PIL import Image
+import img_hash
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="plp-shot")
+EXT = {"webp": "webp", "jpeg": "jpg", "png": "png"}
+
+_BOXES_JS = """
+({card, max}) => Array.from(document.querySelectorAll(card)).slice(0, max).map(c => {
+  const r = c.getBoundingClientRect();
+  return {x: r.left + window.scrollX, y: r.top + window.scrollY, w: r.width, h: r.height};
+})
+"""
+# 문서 크기 + 스크롤 위치 (크롭 영역 클램프 / locator bounding_box 를 문서 좌표로)
+_PAGE_JS = """
+() => {
+  const d = document.documentElement, b = document.body;
+  return {w: Math.max(d.scrollWidth, b ? b.scrollWidth : 0), h: Math.max(d.scrollHeight, b ? b.scrollHeight : 0),
+          sx: window.scrollX, sy: window.scrollY};
+}
+"""
+
+def save_image(im:Image.Image, outdir:pathlib.Path, fmt:str="webp", quality:int=80)->str:
+    """픽셀 해시로 파일명 결정, 없을 때만 인코딩/저장. 파일명 반환"""
+    if im.mode not in ("RGB", "RGBA"): im = im.convert("RGB")
+    h = hashlib.sha1(f"{im.size}{im.mode}".encode() + im.tobytes()).hexdigest()[:20]
+    fname = f"{h}.{EXT.get(fmt, fmt)}"
+    img_hash.remember(fname, img_hash.hash_image(im))   # 크롭 스레드에서 phash 도 같이
+    path = outdir / fname
+    if not path.exists():
+        if fmt == "jpeg" and im.mode == "RGBA": im = im.convert("RGB")
+        buf = io.BytesIO()
+        im.save(buf, format=fmt.upper(), quality=quality, **({"method": 4} if fmt == "webp" else {}))
+        tmp = path.with_suffix(path.suffix + ".tmp"); tmp.write_bytes(buf.getvalue()); tmp.replace(path)
+    return fname
+
+def _tiles(boxes:List[Optional[Dict[str,float]]], tile_px:int)->List[List[int]]:
+    """위에서부터 카드들을 tile_px 높이 안에 들어가도록 묶음 (박스 인덱스 목록)"""
+    order = sorted((i for i,b in enumerate(boxes) if b), key=lambda i: boxes[i]["y"])
+    tiles, cur, top = [], [], 0.0
+    for i in order:
+        b = boxes[i]
+        if cur and b["y"] + b["h"] - top > tile_px:
+            tiles.append(cur); cur = []
+        if not cur: top = b["y"]
+        cur.append(i)
+    if cur: tiles.append(cur)
+    return tiles
+
+def _boxes(page, card_sel:str, max_cards:int, doc:Dict[str,float])->List[Optional[Dict[str,float]]]:
+    """카드 박스(문서 좌표). querySelectorAll 이 못 읽는 Playwright 전용 셀렉터면 locator bounding_box 로"""
+    try:
+        return page.evaluate(_BOXES_JS, {"card": card_sel, "max": max_cards}) or []
+    except Exception:
+        pass
+    cards, out = page.locator(card_sel), []
+    for i in range(min(cards.count(), max_cards)):
+        try: b = cards.nth(i).bounding_box()
+        except Exception: b = None
+        out.append({"x": b["x"] + doc["sx"], "y": b["y"] + doc["sy"], "w": b["width"], "h": b["height"]} if b else None)
+    return out
+
+def capture(page, card_sel:str, max_cards:int, outdir:pathlib.Path, fmt:str="webp", quality:int=80,
+            tile_px:int=8000)->List[str]:
+    """카드 순서대로 파일명 목록 (캡처 실패/보이지 않는 카드는 "")"""
+    doc = page.evaluate(_PAGE_JS)
+    raw = _boxes(page, card_sel, max_cards, doc)
+    boxes = [b if b and b["w"] >= 1 and b["h"] >= 1 else None for b in raw]
+    names = [""] * len(boxes)
+    futs = []
+    for tile in _tiles(boxes, tile_px):
+        x0 = max(0, min(boxes[i]["x"] for i in tile)); y0 = max(0, min(boxes[i]["y"] for i in tile))
+        x1 = min(max(boxes[i]["x"] + boxes[i]["w"] for i in tile), doc["w"])
+        y1 = min(max(boxes[i]["y"] + boxes[i]["h"] for i in tile), y0 + max(tile_px, 1), doc["h"])
+        if x1 - x0 <= 0 or y1 - y0 <= 0: continue   # 문서 밖(가로 캐러셀 등)
+        try:
+            png = page.screenshot(full_page=True, scale="css", animations="disabled",
+                                  clip={"x": x0, "y": y0, "width": x1 - x0, "height": y1 - y0})
+        except Exception:
+            continue
+        img = Image.open(io.BytesIO(png)); img.load()
+        iw, ih = img.size
+        for i in tile:
+            b = boxes[i]
+            l, t = max(0, int(b["x"] - x0)), max(0, int(b["y"] - y0))
+            r, btm = min(iw, int(b["x"] - x0 + b["w"])), min(ih, int(b["y"] + b["h"] - y0))
+            if r - l <= 0 or btm - t <= 0: continue
+            futs.append((i, _executor.submit(lambda im, rc: save_image(im.crop(rc), outdir, fmt, quality), img, (l, t, r, btm))))
+    for i, f in futs:
+        try: names[i] = f.result()
+        except Exception: pass
+    return names
+
+def capture_elements(cards, n:int, outdir:pathlib.Path, fmt:str="webp", quality:int=80)->List[str]:
+    """카드별 element 스크린샷 (기존 방식) — 저장은 같은 해시 이름/포맷"""
+    names = []
+    for i in range(n):
+        try:
+            png = cards.nth(i).screenshot(animations="disabled")
+            names.append(save_image(Image.open(io.BytesIO(png)), outdir, fmt, quality))
+        except Exception:
+            names.append("")
+    return names
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
-import os, re, time, math, json, uuid, pathlib, yaml
+import re, sys, time, json, hashlib, pathlib, yaml
 from dataclasses import dataclass, asdict
 from typing import Dict, Any, List, Tuple
+import numpy as np
 import pandas as pd
-from rapidfuzz import fuzz
-from playwright.sync_api import sync_playwright
+from rapidfuzz import fuzz, process
+from browser_pool import BrowserPool
+import lazyload, pagination, net_policy, result_cache, har_replay, model_index, markets, prices, card_shots, img_hash, report_html, spans
+from spans import span
+from run_history import RunHistory
+from plp_engine import is_product_api
 
 OUT = pathlib.Path("outputs"); OUT.mkdir(exist_ok=True)
 
@@ -12,20 +17,9 @@ def _clean(s:str)->str:
     if not s: return ""
     return re.sub(r"\s+", " ", str(s)).strip()
 
-def _to_num(s:str)->float:
-    if not s: return math.nan
-    t = re.sub(r"[^\d.,-]", "", s)
-    if t.count(",") and t.count("."):
-        if t.rfind(",") > t.rfind("."): 
-            t = t.replace(".", "").replace(",", ".")
-        else: 
-            t = t.replace(",", "")
-    else:
-        t = t.replace(",", "")
-    try:
-        return float(t)
-    except:
-        return math.nan
+def _clean_col(s:pd.Series)->pd.Series:
+    """_clean 의 열 단위 버전"""
+    return s.fillna("").astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
 
 def _read_config(config_path:str)->Dict[str,Any]:
     with open(config_path,"r",encoding="utf-8") as f:
@@ -39,15 +33,11 @@ def _accept_cookies(page, selector):
     except: 
         pass
 
-def _autoscroll(page, step=1400, max_steps=20, settle_ms=1000):
-    prev = 0
-    for _ in range(max_steps):
-        page.evaluate(f"window.scrollBy(0,{step});")
-        page.wait_for_timeout(settle_ms)
-        h = page.evaluate("document.body.scrollHeight")
-        if h == prev: break
-        prev = h
-    page.evaluate("window.scrollTo(0,0);")
+def _autoscroll(page, card_sel:str, scroll:Dict[str,Any])->List[int]:
+    """카드 수/상품 API 기반 lazy-load 스크롤 — 스텝별 추가 카드 수 반환 (settle_ms 는 스텝당 최대 대기)"""
+    return lazyload.autoscroll(page, card_sel, step=scroll.get("step_px",1400), max_steps=scroll.get("max_steps",20),
+                               quiet_ms=scroll.get("quiet_ms",400), max_wait_ms=scroll.get("settle_ms",1200),
+                               is_product_api=is_product_api)
 
 @dataclass
 class Card:
@@ -68,6 +58,8 @@ class Card:
     img_alt: str=""
     img_src: str=""
     shot: str=""
+    img_hash: str=""     # 썸네일 perceptual hash (aHash+dHash, shots 꺼져 있으면 "")
+    fingerprint: str=""  # 추출 필드 + img_hash 내용 지문 (증분 비교용)
 
 def _extract_model(text:str, patterns:List[str])->str:
     if not text: return ""
@@ -76,80 +68,180 @@ def _extract_model(text:str, patterns:List[str])->str:
         if m: return m.group(0).upper()
     return ""
 
-def _crawl_page(pw, cfg_page:Dict[str,Any], defaults:Dict[str,Any], model_patterns:List[str])->List[Card]:
+# 카드 필드 키 → Card 속성 (텍스트 필드)
+_TEXT_KEYS = [
+    ("title","title"), ("price","price_text"), ("discount","discount_text"),
+    ("members","members_text"), ("installment","installment_text"),
+    ("rating","rating_text"), ("review_count","review_count_text"),
+    ("badges","badges_text"), ("shipping","shipping_text"), ("cta","cta_text")
+]
+
+# selectors 맵 전체를 한 번에 넘겨 모든 카드 필드를 evaluate 1회로 수집
+# querySelector 가 못 읽는 셀렉터(:has-text(), text=, >> 같은 Playwright 전용 문법)는 키를 bad 로 돌려주고
+# Python 쪽에서 그 필드만 locator 로 추출 (카드 셀렉터 자체가 그렇다면 전부 locator)
+_CARDS_JS = """
+({card, texts, image, max}) => {
+  const bad = [];
+  const ok = (k, s) => { if(!s) return false; try { document.querySelector(s); return true; } catch(e) { bad.push(k); return false; } };
+  if (!ok("card", card)) return {bad, rows: []};
+  const tsel = Object.entries(texts).filter(([k, s]) => ok(k, s));
+  const isel = ok("image", image) ? image : null;
+  const rows = Array.from(document.querySelectorAll(card)).slice(0, max).map(c => {
+    const row = {};
+    for (const [k, s] of tsel) { const el = c.querySelector(s); row[k] = el ? (el.innerText || "") : ""; }
+    const img = isel ? c.querySelector(isel) : null;
+    row.img_alt = img ? (img.getAttribute("alt") || "") : "";
+    row.img_src = img ? (img.getAttribute("src") || img.getAttribute("data-src") || "") : "";
+    return row;
+  });
+  return {bad, rows};
+}
+"""
+
+_FP_FIELDS = [attr for _,attr in _TEXT_KEYS] + ["img_alt","img_src","img_hash"]
+
+def _fingerprint(c:Card)->str:
+    return hashlib.sha1("\x1f".join(str(getattr(c, f) or "") for f in _FP_FIELDS).encode("utf-8")).hexdigest()[:16]
+
+def _card_fields_batch(page, sel:Dict[str,str], max_cards:int)->List[Dict[str,str]]:
+    res = page.evaluate(_CARDS_JS, {
+        "card": sel["card"], "image": sel.get("image",""), "max": max_cards,
+        "texts": {k: sel.get(k,"") for k,_ in _TEXT_KEYS}
+    })
+    bad = set(res["bad"])
+    cards = page.locator(sel["card"])
+    if "card" in bad:
+        return [_card_fields_locator(cards.nth(i), sel) for i in range(min(cards.count(), max_cards))]
+    out = []
+    for r in res["rows"]:
+        f = {attr: _clean(r.get(k,"")) for k,attr in _TEXT_KEYS}
+        f["img_alt"] = r.get("img_alt") or ""; f["img_src"] = r.get("img_src") or ""
+        out.append(f)
+    if bad and out:
+        with span("fields:locator_fallback", keys=",".join(sorted(bad)), cards=len(out)):
+            for i, f in enumerate(out): f.update(_card_fields_locator(cards.nth(i), sel, keys=bad))
+    return out
+
+def _card_fields_locator(c, sel:Dict[str,str], keys=None)->Dict[str,str]:
+    """카드 locator 기준 필드 추출 (keys 지정 시 그 셀렉터 키만 — _TEXT_KEYS 키와 "image")"""
+    def t(s): 
+        if not s: return ""
+        try:
+            el=c.locator(s).first
+            return _clean(el.inner_text()) if el.count() else ""
+        except: 
+            return ""
+    def a(s,attr):
+        if not s: return ""
+        try:
+            el=c.locator(s).first
+            return el.get_attribute(attr) or "" if el.count() else ""
+        except: 
+            return ""
+    f = {attr: t(sel.get(k,"")) for k,attr in _TEXT_KEYS if keys is None or k in keys}
+    if keys is None or "image" in keys:
+        f["img_alt"] = a(sel.get("image",""), "alt")
+        f["img_src"] = a(sel.get("image",""), "src") or a(sel.get("image",""),"data-src")
+    return f
+
+def _har(cfg_page:Dict[str,Any], defaults:Dict[str,Any])->Tuple[str,pathlib.Path]:
+    """HAR 모드(off|record|replay)와 페이지별 번들 경로 (YAML 의 off → False 도 off 로)"""
+    h = {**defaults.get("har",{}), **cfg_page.get("har",{})}
+    mode = str(h.get("mode") or "off").lower()
+    return mode, har_replay.bundle_path(cfg_page["url"], cfg_page["name"], h.get("dir", har_replay.HAR_DIR))
+
+def _crawl_page(pool:BrowserPool, cfg_page:Dict[str,Any], defaults:Dict[str,Any], model_patterns:List[str],
+                stats:Dict[str,Any]=None, timeline:spans.Timeline=None)->List[Card]:
     name = cfg_page["name"]; url = cfg_page["url"]; sel = cfg_page["selectors"]
     view = defaults.get("viewport", {"width":1440,"height":900})
     shots = cfg_page.get("shots", defaults.get("shots", True))
     max_cards = cfg_page.get("max_cards", defaults.get("max_cards", 120))
+    extract = cfg_page.get("extract", defaults.get("extract", "batch"))
     scroll = {**defaults.get("scroll",{}), **cfg_page.get("scroll",{})}
-
-    browser = pw.chromium.launch(headless=True)
-    ctx = browser.new_context(viewport=view, locale=defaults.get("locale","en-GB"))
-    page = ctx.new_page()
-    page.goto(url, wait_until=defaults.get("wait_until","networkidle"), timeout=120000)
-    _accept_cookies(page, cfg_page.get("accept_cookie_selector",""))
-    _autoscroll(page, scroll.get("step_px",1400), scroll.get("max_steps",20), scroll.get("settle_ms",1200))
-
-    page.wait_for_selector(sel["card"], timeout=15000)
-    cards = page.locator(sel["card"])
-    n = min(cards.count(), max_cards)
+    pg = {**defaults.get("pagination",{}), **cfg_page.get("pagination",{})}
+    net = {**defaults.get("network",{}), **cfg_page.get("network",{})}
+    har_mode, har_path = _har(cfg_page, defaults)
+    so = {**defaults.get("screenshots",{}), **cfg_page.get("screenshots",{})}
+    shot_kw = {"fmt": so.get("format","webp"), "quality": so.get("quality",80)}
 
     outdir = OUT / f"{name}"
     if shots: outdir.mkdir(exist_ok=True)
 
-    rows: List[Card] = []
-    for i in range(n):
-        c = cards.nth(i)
-        def t(s): 
-            if not s: return ""
-            try:
-                el=c.locator(s).first
-                return _clean(el.inner_text()) if el.count() else ""
-            except: 
-                return ""
-        def a(s,attr):
-            if not s: return ""
-            try:
-                el=c.locator(s).first
-                return el.get_attribute(attr) or "" if el.count() else ""
-            except: 
-                return ""
-
-        title = t(sel["title"])
-        price = t(sel["price"])
-        discount = t(sel.get("discount",""))
-        members = t(sel.get("members",""))
-        inst = t(sel.get("installment",""))
-        rating = t(sel.get("rating",""))
-        rcount = t(sel.get("review_count",""))
-        badges = t(sel.get("badges",""))
-        shipping = t(sel.get("shipping",""))
-        cta = t(sel.get("cta",""))
-        img_alt = a(sel.get("image",""), "alt")
-        img_src = a(sel.get("image",""), "src") or a(sel.get("image",""),"data-src")
-
-        model = _extract_model(" ".join([title, badges, img_alt]), model_patterns)
-
-        shot = ""
-        if shots:
-            fname = f"{i:03d}_{uuid.uuid4().hex[:6]}.png"
-            try:
-                c.screenshot(path=str(outdir/fname))
-                shot = f"{name}/{fname}"
-            except: 
-                pass
-
-        rows.append(Card(
-            page=name, url=url, idx=i, model_code=model,
-            title=title, price_text=price, discount_text=discount,
-            members_text=members, installment_text=inst,
-            rating_text=rating, review_count_text=rcount,
-            badges_text=badges, shipping_text=shipping,
-            cta_text=cta, img_alt=img_alt, img_src=img_src, shot=shot
-        ))
-
-    ctx.close(); browser.close()
-    return rows
+    def _harvest(p, pno:int)->List[Tuple[Dict[str,str],str]]:
+        """한 페이지(탭)의 카드 필드 + 스크린샷 경로"""
+        with span("wait_cards"): p.wait_for_selector(sel["card"], timeout=15000)
+        cards = p.locator(sel["card"])
+        with span(f"fields:{extract}") as sp:
+            if extract == "batch":
+                fields = _card_fields_batch(p, sel, max_cards)
+            else:
+                n = min(cards.count(), max_cards)
+                fields = [_card_fields_locator(cards.nth(i), sel) for i in range(n)]
+            sp["cards"] = len(fields)
+        names = [""] * len(fields)
+        if shots and fields:
+            with span(f"shots:{so.get('mode','batch')}", cards=len(fields)):
+                if so.get("mode","batch") == "batch":
+                    names = card_shots.capture(p, sel["card"], len(fields), outdir, tile_px=so.get("tile_px",8000), **shot_kw)
+                else:
+                    names = card_shots.capture_elements(cards, len(fields), outdir, **shot_kw)
+        return [(f, f"{name}/{n}" if n else "") for f, n in zip(fields, names + [""]*(len(fields)-len(names)))]
+
+    def _crawl(ctx)->List[Card]:
+        with spans.activated(timeline), span("crawl_page", page=name):
+            return _crawl_traced(ctx)
+
+    def _crawl_traced(ctx)->List[Card]:
+        policy = net_policy.RequestPolicy.from_config(net, shots=shots)
+        policy.attach(ctx)
+        har_replay.attach(ctx, har_mode, har_path)
+        with span("new_page"): page = ctx.new_page()
+        with span("goto"): page.goto(url, wait_until=defaults.get("wait_until","networkidle"), timeout=120000)
+        with span("cookies"): _accept_cookies(page, cfg_page.get("accept_cookie_selector",""))
+        with span("load_more") as sp:
+            clicks = sp["clicks"] = pagination.click_load_more(page, sel["card"], max_clicks=pg.get("max_clicks",30)) \
+                                    if pg.get("load_more",True) else 0
+        with span("scroll") as sp:
+            added = _autoscroll(page, sel["card"], scroll); sp["steps"] = len(added or [])
+
+        with span("harvest"): groups = [_harvest(page, 1)]
+        # 번호 페이지(?page=N) — 같은 컨텍스트의 탭으로 병렬 로드, 사이트 순서대로 병합
+        more = pagination.numbered_page_urls(page, pg.get("max_pages",10)) if pg.get("numbered",True) else []
+        if more:
+            def _tab(p, pno):
+                _autoscroll(p, sel["card"], scroll)
+                return _harvest(p, pno)
+            with span("numbered_pages", pages=len(more)):
+                groups += pagination.crawl_pages(ctx, more, _tab, concurrency=pg.get("concurrency",3))
+        merged = pagination.merge_ordered(groups, key=lambda fs: tuple(fs[0].values()) if any(fs[0].values()) else id(fs))
+        net_report = policy.report()
+        if stats is not None:
+            stats.update(scroll_added=added, load_more_clicks=clicks, pages=1+len(more))
+            stats["network"] = net_report
+
+        rows: List[Card] = []
+        with span("cards", net_requests=net_report["allowed"]["count"], net_bytes=net_report["allowed"]["bytes"]) as sp:
+            for i, (f, shot) in enumerate(merged[:max_cards]):
+                model = _extract_model(" ".join([f["title"], f["badges_text"], f["img_alt"]]), model_patterns)
+                ph = img_hash.hash_file(OUT/shot) if shot else ""
+                rows.append(Card(page=name, url=url, idx=i, model_code=model, shot=shot, img_hash=ph, **f))
+            sp["cards"] = len(rows)
+        return rows
+
+    return pool.run(_crawl, viewport=view, locale=defaults.get("locale","en-GB"),
+                    **har_replay.context_kwargs(har_mode, har_path))
+
+def _crawl_key(cfg_page:Dict[str,Any], defaults:Dict[str,Any], model_patterns:List[str])->str:
+    """URL/뷰포트/로케일/셀렉터/패턴 + _crawl_page 결과에 영향을 주는 모든 옵션 기준 카드 캐시 키
+    (dict 옵션은 _crawl_page 와 같게 defaults 위에 페이지 값을 병합)"""
+    opt = lambda k, d=None: cfg_page.get(k, defaults.get(k, d))
+    merged = lambda k: {**defaults.get(k,{}), **cfg_page.get(k,{})}
+    return result_cache.make_key(
+        "crawl_page", url=cfg_page["url"], name=cfg_page["name"], viewport=defaults.get("viewport"),
+        locale=defaults.get("locale","en-GB"), selectors=cfg_page["selectors"], patterns=model_patterns,
+        wait_until=defaults.get("wait_until","networkidle"), cookies=cfg_page.get("accept_cookie_selector",""),
+        opts={**{k: opt(k) for k in ("shots","max_cards","extract")},
+              **{k: merged(k) for k in ("scroll","pagination","network","screenshots")}})
 
 _FIELDS = [
     ("price_text","가격"), ("discount_text","할인율/세이빙"),
@@ -159,91 +251,180 @@ _FIELDS = [
     ("review_count_text","리뷰수"), ("title","상품명")
 ]
 
-def _diff_cards(df_as:pd.Series, df_tb:pd.Series)->Dict[str,Any]:
-    out = {"model_code": df_as.model_code}
+def _diff_frame(df_as:pd.DataFrame, df_tb:pd.DataFrame, market_as:str="uk", market_tb:str="uk")->pd.DataFrame:
+    """행 순서로 짝지어진 AS-IS/TO-BE 카드 → 필드별 유사도/값, 가격 차이 (열 단위 일괄 계산)
+    가격은 각 페이지 시장의 숫자 형식으로 파싱, 통화가 다르면 차이는 비움"""
+    out = pd.DataFrame({"model_code": df_as["model_code"].to_numpy()})
+    n = len(out)
     for col, _label in _FIELDS:
-        left = _clean(df_as[col]); right = _clean(df_tb[col])
+        left = _clean_col(df_as[col]) if col in df_as else pd.Series([""]*n)
+        right = _clean_col(df_tb[col]) if col in df_tb else pd.Series([""]*n)
         if col=="price_text":
-            ln, rn = _to_num(left), _to_num(right)
-            if not math.isnan(ln) and not math.isnan(rn):
-                out["price_diff_abs"] = rn - ln
-                out["price_diff_pct"] = None if ln==0 else (rn-ln)/ln*100
-        sim = fuzz.token_set_ratio(left, right) if (left or right) else 100
-        out[col+"_sim"] = sim
-        out[col+"_asis"] = left
-        out[col+"_tobe"] = right
+            pl, pr = prices.parse_col(left, market_as), prices.parse_col(right, market_tb)
+            same = (pl.currency == pr.currency).to_numpy()
+            ln, rn = pl.amount.to_numpy(), np.where(same, pr.amount.to_numpy(), np.nan)
+            out["price_diff_abs"] = rn - ln
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out["price_diff_pct"] = np.where(ln != 0, (rn-ln)/ln*100, np.nan)
+        lv, rv = left.tolist(), right.tolist()
+        sim = process.cpdist(lv, rv, scorer=fuzz.token_set_ratio, dtype=np.float64, workers=-1) if n else np.empty(0)
+        empty = (left == "").to_numpy() & (right == "").to_numpy()
+        out[col+"_sim"] = np.where(empty, 100.0, sim)
+        out[col+"_asis"] = lv
+        out[col+"_tobe"] = rv
+    ha = df_as["img_hash"] if "img_hash" in df_as else [""]*n
+    hb = df_tb["img_hash"] if "img_hash" in df_tb else [""]*n
+    out["visual_sim"] = img_hash.similarity(list(ha), list(hb))
     return out
 
-def _save_html(pair_rows:List[Dict[str,Any]], shots:Dict[str,Tuple[str,str]], path:pathlib.Path):
-    html = ["<html><head><meta charset='utf-8'><style>",
-            "table{border-collapse:collapse;width:100%}td,th{border:1px solid #ddd;padding:6px;font-family:Arial}th{background:#fafafa}",
-            ".fail{background:#ffe8e8}.ok{background:#eaffea}.center{text-align:center}",
-            ".shots{display:flex;gap:8px}.shots img{height:180px;border:1px solid #ddd;border-radius:8px}",
-            "</style></head><body>",
-            "<h2>PLP 카드 비교 리포트</h2>"]
-
-    for row in pair_rows:
-        model = row["model_code"] or "(Unmatched)"
-        html.append(f"<h3>{model}</h3>")
-        s_as, s_tb = shots.get(model, ("",""))
-        if s_as or s_tb:
-            html += ["<div class='shots'>",
-                     f"<div><div class='center'><b>ASIS</b></div><img src='{s_as}'/></div>",
-                     f"<div><div class='center'><b>TOBE</b></div><img src='{s_tb}'/></div>",
-                     "</div>"]
-        html.append("<table><tr><th>항목</th><th>AS-IS</th><th>TO-BE</th><th>유사도(%)</th></tr>")
-        for col,label in _FIELDS:
-            asis, tobe, sim = row[col+'_asis'], row[col+'_tobe'], row[col+'_sim']
-            cls = "ok" if sim>=85 else "fail"
-            html.append(f"<tr class='{cls}'><td>{label}</td><td>{asis}</td><td>{tobe}</td><td class='center'>{sim}</td></tr>")
-        if "price_diff_abs" in row and row["price_diff_abs"] is not None:
-            pdiff = row["price_diff_pct"]
-            html.append(f"<tr><td><b>가격 차이</b></td><td colspan='3'>Abs: {row['price_diff_abs']:.0f} | Pct: {pdiff:+.2f}%</td></tr>")
-        html.append("</table><hr/>")
-    html.append("</body></html>")
-    path.write_text("\n".join(html), encoding="utf-8")
-
-def run_compare(config_path: str = "config.yml") -> dict:
-    """크롤링 + 비교 실행, outputs 폴더에 저장 후 요약 반환"""
+def _records(df:pd.DataFrame, chunk:int=500):
+    """DataFrame 행 → dict (NaN 은 None), chunk 행씩만 변환해 흘려보냄 (리포트용)"""
+    for i in range(0, len(df), chunk):
+        part = df.iloc[i:i+chunk]
+        yield from part.astype(object).where(part.notna(), None).to_dict("records")
+
+def _history_scope(pages:List[Dict[str,Any]])->str:
+    """이력 저장소의 비교 대상 키 — 페이지 이름+URL 이 같은 실행끼리만 직전 실행 값(지문/썸네일)을 비교"""
+    return hashlib.sha1(json.dumps(sorted((p["name"], p["url"]) for p in pages)).encode("utf-8")).hexdigest()[:16]
+
+def _prev_hashes()->Dict[Tuple[str,str],str]:
+    """(이력 저장소를 끈 경우) 가장 최근 raw CSV 의 (page, model_code) → img_hash (없으면 빈 dict)"""
+    last = max(OUT.glob("raw_*.csv"), default=None)
+    if last is None: return {}
+    try:
+        p = pd.read_csv(last, usecols=["page","model_code","img_hash"], dtype=str).dropna()
+    except (ValueError, OSError):   # img_hash 열이 없던 이전 형식
+        return {}
+    return {(r.page, r.model_code): r.img_hash for r in p.itertuples(index=False)}
+
+def run_compare(config_path: str = "config.yml", pool:BrowserPool=None, force_refresh:bool=False,
+                har_mode:str=None, incremental:bool=None) -> dict:
+    """크롤링 + 비교 실행, outputs 폴더에 저장 후 요약 반환
+    (pool 미지정 시 실행 동안만 쓰는 풀 생성, force_refresh 면 카드 캐시 무시,
+     har_mode 지정 시 config 의 har.mode 대신 사용 — record/replay 중엔 카드 캐시 안 씀,
+     incremental: None 이면 history.incremental 설정, True/False 로 덮어쓰기 — 직전 실행과 같은 카드 쌍은 생략)
+    단계별 span 타임라인은 outputs/timeline_<ts>.json, 이름별 합계는 반환값 "timeline" """
+    ts = time.strftime("%Y%m%d_%H%M%S")
+    tl = spans.Timeline(f"run_compare {config_path} {ts}")
+    with tl.activate(), span("run_compare"):
+        res = _run_compare(config_path, pool, force_refresh, har_mode, incremental, ts, tl)
+    res["timeline_path"] = str(tl.write_json(OUT/f"timeline_{ts}.json"))
+    res["timeline"] = tl.summary()
+    return res
+
+def _run_compare(config_path:str, pool:BrowserPool, force_refresh:bool, har_mode:str, incremental:bool,
+                 ts:str, tl:spans.Timeline) -> dict:
     cfg = _read_config(config_path)
     defaults = cfg.get("defaults", {})
+    if har_mode: defaults["har"] = {**defaults.get("har",{}), "mode": har_mode}
     patterns = cfg.get("model_patterns", [])
-
-    with sync_playwright() as pw:
+    cc = defaults.get("cache", {})
+    cache = result_cache.ResultCache(ttl_sec=cc.get("ttl_sec", 6*3600), max_entries=cc.get("max_entries", 500)) \
+            if cc.get("enabled", True) else None
+
+    own_pool = pool is None
+    if own_pool:
+        pc = defaults.get("pool", {})
+        pool = BrowserPool(size=pc.get("size", 2), max_uses=pc.get("max_uses", 20))
+    crawl_stats: Dict[str,Dict[str,Any]] = {}
+    try:
         all_cards: List[Card] = []
         for page_cfg in cfg["pages"]:
-            all_cards += _crawl_page(pw, page_cfg, defaults, patterns)
-
-    df = pd.DataFrame([asdict(c) for c in all_cards])
-    ts = time.strftime("%Y%m%d_%H%M%S")
+            stats = crawl_stats.setdefault(page_cfg["name"], {})
+            key = _crawl_key(page_cfg, defaults, patterns)
+            use_cache = cache is not None and _har(page_cfg, defaults)[0] == "off"
+            with span("cache_lookup", page=page_cfg["name"]) as sp:
+                hit = None if (force_refresh or not use_cache) else cache.get(key)
+                sp["hits"] = int(hit is not None)
+            if hit is not None:
+                all_cards += [Card(**c) for c in hit]; stats["cached"] = True
+                continue
+            cards = _crawl_page(pool, page_cfg, defaults, patterns, stats, tl)
+            if use_cache and cards: cache.put(key, "crawl_page", [asdict(c) for c in cards])
+            all_cards += cards
+    finally:
+        if own_pool: pool.close()
+
+    for c in all_cards: c.fingerprint = c.fingerprint or _fingerprint(c)   # 캐시된 이전 형식 카드 포함
+    df = pd.DataFrame([asdict(c) for c in all_cards], columns=list(Card.__dataclass_fields__))
+    hc = defaults.get("history",{})
+    history = RunHistory() if hc.get("enabled", True) else None
+    scope = _history_scope(cfg["pages"])
+    prev = history.last_values("img_hash", scope) if history else _prev_hashes()
+    prev_fp = history.last_values("fingerprint", scope) if (history and incremental is not False and
+                                                     (incremental or hc.get("incremental", False))) else None
+    mk = {p["name"]: p.get("market") or markets.guess_market_and_lang(p["url"])[0] for p in cfg["pages"]}
     raw_path = OUT/f"raw_{ts}.csv"
     df.to_csv(raw_path, index=False, encoding="utf-8-sig")
 
     df_as = df[df.page=="ASIS"].copy()
     df_tb = df[df.page=="TOBE"].copy()
 
-    rep_as = df_as.sort_values("idx").drop_duplicates("model_code", keep="first").set_index("model_code")
-    rep_tb = df_tb.sort_values("idx").drop_duplicates("model_code", keep="first").set_index("model_code")
-
-    common = [m for m in rep_as.index if m and m in rep_tb.index]
-    pairs = []
-    shot_map = {}
-    for m in common:
-        row = _diff_cards(rep_as.loc[m], rep_tb.loc[m])
-        pairs.append(row)
-        shot_map[m] = (rep_as.loc[m,"shot"], rep_tb.loc[m,"shot"])
-
-    only_as = [m for m in rep_as.index if m and m not in rep_tb.index]
-    only_tb = [m for m in rep_tb.index if m and m not in rep_as.index]
+    rep_as = df_as.sort_values("idx").drop_duplicates("model_code", keep="first")
+    rep_tb = df_tb.sort_values("idx").drop_duplicates("model_code", keep="first")
+    rec_as = [r for r in rep_as.to_dict("records") if r["model_code"]]
+    rec_tb = [r for r in rep_tb.to_dict("records") if r["model_code"]]
+
+    # 정확 → 지역 접미사 제거 → (match.fuzzy>0) 근접 매칭 순, 1:1
+    code = lambda r: r["model_code"]
+    with span("match"):
+        matched, un_as, un_tb = model_index.match(rec_as, rec_tb, key_a=code,
+                                                  fuzzy=defaults.get("match",{}).get("fuzzy", 0))
+    # 증분: 직전 저장 실행과 양쪽 지문이 같은 쌍은 비교/리포트에서 제외하고 개수만 집계
+    changes, removed = None, {}
+    if prev_fp is not None:
+        def _status(a, b):
+            pa, pb = prev_fp.get(("ASIS", a["model_code"])), prev_fp.get(("TOBE", b["model_code"]))
+            if pa is None or pb is None: return "new"
+            return "unchanged" if (pa, pb) == (a["fingerprint"], b["fingerprint"]) else "changed"
+        status = [_status(a, b) for a,b,_ in matched]
+        changes = {k: status.count(k) for k in ("new","changed","unchanged")}
+        matched = [m for m,st in zip(matched, status) if st != "unchanged"]
+        status = [st for st in status if st != "unchanged"]
+        now = set(zip(df["page"], df["model_code"]))
+        for pg, m in sorted(k for k in prev_fp if k not in now and k[1]):
+            removed.setdefault(pg, []).append(m)
+    with span("diff", pairs=len(matched)):
+        diff = _diff_frame(pd.DataFrame([a for a,_,_ in matched], columns=df.columns),
+                           pd.DataFrame([b for _,b,_ in matched], columns=df.columns),
+                           mk.get("ASIS", "uk"), mk.get("TOBE", "uk"))
+    if any(t != "exact" for _,_,t in matched):
+        diff["model_code_tobe"] = [b["model_code"] if t != "exact" else None for _,b,t in matched]
+        diff["match"] = [t for _,_,t in matched]
+    if changes is not None: diff["change"] = status
+    # 직전 실행(이력 저장소, 꺼져 있으면 raw CSV)의 같은 페이지/모델 썸네일과 비교
+    diff["visual_sim_prev_asis"] = img_hash.similarity([a["img_hash"] for a,_,_ in matched],
+                                                       [prev.get(("ASIS", a["model_code"])) for a,_,_ in matched])
+    diff["visual_sim_prev_tobe"] = img_hash.similarity([b["img_hash"] for _,b,_ in matched],
+                                                       [prev.get(("TOBE", b["model_code"])) for _,b,_ in matched])
+    shot_map = {a["model_code"]: (a["shot"], b["shot"]) for a,b,_ in matched}
+
+    only_as = [code(r) for r in un_as]
+    only_tb = [code(r) for r in un_tb]
 
     diff_csv = OUT/f"diff_{ts}.csv"
-    pd.DataFrame(pairs).to_csv(diff_csv, index=False, encoding="utf-8-sig")
+    diff.to_csv(diff_csv, index=False, encoding="utf-8-sig")
 
     html = OUT/f"report_{ts}.html"
-    _save_html(pairs, shot_map, html)
-
-    summary_cols = ["model_code"] + [c+"_sim" for c,_ in _FIELDS]
-    summary = pd.DataFrame(pairs)[summary_cols] if pairs else pd.DataFrame(columns=summary_cols)
+    with span("report", rows=len(diff)):
+        report_html.write_report(_records(diff), shot_map, html, _FIELDS, total=len(diff),
+                                 page_size=defaults.get("report",{}).get("page_size", 50),
+                                 extra={"AS-IS 미매칭": len(only_as), "TO-BE 미매칭": len(only_tb),
+                                        **({"변경 없음(직전 실행과 동일, 생략)": changes["unchanged"],
+                                            "신규/변경": f"{changes['new']}/{changes['changed']}",
+                                            "직전 실행 대비 사라진 모델": removed or "-"} if changes else {})})
+
+    run_id = None
+    if history:
+        cards = df.assign(market=df["page"].map(mk).fillna("uk"))
+        parsed = [prices.parse_col(g["price_text"], m) for m, g in cards.groupby("market")]
+        if parsed: cards = cards.join(pd.concat(parsed)[["amount","currency"]].rename(columns={"amount":"price"}))
+        with span("history"):
+            run_id = history.add_run(ts, cards, diff, meta={"config": config_path, "pages": list(mk),
+                                     "unmatched_as_is": len(only_as), "unmatched_to_be": len(only_tb)}, scope=scope)
+
+    summary_cols = ["model_code"] + [c+"_sim" for c,_ in _FIELDS] + ["visual_sim"]
+    summary = diff[summary_cols]
 
     return {
         "summary": summary,
@@ -251,8 +432,16 @@ def run_compare(config_path: str = "config.yml") -> dict:
         "html_path": str(html),
         "raw_path": str(raw_path),
         "unmatched_as_is": only_as,
-        "unmatched_to_be": only_tb
+        "unmatched_to_be": only_tb,
+        "crawl_stats": crawl_stats,
+        "run_id": run_id,
+        "changes": changes,
+        "removed": removed
     }
 
 if __name__ == "__main__":
-    print(run_compare("config.yml"))
+    har = next((m for m in ("record","replay") if f"--{m}" in sys.argv), None)
+    inc = True if "--incremental" in sys.argv else (False if "--full" in sys.argv else None)
+    res = run_compare("config.yml", force_refresh="--refresh" in sys.argv, har_mode=har, incremental=inc)
+    print(res)
+    print(f"\n[단계별 시간] {res['timeline_path']}\n" + pd.DataFrame(res["timeline"]).fillna("").to_string(index=False))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# 상품 API 엔드포인트 카탈로그
+# - 브라우저 수집 중 모델을 만들어 낸 엔드포인트(URL/메서드/바디/스키마 경로)를 시장별로 저장
+# - 다음 실행에서는 APIRequestContext 로 직접 호출(페이지 파라미터 증가) → PLP 렌더링 생략
+# - 응답 스키마(모델 레코드 경로)가 학습 때와 다르면 빈 결과 → 호출측에서 브라우저 폴백
+# - API 키 헤더(SECRET_HEADERS)는 파일에 저장하지 않음
+import json, time, hashlib, pathlib, threading
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+CATALOG_PATH = pathlib.Path("outputs") / "endpoint_catalog.json"
+MODEL_KEYS = ("modelCode","model","code","sku")
+PAGE_KEYS = ("page","pageno","pagenumber","pagenum","currentpage","pageindex")
+OFFSET_KEYS = ("offset","start","from","skip")
+SIZE_KEYS = ("limit","rows","size","pagesize","per_page","perpage","count")
+KEEP_HEADERS = ("content-type","accept","x-api-key","x-requested-with")   # 같은 실행 안의 API 페이지 호출용
+SECRET_HEADERS = ("x-api-key",)   # 디스크 카탈로그에는 쓰지 않음 (키가 필요한 엔드포인트는 직접 호출 실패 → 브라우저 폴백)
+MAX_ENDPOINTS = 5
+
+_lock = threading.Lock()
+
+def model_paths(obj, path:str="", out:Optional[Set[str]]=None)->Set[str]:
+    """모델 키를 가진 dict 들의 경로 집합 (리스트 인덱스는 [] 로 접음) — 스키마 지문"""
+    out = set() if out is None else out
+    if isinstance(obj, dict):
+        if any(obj.get(k) for k in MODEL_KEYS): out.add(path or "$")
+        for k,v in obj.items():
+            if isinstance(v,(dict,list)): model_paths(v, f"{path}.{k}" if path else k, out)
+    elif isinstance(obj, list):
+        for v in obj[:50]: model_paths(v, path+"[]", out)
+    return out
+
+def _market_key(plp_url:str, market:str)->str:
+    return market or (urlparse(plp_url).hostname or "")
+
+def load()->Dict[str,Any]:
+    try: return json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    except Exception: return {}
+
+def lookup(plp_url:str, market:str="")->Optional[Dict[str,Any]]:
+    return load().get(_market_key(plp_url, market), {}).get(plp_url.strip())
+
+def _persisted_headers(h:Optional[Dict[str,str]])->Dict[str,str]:
+    return {k:v for k,v in (h or {}).items() if k.lower() in KEEP_HEADERS and k.lower() not in SECRET_HEADERS}
+
+def learn(plp_url:str, market:str, endpoints:List[Dict[str,Any]], cta_types:Dict[str,Any]):
+    """endpoints: [{url, method, body, headers, paths}] — 모델을 만든 응답만 전달"""
+    eps, seen = [], set()
+    for ep in endpoints:
+        key = (ep["method"], ep["url"], ep.get("body") or "")
+        if key in seen or not ep.get("paths"): continue
+        seen.add(key)
+        eps.append({
+            "url": ep["url"], "method": ep["method"].upper(), "body": ep.get("body") or None,
+            "headers": _persisted_headers(ep.get("headers")),
+            "paths": sorted(ep["paths"]),
+        })
+        if len(eps) >= MAX_ENDPOINTS: break
+    if not eps: return
+    with _lock:
+        cat = load()
+        for entries in cat.values():   # 이전 버전이 저장한 키도 지움
+            for ent in entries.values():
+                for e in ent.get("endpoints", []): e["headers"] = _persisted_headers(e.get("headers"))
+        cat.setdefault(_market_key(plp_url, market), {})[plp_url.strip()] = {
+            "endpoints": eps, "cta_types": dict(cta_types or {}), "learned_at": int(time.time())
+        }
+        CATALOG_PATH.parent.mkdir(exist_ok=True)
+        tmp = CATALOG_PATH.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cat, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(CATALOG_PATH)
+
+def _page_param(d:Dict[str,Any]):
+    """(키, 시작값, 증가폭) — page 계열은 1씩, offset 계열은 page size 만큼"""
+    low = {str(k).lower(): k for k in d}
+    for pk in PAGE_KEYS:
+        if pk in low:
+            try: return low[pk], int(d[low[pk]]), 1
+            except (TypeError, ValueError): pass
+    for ok in OFFSET_KEYS:
+        if ok in low:
+            size = next((d[low[s]] for s in SIZE_KEYS if s in low), None)
+            try: return low[ok], int(d[low[ok]]), max(1, int(size))
+            except (TypeError, ValueError): pass
+    return None
+
+def page_requests(ep:Dict[str,Any], max_pages:int):
+    """학습된 요청에서 페이지 파라미터를 찾아 (url, body) 를 차례로 생성"""
+    url, body = ep["url"], ep.get("body")
+    yield url, body
+    parsed = urlparse(url); q = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    pp = _page_param(q)
+    if pp:
+        k, v, step = pp
+        for i in range(1, max_pages):
+            q[k] = str(v + i*step)
+            yield urlunparse(parsed._replace(query=urlencode(q))), body
+        return
+    try: jb = json.loads(body) if body else None
+    except Exception: jb = None
+    if isinstance(jb, dict):
+        target = jb.get("variables") if isinstance(jb.get("variables"), dict) else jb
+        pp = _page_param(target)
+        if pp:
+            k, v, step = pp
+            for i in range(1, max_pages):
+                target[k] = v + i*step
+                yield url, json.dumps(jb)
+
+def fetch_json(request_ctx, method:str, url:str, body=None, headers=None, timeout_ms:int=15000):
+    """APIRequestContext 호출 → (raw bytes, JSON) — 실패/비JSON 이면 (b"", None)"""
+    try:
+        resp = request_ctx.fetch(url, method=method, headers=headers or None, data=body, timeout=timeout_ms)
+        raw = resp.body() if resp.ok else b""
+        return raw, (json.loads(raw) if raw else None)
+    except Exception:
+        return b"", None
+
+def replay(request_ctx, entry:Dict[str,Any], max_pages:int=20, timeout_ms:int=15000)->List[Dict[str,Any]]:
+    """APIRequestContext 로 학습된 엔드포인트 직접 호출. 첫 페이지 스키마 불일치 시 [] (브라우저 폴백)"""
+    payloads = []
+    for ep in entry.get("endpoints", []):
+        learned, seen = set(ep.get("paths") or []), set()
+        for i, (url, body) in enumerate(page_requests(ep, max_pages)):
+            raw, data = fetch_json(request_ctx, ep["method"], url, body, ep.get("headers"), timeout_ms)
+            if data is None or not (model_paths(data) & learned):
+                if i == 0: return []
+                break
+            digest = hashlib.sha1(raw).hexdigest()
+            if digest in seen: break
+            seen.add(digest)
+            payloads.append({"url": url, "data": data})
+    return payloads
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# HAR 기록/재생 (오프라인·결정적 재실행)
+# - record: 컨텍스트 생성 시 record_har_path 지정 → 컨텍스트 종료 시 outputs/har/<slug>.har.zip 저장 (본문 포함)
+# - replay: ctx.route_from_har(not_found="abort") 로 모든 요청을 번들에서 응답 → 네트워크 없음
+# - APIRequestContext 호출은 라우팅을 타지 않으므로 record/replay 중에는 호출측에서 끔
+import re, hashlib, pathlib
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+HAR_DIR = pathlib.Path("outputs") / "har"
+MODES = ("off", "record", "replay")
+
+def bundle_path(url:str, name:str="", root:pathlib.Path=HAR_DIR)->pathlib.Path:
+    u = urlparse(url)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", f"{u.hostname or ''}{u.path}").strip("_")[:120] or "page"
+    if u.query: slug += "_" + hashlib.sha1(u.query.encode("utf-8")).hexdigest()[:8]
+    stem = f"{name}_{slug}" if name else slug
+    return pathlib.Path(root) / f"{stem}.har.zip"
+
+def context_kwargs(mode:str, path:pathlib.Path)->Dict[str,Any]:
+    """browser.new_context 에 더할 인자 (service worker 는 기록/재생 누락 방지를 위해 차단)"""
+    if mode == "record":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return {"record_har_path": str(path), "record_har_content": "attach", "record_har_mode": "full",
+                "service_workers": "block"}
+    if mode == "replay":
+        return {"service_workers": "block"}
+    return {}
+
+def attach(ctx, mode:str, path:pathlib.Path):
+    """replay 모드면 번들을 라우팅에 연결 — 다른 route 보다 나중에 등록해야 우선 적용됨"""
+    if mode != "replay": return
+    if not path.exists():
+        raise FileNotFoundError(f"HAR 번들 없음: {path} (record 모드로 먼저 수집)")
+    ctx.route_from_har(str(path), not_found="abort")
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# 카드 썸네일 perceptual hash (aHash 64bit + dHash 64bit → 32자리 hex)
+# - card_shots 크롭 스레드에서 메모리 이미지로 바로 계산해 파일명(픽셀 해시) 기준으로 기억
+# - 비교는 uint64 배열 XOR + popcount 로 열 단위 일괄 계산, visual_sim = 128bit 중 같은 비트 비율(%)
+import threading, pathlib
+from collections import OrderedDict
+from typing import Optional, Sequence
+import numpy as np
+from PIL import Image
+
+BITS = 128
+MEMO_MAX = 4096   # 장시간 실행(Streamlit/풀) 에서도 메모리 상한 — 오래 안 쓴 것부터 버림
+_memo: "OrderedDict[str,str]" = OrderedDict()   # 썸네일 파일명(내용 해시) → phash (LRU)
+_lock = threading.Lock()
+
+def hash_image(im:Image.Image)->str:
+    g = im.convert("L")
+    a = np.asarray(g.resize((8, 8), Image.BILINEAR), dtype=np.float32)
+    d = np.asarray(g.resize((9, 8), Image.BILINEAR), dtype=np.float32)
+    abits = (a > a.mean()).ravel()
+    dbits = (d[:, 1:] > d[:, :-1]).ravel()
+    pack = lambda bits: int.from_bytes(np.packbits(bits).tobytes(), "big")
+    return f"{pack(abits):016x}{pack(dbits):016x}"
+
+def remember(fname:str, h:str):
+    with _lock:
+        _memo[fname] = h; _memo.move_to_end(fname)
+        while len(_memo) > MEMO_MAX: _memo.popitem(last=False)
+
+def _recall(fname:str)->Optional[str]:
+    with _lock:
+        h = _memo.get(fname)
+        if h: _memo.move_to_end(fname)
+        return h
+
+def hash_file(path:pathlib.Path)->str:
+    """썸네일 파일의 phash (같은 파일명이면 재계산하지 않음). 실패 시 "" """
+    path = pathlib.Path(path)
+    h = _recall(path.name)
+    if h: return h
+    try:
+        with Image.open(path) as im: h = hash_image(im)
+    except Exception:
+        return ""
+    remember(path.name, h); return h
+
+def _to_u64(hashes:Sequence[Optional[str]]):
+    """hex 목록 → (n,2) uint64 배열 + 유효 마스크"""
+    arr = np.zeros((len(hashes), 2), dtype=np.uint64)
+    ok = np.zeros(len(hashes), dtype=bool)
+    for i, h in enumerate(hashes):
+        if isinstance(h, str) and len(h) == 32:
+            arr[i] = (int(h[:16], 16), int(h[16:], 16)); ok[i] = True
+    return arr, ok
+
+def _popcount(x:np.ndarray)->np.ndarray:
+    if hasattr(np, "bitwise_count"): return np.bitwise_count(x).astype(np.int64)
+    return np.unpackbits(x.view(np.uint8), axis=-1).reshape(*x.shape, 64).sum(-1)
+
+def similarity(a:Sequence[Optional[str]], b:Sequence[Optional[str]])->np.ndarray:
+    """행 단위 visual_sim(0~100). 어느 한쪽 해시가 없으면 NaN"""
+    ua, oka = _to_u64(a); ub, okb = _to_u64(b)
+    dist = _popcount(ua ^ ub).sum(axis=1)
+    return np.where(oka & okb, 100.0 * (1 - dist / BITS), np.nan)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# 백그라운드 비교 작업 — Streamlit 스크립트 스레드를 막지 않고 수집 (위젯 변경/rerun 에도 계속 진행)
+# - JobManager 는 프로세스당 1개 (app 은 st.cache_resource) → 세션이 여러 개여도 동시 실행 상한(max_workers) 공유
+# - 상한을 넘는 작업은 대기열(queued), 대기 중인 작업만 취소 가능
+# - Job 은 엔진 progress/log 콜백을 받아 URL별 단계·부분 결과(모델, cta_types)를 잠금 아래 갱신
+#   UI 는 snapshot() 으로 폴링 (streamlit 을 import 하지 않음)
+import time, uuid, threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+class Job:
+    def __init__(self, label:str, urls:List[str]):
+        self.id = uuid.uuid4().hex[:8]
+        self.label, self.urls = label, list(urls)
+        self.status = "queued"          # queued | running | done | error | cancelled
+        self.created, self.started, self.finished = time.time(), None, None
+        self.result: Any = None
+        self.error: str = ""
+        self.future: Optional[Future] = None
+        self._partial: Dict[str,Dict[str,Any]] = {u: {"phase": "queued"} for u in self.urls}
+        self._logs: deque = deque(maxlen=300)
+        self._lock = threading.Lock()
+
+    # 엔진 콜백 (풀 워커 스레드에서 호출)
+    def update(self, url:str, phase:str, **data):
+        with self._lock:
+            cur = self._partial.setdefault(url, {})
+            cur.update(data); cur["phase"] = phase; cur["t"] = time.time()
+
+    def log(self, msg, level:str="debug"):
+        with self._lock: self._logs.append((time.time(), level, msg))
+
+    def snapshot(self)->Dict[str,Any]:
+        """UI 표시용 복사본"""
+        with self._lock:
+            return {"id": self.id, "label": self.label, "urls": self.urls, "status": self.status,
+                    "created": self.created, "started": self.started, "finished": self.finished,
+                    "elapsed": ((self.finished or time.time()) - self.started) if self.started else 0.0,
+                    "partial": {u: dict(v) for u, v in self._partial.items()},
+                    "logs": list(self._logs), "result": self.result, "error": self.error}
+
+class JobManager:
+    def __init__(self, max_workers:int=2, keep:int=50):
+        self.max_workers = max(1, int(max_workers))
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="plp-job")
+        self._jobs: Dict[str,Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn:Callable[[Job],Any], label:str, urls:List[str])->str:
+        """fn(job) 을 백그라운드로 실행 → job_id. fn 의 반환값이 job.result"""
+        job = Job(label, urls)
+        def _run():
+            with job._lock:
+                if job.status == "cancelled": return
+                job.status, job.started = "running", time.time()
+            try:
+                res, status, err = fn(job), "done", ""
+            except BaseException as e:
+                res, status, err = None, "error", f"{type(e).__name__}: {e}"
+            with job._lock:
+                job.result, job.status, job.error, job.finished = res, status, err, time.time()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(_run)
+        return job.id
+
+    def get(self, job_id:str)->Optional[Job]:
+        with self._lock: return self._jobs.get(job_id)
+
+    def cancel(self, job_id:str)->bool:
+        """대기 중인 작업만 취소 (실행 중인 브라우저 작업은 중단하지 않음)"""
+        job = self.get(job_id)
+        if not job or not job.future or not job.future.cancel(): return False
+        with job._lock: job.status, job.finished = "cancelled", time.time()
+        return True
+
+    def active(self)->int:
+        with self._lock: return sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+
+    def _prune(self):
+        """끝난 작업은 최근 keep 개만 보관"""
+        done = sorted((j for j in self._jobs.values() if j.status in ("done", "error", "cancelled")), key=lambda j: j.created)
+        for j in done[:max(0, len(done) - self.keep)]:
+            self._jobs.pop(j.id, None)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# 상품 API JSON 캡처 파이프라인
+# - 응답 콜백에서는 본문 bytes 만 받아 해시 → 중복 제거 → 워커 스레드로 넘김 (콜백에서 파싱하지 않음)
+# - 워커에서 json 파싱 후 즉시 압축 레코드(rows: Model/Title, paths: 모델 경로)로 축소
+# - 원본은 keep_raw(디버그 보관)일 때만 유지, 페이지당 메모리 상한(대기 + 보관 바이트) 초과 시 스킵
+import json, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import endpoint_catalog
+
+MAX_TEXT_BODY = 2_000_000   # content-type 이 json 이 아닌 본문 상한 (기존 동작 유지)
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="plp-json")
+
+def walk_rows(obj)->List[Dict[str,str]]:
+    """modelCode/model/code/sku + name/title 을 가진 dict 를 Model/Title 행으로"""
+    rows: List[Dict[str,str]] = []
+    def walk(o):
+        if isinstance(o, dict):
+            model=o.get("modelCode") or o.get("model") or o.get("code") or o.get("sku")
+            title=o.get("name") or o.get("title"); row={}
+            if model: row["Model"]=str(model).upper()
+            if title: row["Title"]=str(title)
+            if row: rows.append(row)
+            for v in o.values(): walk(v)
+        elif isinstance(o, list):
+            for v in o: walk(v)
+    try: walk(obj)
+    except Exception: pass
+    return rows
+
+def reduce_json(data, meta:Dict[str,Any], digest:str="", keep_raw:bool=False)->Dict[str,Any]:
+    rec = {**meta, "rows": walk_rows(data), "paths": sorted(endpoint_catalog.model_paths(data)), "digest": digest}
+    if keep_raw: rec["data"] = data
+    return rec
+
+class JsonCapture:
+    def __init__(self, max_bytes:int=64*1_048_576, keep_raw:bool=False):
+        self.max_bytes, self.keep_raw = max_bytes, keep_raw
+        self.stats = {"captured":0, "duplicate":0, "over_budget":0, "unparsed":0, "bytes":0}
+        self._seen, self._futures, self._records = set(), [], []
+        self._pending = 0; self._retained = 0; self._seq = 0
+        self._lock = threading.Lock()
+
+    def offer(self, body:bytes, meta:Dict[str,Any], is_json_ct:bool=True, post_data:Optional[str]=None)->bool:
+        """응답 콜백에서 호출 — 해시/중복/상한만 확인하고 파싱은 워커로"""
+        if not body and not post_data: return False
+        if body and not is_json_ct and (len(body) >= MAX_TEXT_BODY or b"{" not in body): body = b""
+        raw = body or (post_data or "").encode("utf-8")
+        digest = hashlib.sha1(raw).hexdigest()
+        with self._lock:
+            if digest in self._seen:
+                self.stats["duplicate"] += 1; return False
+            if self._pending + self._retained + len(raw) > self.max_bytes:
+                self.stats["over_budget"] += 1; return False
+            self._seen.add(digest); self._pending += len(raw); self.stats["bytes"] += len(raw)
+            self._seq += 1
+            self._futures.append(_executor.submit(self._parse, body, post_data, meta, digest, self._seq))
+        return True
+
+    def _parse(self, body:bytes, post_data:Optional[str], meta:Dict[str,Any], digest:str, seq:int):
+        size = len(body or (post_data or "").encode("utf-8"))
+        data, from_request = None, False
+        try:
+            if body: data = json.loads(body)
+        except Exception: data = None
+        if data is None and post_data and "{" in post_data and len(post_data) < MAX_TEXT_BODY:
+            try: data, from_request = json.loads(post_data), True
+            except Exception: data = None
+        rec = reduce_json(data, {**meta, "from_request": from_request}, digest, self.keep_raw) if data is not None else None
+        with self._lock:
+            self._pending -= size
+            if rec is None:
+                self.stats["unparsed"] += 1; return
+            if self.keep_raw: self._retained += size
+            self.stats["captured"] += 1
+            self._records.append((seq, rec))
+
+    def drain(self, timeout:float=30)->List[Dict[str,Any]]:
+        """대기 중인 파싱을 마치고 압축 레코드를 캡처 순서대로 반환"""
+        with self._lock:
+            futs, self._futures = self._futures, []
+        for f in futs:
+            try: f.result(timeout=timeout)
+            except Exception: pass
+        with self._lock:
+            out, self._records = self._records, []
+        return [rec for _, rec in sorted(out, key=lambda t: t[0])]
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# 이벤트 기반 lazy-load 스크롤 드라이버 (plp_engine.fetch_models / compare_plp._crawl_page 공용)
+# - 페이지 안에서 MutationObserver 로 DOM 변화/카드 수를 감시 → 새 카드가 렌더링되면 즉시 다음 스텝
+# - Python 쪽에서 상품 API(xhr/fetch) in-flight 요청을 추적 → 응답 대기 중이면 결과 카드까지 기다림
+# - quiet 구간 동안 변화가 없고 바닥에 닿았으면 종료, 스텝별 추가 카드 수 반환
+from typing import Callable, List, Optional
+
+_STEP_JS = """
+async ({sel, step, quietMs, maxWaitMs}) => {
+  const count = () => { try { return document.querySelectorAll(sel).length; } catch(e) { return 0; } };
+  const before = count();
+  let last = performance.now();
+  const mo = new MutationObserver(() => { last = performance.now(); });
+  mo.observe(document.body || document.documentElement, {childList: true, subtree: true});
+  if (step) window.scrollBy(0, step);
+  const t0 = performance.now();
+  await new Promise(res => {
+    const tick = () => {
+      const now = performance.now();
+      if (count() > before && now - last >= 80) return res();
+      if (now - last >= quietMs || now - t0 >= maxWaitMs) return res();
+      setTimeout(tick, 40);
+    };
+    setTimeout(tick, 40);
+  });
+  mo.disconnect();
+  const h = Math.max(document.body ? document.body.scrollHeight : 0, document.documentElement.scrollHeight);
+  return {added: count() - before, cards: count(), atBottom: window.scrollY + window.innerHeight >= h - 4};
+}
+"""
+
+def autoscroll(page, card_sel:str, step:int=1400, max_steps:int=20, quiet_ms:int=400, max_wait_ms:int=1200,
+               is_product_api:Optional[Callable[[str],bool]]=None)->List[int]:
+    """스텝별 추가 카드 수 목록 반환. is_product_api 미지정 시 xhr/fetch 전체를 추적"""
+    inflight = set()
+    def _track(req):
+        try:
+            if req.resource_type in ("xhr","fetch") and (is_product_api is None or is_product_api(req.url)):
+                inflight.add(id(req))
+        except Exception: pass
+    def _done(req): inflight.discard(id(req))
+    page.on("request", _track); page.on("requestfinished", _done); page.on("requestfailed", _done)
+
+    added: List[int] = []
+    arg = {"sel": card_sel, "step": step, "quietMs": quiet_ms, "maxWaitMs": max_wait_ms}
+    try:
+        for _ in range(max_steps):
+            r = page.evaluate(_STEP_JS, arg)
+            n = r["added"]
+            # 상품 API 응답 대기 중 → 응답으로 그려질 카드까지 추가 대기 (스크롤 없이)
+            waited = 0
+            while inflight and waited < max_wait_ms:
+                page.wait_for_timeout(100); waited += 100
+            if waited:
+                r2 = page.evaluate(_STEP_JS, {**arg, "step": 0})
+                n += r2["added"]; r["atBottom"] = r2["atBottom"]
+            added.append(n)
+            if n == 0 and r["atBottom"] and not inflight: break
+        page.evaluate("window.scrollTo(0,0);")
+    finally:
+        for ev, fn in (("request",_track),("requestfinished",_done),("requestfailed",_done)):
+            try: page.remove_listener(ev, fn)
+            except Exception: pass
+    return added
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# 시장(market) 추정 + 시장별 로케일 정보 (plp_engine 컨텍스트 옵션 / prices 숫자 형식 공용)
+from urllib.parse import urlparse
+from typing import Dict, Tuple
+
+# 시장 → (소수점, 천 단위 구분자, 기본 통화)
+NUMBER_FORMATS: Dict[str,Tuple[str,str,str]] = {
+    "uk":(".",",","GBP"), "ie":(".",",","EUR"), "us":(".",",","USD"), "ca":(".",",","CAD"),
+    "au":(".",",","AUD"), "nz":(".",",","NZD"), "sg":(".",",","SGD"), "my":(".",",","MYR"),
+    "in":(".",",","INR"), "ph":(".",",","PHP"), "th":(".",",","THB"), "hk":(".",",","HKD"),
+    "jp":(".",",","JPY"), "kr":(".",",","KRW"), "mx":(".",",","MXN"), "ae":(".",",","AED"),
+    "de":(",",".","EUR"), "at":(",",".","EUR"), "it":(",",".","EUR"), "es":(",",".","EUR"),
+    "nl":(",",".","EUR"), "be":(",",".","EUR"), "pt":(",",".","EUR"), "gr":(",",".","EUR"),
+    "br":(",",".","BRL"), "ar":(",",".","ARS"), "cl":(",",".","CLP"), "co":(",",".","COP"),
+    "tr":(",",".","TRY"), "id":(",",".","IDR"), "vn":(",",".","VND"), "dk":(",",".","DKK"),
+    "fr":(","," ","EUR"), "pl":(","," ","PLN"), "cz":(","," ","CZK"), "se":(","," ","SEK"),
+    "no":(","," ","NOK"), "fi":(","," ","EUR"), "hu":(","," ","HUF"), "ru":(","," ","RUB"),
+    "ch":(".","'","CHF"),
+}
+DEFAULT_FORMAT = NUMBER_FORMATS["uk"]
+
+def number_format(market:str)->Tuple[str,str,str]:
+    return NUMBER_FORMATS.get((market or "").lower(), DEFAULT_FORMAT)
+
+def guess_market_and_lang(url: str):
+    try:
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        path = (parsed.path or "").strip("/")
+        first = (path.split("/", 1)[0] if path else "").lower()
+        market = first if len(first) in (2,3) else ""
+        if not market:
+            if host.endswith(".sg"): market="sg"
+            elif host.endswith(".uk") or host.endswith(".co.uk"): market="uk"
+            elif host.endswith(".de"): market="de"
+            elif host.endswith(".fr"): market="fr"
+            elif host.endswith(".it"): market="it"
+            elif host.endswith(".es"): market="es"
+        market = market or "uk"
+        lang = {
+            "uk":"en-GB,en;q=0.8","sg":"en-SG,en;q=0.8","de":"de-DE,de;q=0.9,en;q=0.7",
+            "fr":"fr-FR,fr;q=0.9,en;q=0.7","it":"it-IT,it;q=0.9,en;q=0.7","es":"es-ES,es;q=0.9,en;q=0.7"
+        }.get(market,"en-GB,en;q=0.8")
+        tz  = {"uk":"Europe/London","sg":"Asia/Singapore","de":"Europe/Berlin",
+               "fr":"Europe/Paris","it":"Europe/Rome","es":"Europe/Madrid"}.get(market,"Europe/London")
+        geo = {
+            "uk":{"latitude":51.5074,"longitude":-0.1278,"accuracy":50},
+            "sg":{"latitude":1.3521,"longitude":103.8198,"accuracy":50},
+            "de":{"latitude":52.52,"longitude":13.405,"accuracy":50},
+            "fr":{"latitude":48.8566,"longitude":2.3522,"accuracy":50},
+            "it":{"latitude":41.9028,"longitude":12.4964,"accuracy":50},
+            "es":{"latitude":40.4168,"longitude":-3.7038,"accuracy":50},
+        }.get(market)
+        return market, lang, tz, geo
+    except Exception:
+        return "uk","en-GB,en;q=0.8","Europe/London",{"latitude":51.5074,"longitude":-0.1278,"accuracy":50}
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# 모델 코드 매칭 인덱스 (plp_engine.match_rows / compare_plp.run_compare 공용)
+# - 정규화는 항목당 한 번: 정확 키(norm) 맵 + 지역 접미사(끝 영문 2~3자) 제거 키 맵
+# - 조회 순서: 정확 → 접미사 제거 → (fuzzy>0 일 때만) rapidfuzz 근접 매칭
+# - 같은 키의 항목이 여러 개면 원래 순서대로 하나씩 소비 (1:1 매칭)
+import re
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:   # fuzzy 단계만 비활성
+    fuzz = process = None
+
+_SEP_RE = re.compile(r"[\s.\-_/]+")
+_SUFFIX_RE = re.compile(r"[A-Z]{2,3}$")
+
+def norm_model(m: str) -> str:
+    if not m: return ""
+    u = _SEP_RE.sub("", str(m).upper())
+    return u.replace("OLEDTV","OLED").replace("QNEDTV","QNED").replace("NANOTV","NANO")
+
+def base_model(n: str) -> str:
+    """정규화된 코드에서 지역 접미사 제거 (OLED65C46LA → OLED65C46)"""
+    return _SUFFIX_RE.sub("", n)
+
+def same_model(a: str, b: str) -> bool:
+    na, nb = norm_model(a), norm_model(b)
+    if not na or not nb: return False
+    if na == nb: return True
+    na2, nb2 = base_model(na), base_model(nb)
+    return bool(na2 and nb2 and na2 == nb2)
+
+class ModelIndex:
+    """b 쪽 항목을 미리 정규화해 두고 a 코드로 조회. fuzzy: rapidfuzz ratio 하한(0=끔)"""
+    def __init__(self, items:Iterable[Any], key:Callable[[Any],str]=lambda x: x, fuzzy:float=0):
+        self.items = list(items)
+        self.fuzzy = fuzzy if process is not None else 0
+        self.used: set = set()
+        self._norm: List[str] = []
+        self._exact: Dict[str,List[int]] = defaultdict(list)
+        self._base: Dict[str,List[int]] = defaultdict(list)
+        for i, it in enumerate(self.items):
+            n = norm_model(key(it)); self._norm.append(n)
+            if not n: continue
+            self._exact[n].append(i)
+            b = base_model(n)
+            if b: self._base[b].append(i)
+
+    def _free(self, ids:List[int])->Optional[int]:
+        return next((i for i in ids if i not in self.used), None)
+
+    def find(self, code:str, consume:bool=True)->Optional[Tuple[int,str]]:
+        """(항목 인덱스, "exact"|"suffix"|"fuzzy") 또는 None"""
+        n = norm_model(code)
+        if not n: return None
+        hit, tier = self._free(self._exact.get(n, [])), "exact"
+        if hit is None:
+            b = base_model(n)
+            if b: hit, tier = self._free(self._base.get(b, [])), "suffix"
+        if hit is None and self.fuzzy:
+            choices = {i: s for i, s in enumerate(self._norm) if s and i not in self.used}
+            best = process.extractOne(n, choices, scorer=fuzz.ratio, score_cutoff=self.fuzzy) if choices else None
+            if best: hit, tier = best[2], "fuzzy"
+        if hit is None: return None
+        if consume: self.used.add(hit)
+        return hit, tier
+
+    def unused(self)->List[Any]:
+        return [it for i, it in enumerate(self.items) if i not in self.used]
+
+def match(a_items:Iterable[Any], b_items:Iterable[Any], key_a:Callable[[Any],str]=lambda x: x,
+          key_b:Callable[[Any],str]=None, fuzzy:float=0, limit:int=None
+          )->Tuple[List[Tuple[Any,Any,str]], List[Any], List[Any]]:
+    """a 순서대로 1:1 매칭 → (pairs[(a, b, tier)], a 미매칭, b 미매칭). limit 개 매칭되면 중단"""
+    idx = ModelIndex(b_items, key_b or key_a, fuzzy)
+    pairs, only_a = [], []
+    for a in a_items:
+        if limit is not None and len(pairs) >= limit: break
+        hit = idx.find(key_a(a))
+        if hit is None: only_a.append(a); continue
+        pairs.append((a, idx.items[hit[0]], hit[1]))
+    return pairs, only_a, idx.unused()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# 공용 요청 차단 정책 + 대역폭 집계 (plp_engine.fetch_models / compare_plp._crawl_page)
+# - 리소스 타입 차단(이미지·폰트는 스크린샷이 꺼져 있을 때만 — 글꼴이 바뀌면 썸네일/visual_sim 이 흔들림)
+# - 서드파티 태그 도메인 차단
+# - 알려진 무거운 스크립트는 빈 JS 로 short-circuit (페이지 코드가 깨지지 않도록 abort 대신 200)
+#   패턴은 부분 문자열, * 가 있으면 glob (assets.adobedtm.com/*/launch- → 1st-party /launch-banner.js 는 제외)
+# - 실행별 허용/차단 건수와 바이트 집계
+#   허용: 요청 완료 시 request.sizes() 의 responseBodySize (chunked/압축 응답 포함, 전송 크기),
+#         못 얻으면 content-length, 그것도 없으면 TYPICAL_BYTES
+#   차단: 크기를 실제로 잰 같은 타입 허용 응답의 평균으로 추정
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable
+
+DEFAULT_BLOCK_DOMAINS = ("mpulse.net","onetrust.com","omtrdc.net","adobedtm.com",
+                         "googletagmanager.com","google-analytics.com","hotjar.com","doubleclick.net")
+DEFAULT_STUB_SCRIPTS = ("/gtm.js","/analytics.js","/fbevents.js","clarity.ms/tag","quantummetric",
+                        "/satelliteLib","assets.adobedtm.com/*/launch-","static.hotjar.com","cdn.cquotient.com")
+# 차단 요청의 바이트 추정값 (같은 실행에서 허용된 동일 타입 응답이 없을 때)
+TYPICAL_BYTES = {"image":40_000,"font":35_000,"media":400_000,"script":60_000,"stylesheet":30_000}
+
+def _hit(pat:str, url:str)->bool:
+    return fnmatchcase(url, f"*{pat}*") if "*" in pat else pat in url
+
+class RequestPolicy:
+    def __init__(self, block_types:Iterable[str]=(), block_domains:Iterable[str]=(), stub_scripts:Iterable[str]=()):
+        self.block_types = {t.lower() for t in block_types}
+        self.block_domains = tuple(d.lower() for d in block_domains)
+        self.stub_scripts = tuple(s.lower() for s in stub_scripts)
+        self._count = defaultdict(int); self._bytes = defaultdict(int)   # (결정, 타입) → 건수/바이트
+        self._measured = defaultdict(lambda: [0, 0])                     # 타입 → [크기를 잰 응답 수, 바이트]
+
+    @classmethod
+    def from_config(cls, cfg:Dict[str,Any], shots:bool=False)->"RequestPolicy":
+        """cfg: {block_types, block_images: auto|true|false, block_domains, stub_scripts} — 비어 있으면 집계만
+        block_types 의 font 는 shots 가 켜져 있으면 빼고 적용 (글꼴이 바뀌면 카드 썸네일이 달라짐)"""
+        cfg = cfg or {}
+        types = [t for t in cfg.get("block_types", []) if t != "image" and not (t == "font" and shots)]
+        imgs = cfg.get("block_images", "auto")
+        if imgs is True or (imgs == "auto" and not shots and cfg): types.append("image")
+        return cls(types, cfg.get("block_domains", []), cfg.get("stub_scripts", []))
+
+    @property
+    def blocking(self)->bool:
+        return bool(self.block_types or self.block_domains or self.stub_scripts)
+
+    def decide(self, url:str, rtype:str)->str:
+        ul = (url or "").lower()
+        if rtype == "script" and self.stub_scripts and any(_hit(s, ul) for s in self.stub_scripts): return "stubbed"
+        if self.block_domains and any(d in ul for d in self.block_domains): return "blocked"
+        if rtype in self.block_types: return "blocked"
+        return "allowed"
+
+    def attach(self, ctx):
+        """컨텍스트 전체(추가 탭 포함)에 정책 적용. 차단할 게 없으면 route 없이 집계만"""
+        if self.blocking: ctx.route("**/*", self._route)
+        ctx.on("response", self._on_response)
+        ctx.on("requestfinished", self._on_finished)
+
+    def _route(self, route):
+        req = route.request; d = self.decide(req.url, req.resource_type)
+        try:
+            if d == "allowed": return route.continue_()
+            self._count[(d, req.resource_type)] += 1
+            if d == "stubbed":
+                return route.fulfill(status=200, content_type="application/javascript", body="")
+            return route.abort()
+        except Exception: pass
+
+    def _on_response(self, resp):
+        try:
+            req = resp.request
+            if self.decide(req.url, req.resource_type) == "allowed": self._count[("allowed", req.resource_type)] += 1
+        except Exception: pass
+
+    def _on_finished(self, req):
+        """본문 수신이 끝난 요청의 바이트 (sizes() 는 완료 후라야 정확)"""
+        try:
+            rtype = req.resource_type
+            if self.decide(req.url, rtype) != "allowed": return   # route.fulfill 로 만든 스텁 응답
+            n = self._body_size(req)
+            if n is None:
+                self._bytes[("allowed", rtype)] += TYPICAL_BYTES.get(rtype, 0)
+            else:
+                self._bytes[("allowed", rtype)] += n
+                m = self._measured[rtype]; m[0] += 1; m[1] += n
+        except Exception: pass
+
+    @staticmethod
+    def _body_size(req):
+        try:
+            n = req.sizes().get("responseBodySize", -1)
+            if n is not None and n >= 0: return int(n)
+        except Exception: pass
+        try:
+            resp = req.response()
+            cl = resp.headers.get("content-length") if resp else None
+            return int(cl) if cl else None
+        except Exception:
+            return None
+
+    def report(self)->Dict[str,Any]:
+        out = {d: {"count":0, "bytes":0} for d in ("allowed","blocked","stubbed")}
+        by_type: Dict[str,Dict[str,int]] = defaultdict(lambda: defaultdict(int))
+        for (d, t), n in self._count.items():
+            if d == "allowed":
+                b = self._bytes[(d, t)]
+            else:
+                na, nb = self._measured.get(t, (0, 0))
+                avg = (nb / na) if na and nb else TYPICAL_BYTES.get(t, 10_000)
+                b = int(avg * n)
+            out[d]["count"] += n; out[d]["bytes"] += b
+            by_type[t][d] += n
+        out["by_type"] = {t: dict(v) for t,v in by_type.items()}
+        return out
+
+    def summary(self)->str:
+        r = self.report(); mb = lambda b: f"{b/1_048_576:.1f}MB"
+        saved = r["blocked"]["bytes"] + r["stubbed"]["bytes"]
+        return (f"허용 {r['allowed']['count']}건/{mb(r['allowed']['bytes'])} · "
+                f"차단 {r['blocked']['count']}건 · 스텁 {r['stubbed']['count']}건 (절감 추정 ~{mb(saved)})")
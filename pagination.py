@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# 페이지네이션 엔진 (plp_engine.fetch_models / compare_plp._crawl_page 공용)
+# - 더보기(load more): 보이는 버튼을 카드 수가 늘지 않을 때까지 반복 클릭 (텍스트 하나 실패해도 계속)
+#   찾는 범위는 페이저/더보기 영역 또는 카드 그리드 — 그리드에서 텍스트로만 찾은 버튼은 짧게 확인 후 포기
+#   링크는 이동하지 않는 것(href 없음/#/javascript:)만, 클릭 후 경로가 바뀌면(PLP 이탈) 중단하고 뒤로 가기
+# - 번호 페이지(?page=N): 페이저 링크에서 마지막 번호 추정 → 같은 컨텍스트의 탭들로 병렬 로드
+# - 상품 API page/offset 파라미터: 캡처된 요청의 다음 페이지를 APIRequestContext 로 직접 호출
+# - 무한 스크롤은 lazyload.autoscroll 담당
+import re, hashlib
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+import endpoint_catalog, json_capture
+
+LOAD_MORE_TEXTS = ["Show more","더보기","Load more","See more","View more","Mehr anzeigen","Mehr laden",
+                   "Voir plus","Afficher plus","Ver más","Cargar más","Mostra altro","Carica altro"]
+PAGE_PARAMS = ("page","p","pg","pageno","pagenumber")
+# 더보기 후보 — 상품/카테고리 링크(<a href>)의 "See more"/"View more" 는 클릭하면 PLP 를 떠남
+LOAD_MORE_SEL = ("button:visible, [role='button']:visible, a:visible:not([href]), "
+                 "a:visible[href^='#'], a:visible[href^='javascript:']")
+# 검색 범위 — 페이저/더보기 영역, 아니면 카드 그리드(첫 카드의 조부모) 안. 헤더·프로모션의 "View more" 배제
+LOAD_MORE_REGION_SEL = ("[class*='load-more' i], [class*='loadmore' i], [class*='show-more' i], [class*='pagination' i], "
+                        "[class*='pager' i], [data-testid*='load-more' i], nav[aria-label*='pag' i]")
+
+_PAGER_JS = """
+(params) => {
+  const re = new RegExp("[?&](" + params.join("|") + ")=\\\\d+", "i");
+  return Array.from(document.querySelectorAll("a[href]")).map(a => a.href).filter(h => re.test(h));
+}
+"""
+
+def click_load_more(page, card_sel:str, texts:Iterable[str]=LOAD_MORE_TEXTS, max_clicks:int=30,
+                    timeout_ms:int=6000, probe_ms:int=1500)->int:
+    """더보기 버튼을 카드 수가 더 늘지 않을 때까지 클릭. 클릭 횟수 반환
+    페이저/더보기 영역의 버튼은 timeout_ms 까지 기다리고, 그리드 안에서 텍스트로만 찾은 버튼은
+    첫 클릭에 probe_ms 안에 카드가 늘지 않으면 더보기가 아닌 것으로 보고 중단"""
+    pat = re.compile("|".join(re.escape(t) for t in texts), re.I)
+    cand, region = page.locator(LOAD_MORE_SEL), page.locator(LOAD_MORE_REGION_SEL)
+    strong = cand.and_(region).or_(region.locator(LOAD_MORE_SEL)).filter(has_text=pat).first
+    weak = page.locator(card_sel).first.locator("xpath=../..").locator(LOAD_MORE_SEL).filter(has_text=pat).first
+    here = lambda: urlparse(page.url)._replace(params="", query="", fragment="")   # pushState(?page=N) 는 허용
+    start = here()
+    clicks = 0
+    while clicks < max_clicks:
+        try:
+            btn = strong if strong.count() else weak
+            if btn.count() == 0: break
+            wait = timeout_ms if btn is strong or clicks else probe_ms
+            before = page.evaluate("(s)=>document.querySelectorAll(s).length", card_sel)
+            btn.scroll_into_view_if_needed(timeout=2000)
+            btn.click(timeout=2000)
+            if here() != start: break
+            page.wait_for_function("([s,n])=>document.querySelectorAll(s).length>n", arg=[card_sel, before],
+                                   timeout=wait)
+            clicks += 1
+        except Exception:
+            break
+    if here() != start:   # 다른 페이지로 이동함 → PLP 로 돌아가 수집이 엉뚱한 페이지에서 돌지 않게
+        try: page.go_back(wait_until="domcontentloaded", timeout=timeout_ms)
+        except Exception: pass
+    return clicks
+
+def numbered_page_urls(page, max_pages:int=10)->List[str]:
+    """현재 페이지 다음부터 마지막 번호(최대 max_pages 까지)의 URL 목록"""
+    cur = urlparse(page.url)
+    best: Dict[str,int] = {}
+    for h in page.evaluate(_PAGER_JS, list(PAGE_PARAMS)) or []:
+        u = urlparse(h)
+        if (u.netloc, u.path.rstrip("/")) != (cur.netloc, cur.path.rstrip("/")): continue
+        for k,v in parse_qsl(u.query):
+            if k.lower() in PAGE_PARAMS and v.isdigit(): best[k] = max(best.get(k,0), int(v))
+    if not best: return []
+    k, last = max(best.items(), key=lambda kv: kv[1])
+    q = dict(parse_qsl(cur.query, keep_blank_values=True))
+    start = int(q[k]) if str(q.get(k,"")).isdigit() else 1
+    urls = []
+    for n in range(start+1, min(last, start+max_pages-1)+1):
+        q[k] = str(n)
+        urls.append(urlunparse(cur._replace(query=urlencode(q))))
+    return urls
+
+def crawl_pages(ctx, urls:List[str], harvest:Callable[[Any,int],List[Any]], concurrency:int=3,
+                on_page:Optional[Callable[[Any],None]]=None, timeout_ms:int=60000)->List[List[Any]]:
+    """같은 컨텍스트의 탭으로 concurrency 개씩 동시 로드 → harvest(page, n) 결과를 URL 순서대로 반환"""
+    results: List[List[Any]] = [[] for _ in urls]
+    for b in range(0, len(urls), max(1, concurrency)):
+        tabs = []
+        for i in range(b, min(b+concurrency, len(urls))):
+            p = ctx.new_page()
+            if on_page: on_page(p)
+            try:
+                p.goto(urls[i], wait_until="commit", timeout=timeout_ms); tabs.append((i,p))
+            except Exception:
+                p.close()
+        for i,p in tabs:
+            try:
+                p.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+                results[i] = harvest(p, i+2) or []
+            except Exception:
+                pass
+            finally:
+                try: p.close()
+                except Exception: pass
+    return results
+
+def merge_ordered(groups:Iterable[Iterable[Any]], key:Callable[[Any],Any])->List[Any]:
+    """페이지 순서 → 페이지 내 순서 유지하며 key 기준 중복 제거"""
+    seen, out = set(), []
+    for g in groups:
+        for it in g:
+            k = key(it)
+            if k in seen: continue
+            seen.add(k); out.append(it)
+    return out
+
+def fetch_api_pages(request_ctx, payloads:List[Dict[str,Any]], max_pages:int=10,
+                    timeout_ms:int=15000)->List[Dict[str,Any]]:
+    """캡처된 상품 API 레코드 중 page/offset 파라미터가 있는 요청의 이후 페이지를 직접 호출 (압축 레코드 반환)"""
+    have = {(p["url"], p.get("body") or "") for p in payloads}
+    extra = []
+    for pl in list(payloads):
+        if pl.get("from_request") or pl.get("paged"): continue
+        learned = set(pl.get("paths") or [])
+        if not learned: continue
+        headers = {k:v for k,v in (pl.get("headers") or {}).items() if k.lower() in endpoint_catalog.KEEP_HEADERS}
+        ep = {"url": pl["url"], "method": (pl.get("method") or "GET").upper(), "body": pl.get("body")}
+        seen = {pl.get("digest")}
+        for i,(url, body) in enumerate(endpoint_catalog.page_requests(ep, max_pages)):
+            if i == 0 or (url, body or "") in have: continue
+            raw, data = endpoint_catalog.fetch_json(request_ctx, ep["method"], url, body, headers, timeout_ms)
+            if data is None or not (endpoint_catalog.model_paths(data) & learned): break
+            digest = hashlib.sha1(raw).hexdigest()
+            if digest in seen: break
+            seen.add(digest); have.add((url, body or ""))
+            extra.append(json_capture.reduce_json(data, {"url": url, "method": ep["method"], "body": body,
+                                                         "headers": headers, "from_request": False, "paged": True}, digest))
+    return extra
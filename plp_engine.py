@@ -0,0 +1,930 @@
+# -*- coding: utf-8 -*-
+# PLP 수집 엔진 — Streamlit 없이 import 가능 (app.py UI / 스케줄러 / 워커 프로세스 / CLI 공용)
+# Network-first + DOM fallback + deep JSON (__NEXT_DATA__/window) + GraphQL sniffing + 재시도/타임아웃/리소스차단
+# CTA(Button/Text, Rounded/Squared) 판정 + Compare 위치(Top/Middle/Bottom × Left/Center/Right)
+# - 위젯 값 대신 FetchOptions, st.write/st.caption 대신 log(msg, level) 콜백 (level: "debug" | "info")
+# - 단계별 span 타임라인(spans): PlpEngine.timeline → summary 표 / JSON (CLI --timeline)
+# - progress(url, phase, **data) 콜백: loading → loaded → scrolled/paged(models) → cta(cta_types) → done(models, cta_types)
+# - CLI: python plp_engine.py <URL> [<URL2>] [--fast] [--debug] ... → 결과 JSON 은 stdout, 로그는 stderr
+import re, sys, time, json
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urlparse
+from concurrent.futures import Future
+from browser_pool import BrowserPool
+import endpoint_catalog, lazyload, pagination, net_policy, json_capture, result_cache, har_replay, spans
+from spans import span
+from model_index import norm_model, match as match_models
+from markets import guess_market_and_lang as _guess_market_and_lang
+
+LAUNCH_KW = {"headless": True, "args": ["--no-sandbox", "--disable-dev-shm-usage"]}
+VIEWPORTS = ["desktop 1440x900", "desktop 1280x900", "mobile 390x844"]
+
+Log = Callable[..., None]
+def _no_log(msg, level="debug"): pass
+Progress = Callable[..., None]
+def _no_progress(url, phase, **data): pass
+
+@dataclass
+class FetchOptions:
+    """수집 옵션 (app 사이드바 위젯과 1:1)"""
+    viewport: str = VIEWPORTS[0]
+    fast_mode: bool = False        # 이미지/폰트/애널리틱스 차단
+    debug: bool = False            # 상세 로그 (log(..., "debug"))
+    keep_raw_json: bool = False    # 캡처 JSON 원본 보관
+    capture_mb: int = 64           # 페이지당 JSON 캡처 메모리 상한
+    take_screens: bool = False
+    timeout_sec: float = 30
+    retries: int = 1
+    api_direct: bool = False       # 학습된 엔드포인트 직접 호출 (실패 시 브라우저)
+    force_refresh: bool = False    # 결과 캐시 무시
+    har_mode: str = "off"          # off | record | replay
+
+# ========================= 공통 상수/유틸 =========================
+MODEL_PATTERNS = [
+    r"(?:OLED|QNED|NANO)\d{2,3}[A-Z0-9]+(?:[.\-][A-Z0-9]+)*",
+    r"[LU][A-Z]{1,2}\d{2,3}[A-Z0-9]{1,4}",
+    r"\b[A-Z]{2,}\d{2,}\b"
+]
+UNKNOWN = "Unknown"
+UNSET = object()
+
+PRODUCT_ALLOW = ("/api/","/v1/","/v2/","/graphql","/search","/catalog","/commerce",
+                 "/product","/plp","/listing","/lgecom","/pim","/sku","/model","/category")
+ANALYTICS_BLOCK = net_policy.DEFAULT_BLOCK_DOMAINS
+# Fast Mode 차단 정책 (이미지는 스크린샷 저장이 꺼져 있을 때만 차단)
+FAST_POLICY = {"block_types": ["font","media"], "block_images": "auto",
+               "block_domains": list(ANALYTICS_BLOCK), "stub_scripts": list(net_policy.DEFAULT_STUB_SCRIPTS)}
+
+PRIMARY_BTN_RE   = re.compile(r"\b(c-button--primary|c-btn--primary)\b", re.I)
+SECONDARY_BTN_RE = re.compile(r"\b(c-button--secondary|c-btn--secondary)\b", re.I)
+
+def _is_blocked_analytics(url: str) -> bool:
+    return any(d in url.lower() for d in ANALYTICS_BLOCK)
+
+def _looks_like_product_api(url: str) -> bool:
+    return any(k in url.lower() for k in PRODUCT_ALLOW)
+
+def is_product_api(url: str) -> bool:
+    """lazy-load 스크롤이 기다릴 상품 API 요청 (분석 비컨 제외) — compare_plp 도 사용"""
+    return _looks_like_product_api(url) and not _is_blocked_analytics(url)
+
+def _viewport(vp: str):
+    if "mobile" in vp: return {"width":390,"height":844}
+    if "1280"  in vp: return {"width":1280,"height":900}
+    return {"width":1440,"height":900}
+
+# ========================= 셀렉터/대기 =========================
+CARD_SEL = ("li.product-grid__item, .product-card, article.product, .product-list__item, "
+            "[data-model], [data-sku], [data-product-id], [data-modelcode]")
+BUY_SEL   = "button[class*='buy' i], a[class*='buy' i], [aria-label*='buy' i], [data-cta*='buy' i]"
+LEARN_SEL = ("a[class*='learn' i], [aria-label*='learn' i], [data-cta*='learn' i], "
+             "a:has-text('Learn more'), a:has-text('Find out more'), "
+             "a.c-button, a.btn, button.c-button, button.btn, a[href*='/p/'], a[href*='/product']")
+CMP_SEL   = ("a[class*='compare' i], button[class*='compare' i], [aria-label*='compare' i], "
+             "input[type='checkbox'][name*='compare' i], input[type='checkbox'][id*='compare' i], "
+             "label[for*='compare' i]")
+
+# DOM fallback: 카드별 텍스트 + href(최대 10) + 하위 요소(최대 30)의 모델 후보 속성
+# 카드 상한은 예전 80 → 300: 더보기 클릭 후엔 한 탭에 80장 넘게 쌓여 뒤쪽 카드 모델이 빠짐
+# (evaluate 1회라 비용은 카드 수에 선형, 300장 blob 도 수백 KB 이하)
+DOM_HARVEST_LIMIT = 300
+MAX_PAGES, PAGE_CONCURRENCY = 10, 3
+MATCH_FUZZY = 0   # 모델 코드 근접 매칭 하한 (rapidfuzz ratio, 0=정확/접미사 매칭만)
+DOM_MODEL_ATTRS = ("alt","aria-label","href","src","data-model","data-modelcode","data-sku","data-product-id")
+_DOM_HARVEST_JS = """
+({sel, limit, attrs}) => Array.from(document.querySelectorAll(sel)).slice(0, limit).map(card => {
+  const hrefs = Array.from(card.querySelectorAll("a[href]")).slice(0, 10).map(a => a.getAttribute("href") || "");
+  const vals = [];
+  for (const el of Array.from(card.querySelectorAll("img, a, *")).slice(0, 30)) {
+    for (const a of attrs) { const v = el.getAttribute(a); if (v) vals.push(v); }
+  }
+  return {text: card.innerText || "", hrefs, attrs: vals.join(" ")};
+})
+"""
+
+LG_LEARN_SEL = ".c-button--secondary, .c-btn--secondary, a.c-button--secondary, button.c-button--secondary"
+LG_BUY_SEL   = ".c-button--primary,  .c-btn--primary,  a.c-button--primary,  button.c-button--primary"
+
+def wait_until_ready(page, idle_ms: int, log=None) -> bool:
+    try:
+        with span("wait:networkidle"): page.wait_for_load_state("networkidle", timeout=idle_ms)
+        return True
+    except Exception:
+        if log: log("[debug] networkidle 미도달 → 대체 경로 진행")
+    for state in ["load","domcontentloaded"]:
+        try:
+            with span(f"wait:{state}"): page.wait_for_load_state(state, timeout=idle_ms)
+            return True
+        except Exception: pass
+    for sel in [CARD_SEL,".product-grid",".product-grid__items",".product-list",
+                "[data-product-id]","[data-model]","[data-sku]"]:
+        try:
+            with span("wait:selector", selector=sel): page.wait_for_selector(sel, timeout=max(2000, idle_ms//2))
+            return True
+        except Exception: pass
+    return False
+
+# ========================= Compare 다국어 키워드 =========================
+COMPARE_TEXTS = [
+    "compare", "비교", "vergleich", "comparer", "comparar", "confronta",
+    "比較", "비교하기", "vergelijk", "comparação"
+]
+def _contains_compare_text(s: str) -> bool:
+    if not s: return False
+    low = s.lower()
+    return any(tok in low for tok in COMPARE_TEXTS)
+
+# ========================= JSON 파서 =========================
+def extract_models_from_json(obj, out_rows):
+    def _emit(model_str, title=""):
+        if not model_str: return
+        m = str(model_str).strip()
+        base = m.split('.')[0].upper()
+        alnum = re.sub(r"[^A-Za-z0-9]","", base)
+        if re.fullmatch(r"\d+", base): return
+        if len(alnum) < 4: return
+        if not (re.search(r"[A-Za-z]", base) and re.search(r"\d", base)):
+            hit=None
+            for pat in MODEL_PATTERNS:
+                mm = re.search(pat, m, re.I)
+                if mm: hit=mm.group(0).upper(); break
+            if not hit: return
+            base = hit
+        if re.match(r"^MD\d+$", base, re.I): return
+        out_rows.append({"Model": base, "Title": title or ""})
+    if isinstance(obj, dict):
+        title = obj.get("name") or obj.get("title") or ""
+        for key in ("modelCode","model","code"):
+            if key in obj and obj[key]: _emit(obj[key], title)
+        if "sku" in obj and obj["sku"]: _emit(obj["sku"], title)
+        for _,v in obj.items():
+            if isinstance(v,str):
+                for pat in MODEL_PATTERNS:
+                    mm = re.search(pat, v, re.I)
+                    if mm: out_rows.append({"Model":mm.group(0).upper(),"Title":title})
+            elif isinstance(v,(dict,list)):
+                extract_models_from_json(v, out_rows)
+    elif isinstance(obj, list):
+        for it in obj: extract_models_from_json(it, out_rows)
+
+# ========================= CTA 유틸 =========================
+def _btn_shape(el):
+    if not el: return UNKNOWN
+    cls = (el.get_attribute("class") or "").lower()
+    style = (el.get_attribute("style") or "").lower()
+    if "rounded-none" in cls or "square" in cls or "border-radius: 0" in style:
+        return "Squared"
+    if "rounded" in cls or "pill" in cls or "9999px" in style or "20px" in style:
+        return "Rounded"
+    return UNKNOWN
+
+_METRICS_JS = """
+(el)=>{
+  function collect(node){
+    const cs = getComputedStyle(node);
+    const px = (v)=>parseFloat(v)||0;
+    const radNum = (v)=>{ if(!v) return 0; v=v.toString(); if(v.includes('%')) return 9999; const n=parseFloat(v); return isFinite(n)?n:0; };
+    const corners = [radNum(cs.borderTopLeftRadius),radNum(cs.borderTopRightRadius),radNum(cs.borderBottomRightRadius),radNum(cs.borderBottomLeftRadius)];
+    const avgRadius = corners.reduce((a,b)=>a+b,0)/(corners.length||1);
+    const padX = px(cs.paddingLeft)+px(cs.paddingRight);
+    const bg = cs.backgroundColor || "rgba(0,0,0,0)";
+    const m = bg.match(/rgba?\\(([^)]+)\\)/); let alpha=0;
+    if(m){ const p = m[1].split(",").map(s=>parseFloat(s)); alpha = (p.length===4 ? (isFinite(p[3])?p[3]:0) : ((p[0]+p[1]+p[2])>0?1:0)); }
+    const borderW = ["Top","Right","Bottom","Left"].map(s=>px(cs["border"+s+"Width"])).reduce((a,b)=>a+b,0)/4;
+    const cls  = (node.className || "").toString().toLowerCase();
+    const tag  = (node.tagName  || "").toLowerCase();
+    const hasIcon = !!(node.querySelector("svg,i,[class*='icon'],[class*='ico'],[class*='chevron']"));
+    return { nodeTag: tag, cls, padX, avgRadius, alpha, borderW, hasIcon };
+  }
+  let node=el, best=collect(el), depth=0;
+  while(node && depth<3){
+    node=node.parentElement; if(!node) break;
+    const m=collect(node);
+    const sBest=(best.padX>0)+(best.alpha>0.05)+(best.borderW>=1)+(best.avgRadius>=6)+(best.cls.includes('btn')||best.cls.includes('cta'));
+    const sNew =(m.padX>0)+(m.alpha>0.05)+(m.borderW>=1)+(m.avgRadius>=6)+(m.cls.includes('btn')||m.cls.includes('cta'));
+    if(sNew>sBest) best=m; depth++;
+  }
+  return best;
+}
+"""
+
+def _classify_cta(page, locator):
+    if not locator or locator.count()==0:
+        return ("Unknown", "Unknown")
+    try:
+        m = locator.evaluate(_METRICS_JS)
+        is_button_like = (
+            "btn" in m["cls"] or "button" in m["cls"] or "cta" in m["cls"] or
+            m["nodeTag"] == "button" or
+            (m["padX"] >= 10 and (m["alpha"] > 0.02 or m["borderW"] >= 1 or m["avgRadius"] >= 6))
+        )
+        shape = "Rounded" if m["avgRadius"] >= 10 else ("Squared" if m["avgRadius"] >= 1 else "Unknown")
+        typ = "Button+Icon" if (is_button_like and m.get("hasIcon")) else ("Button" if is_button_like else "Text")
+        return (typ, shape if typ.startswith("Button") else "Unknown")
+    except Exception:
+        return ("Text", "Unknown")
+
+def _promote_clickable(el):
+    try:
+        promoted = el.locator("xpath=ancestor-or-self::a | ancestor-or-self::button").first
+        return promoted if promoted and promoted.count() > 0 else el
+    except Exception:
+        return el
+
+def _rounded_from_class_or_css(page, el):
+    if not el or el.count() == 0:
+        return "Unknown"
+    try:
+        cls = (el.get_attribute("class") or "").lower()
+        if PRIMARY_BTN_RE.search(cls) or SECONDARY_BTN_RE.search(cls) \
+           or "c-button" in cls or "c-btn" in cls or "pill" in cls or "rounded" in cls:
+            return "Rounded"
+        js = r"""
+        (node)=>{
+          const takeR = (cs)=>[
+            parseFloat(cs.borderTopLeftRadius)||0,
+            parseFloat(cs.borderTopRightRadius)||0,
+            parseFloat(cs.borderBottomRightRadius)||0,
+            parseFloat(cs.borderBottomLeftRadius)||0
+          ];
+          const maxRin = (el)=>{
+            if(!el) return 0;
+            const cs = getComputedStyle(el);
+            const rs = takeR(cs);
+            let maxR = Math.max(...rs);
+            try{
+              const b = getComputedStyle(el,"::before");
+              const a = getComputedStyle(el,"::after");
+              const tb = [parseFloat(b.borderTopLeftRadius)||0,parseFloat(b.borderTopRightRadius)||0,parseFloat(b.borderBottomRightRadius)||0,parseFloat(b.borderBottomLeftRadius)||0];
+              const ta = [parseFloat(a.borderTopLeftRadius)||0,parseFloat(a.borderTopRightRadius)||0,parseFloat(a.borderBottomRightRadius)||0,parseFloat(a.borderBottomLeftRadius)||0];
+              maxR = Math.max(maxR, ...tb, ...ta);
+            }catch(e){}
+            return maxR;
+          };
+          const rect = node.getBoundingClientRect();
+          const cs = getComputedStyle(node);
+          const rs = takeR(cs);
+          const avg = (rs.reduce((a,b)=>a+b,0)/4)||0;
+          const maxR = Math.max(avg, maxRin(node));
+          const h = Math.max(1, rect.height||0);
+          return {R:maxR, H:h};
+        }
+        """
+        m = el.evaluate(js)
+        if not m: return "Unknown"
+        R, H = float(m.get("R",0)), float(m.get("H",0))
+        if R >= 12 or (H>0 and (R/H)>=0.25): return "Rounded"
+        if R >= 1: return "Squared"
+        return "Unknown"
+    except Exception:
+        return "Unknown"
+
+# ========================= Compare 위치 계산 (보강판) =========================
+def _compare_position(page, cmp_loc, card_loc=None):
+    """카드 박스를 기준으로 좌/우/상/하 위치를 안정적으로 판정"""
+    try:
+        if not cmp_loc or cmp_loc.count() == 0:
+            return "Unknown"
+
+        # 카드 힌트가 없으면 product-card 계열 상위 박스를 자동 추정
+        if not card_loc or card_loc.count() == 0:
+            card_loc = cmp_loc.locator(
+                "xpath=ancestor::*[contains(@class,'product-card') or contains(@class,'product') or contains(@class,'grid__item') or contains(@class,'product-list__item')][1]"
+            )
+
+        card_el = card_loc.element_handle() if (card_loc and card_loc.count() > 0) else None
+
+        pos = page.evaluate("""
+        (el, card)=>{
+          const box = (card ? card.getBoundingClientRect()
+                            : el.parentElement?.getBoundingClientRect() || document.body.getBoundingClientRect());
+          const e = el.getBoundingClientRect();
+          const w = Math.max(1, box.width);
+          const h = Math.max(1, box.height);
+          const cx = (e.left + e.right)/2 - box.left;
+          const cy = (e.top  + e.bottom)/2 - box.top;
+          return {w, h, cx, cy};
+        }
+        """, cmp_loc.element_handle(), card_el)
+
+        left_edge   = pos["w"] * 0.40
+        right_edge  = pos["w"] * 0.60
+        top_edge    = pos["h"] * 0.33
+        bottom_edge = pos["h"] * 0.67
+
+        horiz = "Left" if pos["cx"] <= left_edge else ("Right" if pos["cx"] >= right_edge else "Center")
+        vert  = "Top"  if pos["cy"] <= top_edge  else ("Bottom" if pos["cy"] >= bottom_edge else "Middle")
+
+        return f"{vert}-{horiz}"
+    except Exception:
+        return "Unknown"
+
+# ========================= Compare Locator (강화) =========================
+def _find_compare_locator(page, card_locator=None):
+    scope = card_locator if (card_locator and card_locator.count() > 0) else page
+
+    # 1) checkbox → label[for] 승격
+    try:
+        cb = scope.locator("input[type='checkbox'][name*='compare' i], input[type='checkbox'][id*='compare' i]")
+        if cb.count() == 0:
+            cb = scope.locator("input[type='checkbox']")
+        if cb.count() > 0:
+            el = cb.first
+            try:
+                _id = el.get_attribute("id") or ""
+                if _id:
+                    lbl = page.locator(f"label[for='{_id}']")
+                    if lbl.count() > 0:
+                        return lbl.first
+            except Exception:
+                pass
+            return el
+    except Exception:
+        pass
+
+    # 2) data-속성 / role
+    try:
+        cand = scope.locator(
+            "[data-compare], [data-testid*='compare' i], [data-test*='compare' i], "
+            "[role='switch'][aria-label*='compare' i], [role='checkbox'][aria-label*='compare' i]"
+        )
+        if cand.count() > 0:
+            return cand.first
+    except Exception:
+        pass
+
+    # 3) 텍스트/aria/class
+    try:
+        cand = scope.locator("a, button, label, [role='button']")
+        n = cand.count()
+        for i in range(min(n, 60)):
+            el = cand.nth(i)
+            try:
+                txt = (el.inner_text() or "").strip()
+            except Exception:
+                txt = ""
+            aria = (el.get_attribute("aria-label") or "")
+            cls  = (el.get_attribute("class") or "")
+            if _contains_compare_text(txt) or _contains_compare_text(aria) or _contains_compare_text(cls):
+                return el
+    except Exception:
+        pass
+
+    # 4) 마지막: 카드 내 임의 checkbox/토글
+    try:
+        cand = scope.locator("input[type='checkbox'], [role='switch'], [role='checkbox']")
+        if cand.count() > 0:
+            return cand.first
+    except Exception:
+        pass
+
+    return None
+
+# ========================= 템플릿 단독 판정(보정) =========================
+TEMPLATE_TTL_SEC = 6*3600
+
+def _template_key(url: str, vp: dict):
+    market = _guess_market_and_lang(url)[0]
+    return ((urlparse(url).hostname or "").lower(), market, f"{vp.get('width')}x{vp.get('height')}")
+
+def _classify_template_on_page(page):
+    """이미 로드된 페이지 전체 범위에서 Learn/Buy/Compare 판정"""
+    result={"LearnMore_Type":"Text","LearnMore_Shape":UNKNOWN,"BuyNow_Shape":"Squared","Compare_Pos":"Center"}
+    try:
+        # Buy Now
+        buy = page.locator(LG_BUY_SEL + ", " + BUY_SEL).first
+        if buy and buy.count()>0:
+            buy = _promote_clickable(buy)
+            _, shape = _classify_cta(page, buy)
+            if shape in ("Unknown","Squared"):
+                try:
+                    bcls = (buy.get_attribute("class") or "").lower()
+                    if PRIMARY_BTN_RE.search(bcls): shape = "Rounded"
+                except Exception: pass
+            result["BuyNow_Shape"] = shape if shape!=UNKNOWN else _rounded_from_class_or_css(page, buy)
+
+        # Learn More
+        learn = page.locator(LG_LEARN_SEL + ", " + LEARN_SEL).first
+        if learn and learn.count()>0:
+            learn = _promote_clickable(learn)
+            t, s = _classify_cta(page, learn)
+            result["LearnMore_Type"]  = "Button" if t in ("Text","Unknown") else t
+            result["LearnMore_Shape"] = s if s!=UNKNOWN else _rounded_from_class_or_css(page, learn)
+
+        # Compare
+        cmpb = _find_compare_locator(page, None)
+        if cmpb:
+            result["Compare_Pos"] = _compare_position(page, cmpb, None)
+    except Exception:
+        pass
+    return result
+
+# ========================= 메인 수집기 =========================
+def _harvest_page_models(page):
+    """deep JSON(__NEXT_DATA__/window) + DOM fallback 모델 후보 (페이지 순서 유지)"""
+    dom_models=[]
+    try:
+        with span("deep_json:next_data"):
+            txt = page.locator("script#__NEXT_DATA__").first.inner_text(timeout=2000)
+            data = json.loads(txt); tmp=[]
+            extract_models_from_json(data, tmp)
+            dom_models.extend({"Model":r["Model"].upper()} for r in tmp)
+    except Exception: pass
+    try:
+        with span("deep_json:window"):
+            raw = page.evaluate("() => (window.__NEXT_DATA__ || window.__APOLLO_STATE__ || null)")
+            if raw:
+                tmp=[]; extract_models_from_json(raw, tmp)
+                dom_models.extend({"Model":r["Model"].upper()} for r in tmp)
+    except Exception: pass
+
+    # DOM fallback — 카드 전체를 evaluate 1회로 수집, 압축 blob 만 Python 으로
+    try:
+        with span("dom_fallback") as sp:
+            harvested = page.evaluate(_DOM_HARVEST_JS, {"sel": CARD_SEL, "limit": DOM_HARVEST_LIMIT, "attrs": list(DOM_MODEL_ATTRS)})
+            for h in harvested or []:
+                blob = (h.get("text") or "") + " "
+                for href in h.get("hrefs") or []:
+                    blob += " "+href; slug = href.split("/")[-1]
+                    for pat in MODEL_PATTERNS:
+                        m=re.search(pat, slug, re.I)
+                        if m: dom_models.append({"Model":m.group(0).upper()}); break
+                blob += " " + (h.get("attrs") or "")
+                for pat in MODEL_PATTERNS:
+                    m=re.search(pat, blob, re.I)
+                    if m: dom_models.append({"Model":m.group(0).upper()}); break
+            sp["cards"] = len(harvested or [])
+    except Exception: pass
+    return dom_models
+
+def _context_kwargs(url: str, vp: dict) -> dict:
+    """시장(_guess_market_and_lang) 기반 격리 컨텍스트 옵션 (locale/timezone/geolocation)"""
+    market, accept_lang, tz, geo = _guess_market_and_lang(url)
+    return dict(
+        viewport=vp,
+        extra_http_headers={"Accept-Language": accept_lang},
+        locale=accept_lang.split(",")[0],
+        timezone_id=tz, geolocation=geo, permissions=["geolocation"],
+        ignore_https_errors=True,
+        user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128 Safari/537.36"),
+    )
+
+def _collect_page(ctx, url: str, o:"FetchOptions", log:Log=_no_log, tpl_cache=None, progress:Progress=_no_progress):
+    """풀 워커 스레드에서 실행: 페이지 로드 후 payloads / dom_models / cta_types 수집"""
+    payloads, dom_models = [], []
+    NAV_TMO = int(o.timeout_sec*1000)
+    IDLE_TMO = int(max(5, o.timeout_sec-4)*1000)
+
+    with span("new_page"): page = ctx.new_page()
+    ctx.set_default_timeout(NAV_TMO); page.set_default_timeout(NAV_TMO)
+
+    policy = net_policy.RequestPolicy.from_config(FAST_POLICY if o.fast_mode else {}, shots=o.take_screens)
+    policy.attach(ctx)
+    har_replay.attach(ctx, o.har_mode, har_replay.bundle_path(url))
+
+    capture = json_capture.JsonCapture(max_bytes=int(o.capture_mb*1_048_576), keep_raw=o.keep_raw_json)
+    def on_resp(resp):
+        # 콜백에서는 본문만 받아 넘기고 파싱/축소는 워커 스레드에서
+        # body() 는 응답 완료까지 막히므로 xhr/fetch 의 JSON 응답만 (이미지/HTML/스크립트는 요청 본문만 확인)
+        try:
+            ul=resp.url.lower()
+            if _is_blocked_analytics(ul): return
+            if not _looks_like_product_api(ul): return
+            req=resp.request
+            if req.resource_type not in ("xhr","fetch"): return
+            ct=(resp.headers.get("content-type") or "").lower()
+            body=b""
+            if "json" in ct:
+                try: body=resp.body()
+                except Exception: body=b""
+            post=req.post_data if req.method.lower()=="post" else None
+            meta={"url":resp.url, "method":req.method, "body":req.post_data, "headers":req.headers}
+            if capture.offer(body, meta, is_json_ct="json" in ct, post_data=post) and o.debug:
+                log({"captured_json": resp.url})
+        except Exception: pass
+    ctx.on("response", on_resp)
+
+    if o.debug:
+        def on_req(req):
+            ul=(req.url or "").lower()
+            if _looks_like_product_api(ul) and not _is_blocked_analytics(ul):
+                log({"xhr/fetch": req.method, "url": req.url[:300]})
+        ctx.on("request", on_req)
+
+    progress(url, "loading")
+    last_err, ready = None, False
+    for attempt in range(o.retries+1):
+        try:
+            with span("goto"): page.goto(url, wait_until="domcontentloaded", timeout=NAV_TMO)
+            with span("wait_until_ready"): ready = wait_until_ready(page, IDLE_TMO, log if o.debug else None)
+            if ready: break
+        except Exception as e:
+            last_err = e
+        if o.debug: log(f"[debug] goto 재시도 {attempt+1}/{o.retries} (ready={bool(ready)})")
+    else:
+        if last_err: raise last_err
+    progress(url, "loaded", ready=bool(ready))
+
+    # 쿠키 배너 닫기
+    with span("cookies") as sp:
+        for i, sel in enumerate(["button[id*='accept']","button[aria-label*='Accept']",".onetrust-accept-btn-handler",
+                    "button:has-text('Accept all')","button:has-text('Accept All')",
+                    "button:has-text('Alle akzeptieren')","button:has-text('Aceptar todo')","button:has-text('Aceptar todas')"]):
+            sp["tried"] = i+1
+            try: page.locator(sel).first.click(timeout=1200); break
+            except Exception: pass
+
+    # 더보기 — 버튼이 사라지거나 카드가 더 늘지 않을 때까지 반복 클릭
+    try:
+        with span("load_more") as sp:
+            clicks = sp["clicks"] = pagination.click_load_more(page, CARD_SEL, max_clicks=10 if o.fast_mode else 30)
+        if o.debug and clicks: log({"load_more_clicks": clicks})
+    except Exception: pass
+
+    # 스크롤 — 카드 수/상품 API 활동 기반, 변화가 멈추면 종료
+    try:
+        with span("scroll") as sp:
+            added = lazyload.autoscroll(page, CARD_SEL, step=2000, max_steps=10 if o.fast_mode else 20,
+                                        quiet_ms=400, max_wait_ms=1500,
+                                        is_product_api=is_product_api)
+            sp["steps"] = len(added or [])
+        if o.debug: log({"scroll_added_per_step": added})
+    except Exception: pass
+
+    # deep JSON + DOM fallback
+    with span("harvest"): dom_models.extend(_harvest_page_models(page))
+    if progress is not _no_progress:
+        payloads.extend(capture.drain())
+        progress(url, "scrolled", models=_unique_models(payloads, dom_models))
+
+    # 번호 페이지(?page=N) — 같은 컨텍스트의 탭으로 병렬 수집, 사이트 순서대로 병합
+    try:
+        more = pagination.numbered_page_urls(page, MAX_PAGES)
+        if more:
+            if o.debug: log({"numbered_pages": more})
+            def _harvest_tab(p, n):
+                wait_until_ready(p, IDLE_TMO)
+                return _harvest_page_models(p)
+            with span("numbered_pages", pages=len(more)):
+                for rows in pagination.crawl_pages(ctx, more, _harvest_tab, concurrency=PAGE_CONCURRENCY, timeout_ms=NAV_TMO):
+                    dom_models.extend(rows)
+    except Exception: pass
+
+    # 상품 API page/offset 파라미터 — 이후 페이지 직접 호출
+    with span("capture_drain"): payloads.extend(capture.drain())
+    if progress is not _no_progress: progress(url, "paged", models=_unique_models(payloads, dom_models))
+    # (APIRequestContext 는 HAR 라우팅 밖 → 기록/재생 중엔 생략)
+    if o.har_mode == "off":
+        try:
+            with span("api_pages") as sp:
+                extra = pagination.fetch_api_pages(ctx.request, payloads, max_pages=MAX_PAGES, timeout_ms=NAV_TMO)
+                sp["payloads"] = len(extra)
+            if o.debug and extra: log({"api_pages_fetched": len(extra)})
+            payloads.extend(extra)
+        except Exception: pass
+
+    # CTA 추정 — Learn/Buy/Compare
+    cta_types={
+        "LearnMore_Type": UNSET,
+        "LearnMore_Shape": UNSET,
+        "BuyNow_Shape": UNSET,
+        "Compare_Pos": UNSET
+    }
+    try:
+        with span("cta"):
+            cards = page.locator(CARD_SEL); n=min(cards.count(),2)
+            if n>0:
+                card = cards.nth(0)
+
+                # Buy Now
+                buy = card.locator(LG_BUY_SEL + ", " + BUY_SEL).first
+                if buy and buy.count()>0:
+                    buy = _promote_clickable(buy)
+                    _, buy_shape = _classify_cta(page, buy)
+                    if buy_shape in ("Unknown","Squared"):
+                        try:
+                            bcls = (buy.get_attribute("class") or "").lower()
+                            if PRIMARY_BTN_RE.search(bcls): buy_shape = "Rounded"
+                        except Exception: pass
+                    if cta_types["BuyNow_Shape"] is UNSET or cta_types["BuyNow_Shape"] == UNKNOWN:
+                        cta_types["BuyNow_Shape"] = buy_shape if buy_shape!=UNKNOWN else _rounded_from_class_or_css(page, buy)
+
+                # Learn More
+                learn = card.locator(LG_LEARN_SEL + ", " + LEARN_SEL).first
+                if learn and learn.count()>0:
+                    learn = _promote_clickable(learn)
+                    lm_type, lm_shape = _classify_cta(page, learn)
+                    if cta_types["LearnMore_Type"] is UNSET or cta_types["LearnMore_Type"] == UNKNOWN:
+                        cta_types["LearnMore_Type"]  = "Button" if lm_type in ("Text","Unknown") else lm_type
+                    if cta_types["LearnMore_Shape"] is UNSET or cta_types["LearnMore_Shape"] == UNKNOWN:
+                        cta_types["LearnMore_Shape"] = lm_shape if lm_shape!=UNKNOWN else _rounded_from_class_or_css(page, learn)
+
+                # Compare (강화 탐색) — 카드 범위 우선, 실패 시 전역
+                cmpb = _find_compare_locator(page, card)
+                if not cmpb:
+                    cmpb = _find_compare_locator(page, None)
+                if cmpb:
+                    cta_types["Compare_Pos"] = _compare_position(page, cmpb, card)
+
+                if o.debug:
+                    log({"compare_found": bool(cmpb)})
+                    if cmpb:
+                        try:
+                            log({
+                                "cmp_tag": cmpb.evaluate("(n)=>n.tagName"),
+                                "cmp_cls": cmpb.get_attribute("class"),
+                                "cmp_aria": cmpb.get_attribute("aria-label"),
+                                "cmp_text": (cmpb.inner_text() or "")[:120]
+                            })
+                        except Exception:
+                            pass
+    except Exception: pass
+
+    # 부족 시 템플릿 보정 — 같은 페이지에서 판정, 시그니처별 TTL 캐시
+    need_strict = any(v in (UNSET, UNKNOWN) for v in (cta_types.get("LearnMore_Type",UNSET),
+                                                      cta_types.get("BuyNow_Shape",UNSET)))
+    if need_strict:
+        tpl_cache = {} if tpl_cache is None else tpl_cache
+        key = _template_key(url, page.viewport_size or {})
+        hit = tpl_cache.get(key)
+        cached = bool(hit and time.time()-hit[0] < TEMPLATE_TTL_SEC)
+        if cached:
+            strict = hit[1]
+        else:
+            with span("template"): strict = _classify_template_on_page(page)
+            tpl_cache[key] = (time.time(), strict)
+        if o.debug: log({"template": "/".join(key), "cached": cached})
+        for k,v in strict.items():
+            if cta_types.get(k, UNSET) in (UNSET, UNKNOWN):
+                cta_types[k]=v
+
+    progress(url, "cta", cta_types={k: (None if v is UNSET else v) for k, v in cta_types.items()})
+    with span("capture_drain") as sp:
+        payloads.extend(capture.drain())
+        net = policy.report()
+        sp.update(payloads=len(payloads), json_bytes=capture.stats["bytes"],
+                  net_requests=net["allowed"]["count"], net_bytes=net["allowed"]["bytes"])
+    log(f"[네트워크] {url} — {policy.summary()}", "info")
+    if o.debug: log({"network": policy.report(), "json_capture": capture.stats})
+
+    if o.take_screens:
+        try:
+            path=f"plp_sample_{int(time.time())}.png"
+            with span("screenshot"): page.screenshot(path=path, full_page=True)
+            log(f"스크린샷 저장: {path}", "info")
+        except Exception: pass
+
+    return payloads, dom_models, cta_types
+
+def _model_candidate(r) -> str:
+    """수집 행(Model/Title) → 필터를 통과한 모델 후보 (없으면 "")"""
+    m=r.get("Model") or ""; t=r.get("Title","")
+    candidate = (m.split(".")[0].upper() if m else "")
+    if not candidate:
+        mm=re.search(r"(?:OLED|QNED|NANO)\d{2,3}[A-Z0-9\-]+", t or "", re.I)
+        if mm: candidate=mm.group(0).upper()
+    if not candidate: return ""
+    if re.fullmatch(r"\d+", candidate): return ""
+    alnum=re.sub(r"[^A-Za-z0-9]","", candidate)
+    if len(alnum)<4: return ""
+    if not (re.search(r"[A-Za-z]", candidate) and re.search(r"\d", candidate)):
+        hit=None
+        for pat in MODEL_PATTERNS:
+            mm=re.search(pat, candidate, re.I)
+            if mm: hit=mm.group(0).upper(); break
+        if not hit: return ""
+        candidate=hit
+    if re.match(r"^MD\d+$", candidate, re.I): return ""
+    return candidate
+
+def _rows(pl) -> list:
+    """캡처 단계에서 축소된 행 (직접 호출 결과는 여기서 축소)"""
+    return pl["rows"] if "rows" in pl else json_capture.walk_rows(pl.get("data"))
+
+def _unique_models(payloads, dom_models, max_models=None) -> list:
+    """네트워크 행 → DOM 행 순서로 모델 후보 중복 제거 ([{"Model": ...}])"""
+    seen=set(); out=[]
+    for r in [r for pl in payloads for r in _rows(pl)] + list(dom_models):
+        candidate=_model_candidate(r)
+        if not candidate: continue
+        nm=norm_model(candidate)
+        if nm in seen: continue
+        seen.add(nm)
+        out.append({"Model":candidate})
+        if max_models and len(out)>=max_models: break
+    return out
+
+def _finalize_models(url: str, payloads, dom_models, cta_types, o:"FetchOptions", log:Log=_no_log,
+                     max_models=50, learn=True):
+    # 네트워크 JSON — 캡처 단계에서 이미 Model/Title 행으로 축소됨 (직접 호출 결과는 여기서 축소)
+    learned=[pl for pl in payloads if learn and not pl.get("from_request") and not pl.get("paged")
+             and any(_model_candidate(r) for r in _rows(pl))]
+
+    # 합치기/필터
+    out=_unique_models(payloads, dom_models, max_models)
+
+    if o.debug:
+        log(f"[debug] payloads={len(payloads)} dom={len(dom_models)} unique={len(out)}")
+        if len(out)==0 and payloads:
+            log({"sample_payload_urls":[p["url"] for p in payloads[:5]]})
+
+    # 기본값 보정
+    defaults = {
+        "LearnMore_Type": "Text",
+        "LearnMore_Shape": UNKNOWN,
+        "BuyNow_Shape":   "Squared",
+        "Compare_Pos":    "Bottom-Left"
+    }
+    for k, dv in defaults.items():
+        if cta_types.get(k, UNSET) is UNSET or cta_types.get(k) == UNKNOWN:
+            cta_types[k] = dv
+
+    # 모델을 만든 엔드포인트 학습 → 다음 실행의 API 직접 수집에 사용
+    if learned and out:
+        try: endpoint_catalog.learn(url, _guess_market_and_lang(url)[0], learned, cta_types)
+        except Exception as e:
+            if o.debug: log(f"[debug] endpoint catalog 저장 실패: {e}")
+
+    return out, cta_types
+
+# ========================= 엔진 =========================
+class PlpEngine:
+    """브라우저 풀 + 결과 캐시 + 템플릿 캐시를 묶은 수집기. pool/cache 를 넘기지 않으면 직접 만들고 close() 에서 정리"""
+    def __init__(self, opts:FetchOptions=None, pool:BrowserPool=None, cache:result_cache.ResultCache=None,
+                 tpl_cache:dict=None, log:Log=None, launch_kw:dict=None, progress:Progress=None,
+                 timeline:spans.Timeline=None):
+        self.opts = opts or FetchOptions()
+        self._own_pool = pool is None
+        self.pool = pool or BrowserPool(size=2, max_uses=20, launch_kw=launch_kw or LAUNCH_KW)
+        self.cache = cache if cache is not None else result_cache.ResultCache(ttl_sec=6*3600, max_entries=500)
+        self.tpl_cache = {} if tpl_cache is None else tpl_cache
+        self.log = log or _no_log
+        self.progress = progress or _no_progress
+        self.timeline = timeline or spans.Timeline()   # 이 엔진의 모든 수집 단계 (풀 워커 + 호출 스레드)
+
+    def close(self):
+        if self._own_pool: self.pool.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def _submit_collect(self, url: str, direct: bool):
+        """direct=True 이고 학습된 엔드포인트가 있으면 APIRequestContext 로 직접 호출, 아니면 PLP 렌더링"""
+        o, log = self.opts, self.log
+        entry = endpoint_catalog.lookup(url, _guess_market_and_lang(url)[0]) if (direct and o.har_mode == "off") else None
+        def _job(ctx):
+            with self.timeline.activate():
+                if entry:
+                    self.progress(url, "loading", api_direct=True)
+                    with span("api_direct", url=url) as sp:
+                        payloads = [json_capture.reduce_json(p["data"], {"url": p["url"]})
+                                    for p in endpoint_catalog.replay(ctx.request, entry, timeout_ms=int(o.timeout_sec*1000))]
+                        sp["payloads"] = len(payloads)
+                    if payloads:
+                        if o.debug: log({"api_direct": url, "responses": len(payloads)})
+                        return payloads, [], dict(entry.get("cta_types") or {}), True
+                    if o.debug: log(f"[debug] API 직접 수집 실패/스키마 변경 → 브라우저 폴백: {url}")
+                with span("collect_page", url=url):
+                    return (*_collect_page(ctx, url, o, log, self.tpl_cache, self.progress), False)
+        return self.pool.submit(_job, **_context_kwargs(url, _viewport(o.viewport)),
+                                **har_replay.context_kwargs(o.har_mode, har_replay.bundle_path(url)))
+
+    def _fetch_key(self, url: str, max_models) -> str:
+        o = self.opts; vp = _viewport(o.viewport)
+        return result_cache.make_key("fetch_models", url=url.strip(), viewport=vp, locale=_guess_market_and_lang(url)[1],
+                                     card_sel=CARD_SEL, patterns=MODEL_PATTERNS, fast=o.fast_mode,
+                                     api_direct=o.api_direct, max_models=max_models)
+
+    def _start_fetch(self, url: str, max_models):
+        """캐시 적중이면 (key, (models, cta_types)), 아니면 (key, Future)"""
+        key = self._fetch_key(url, max_models)
+        with self.timeline.activate(), span("cache_lookup", url=url) as sp:
+            hit = None if (self.opts.force_refresh or self.opts.har_mode != "off") else self.cache.get(key)
+            sp["hits"] = int(hit is not None)
+        if hit is not None:
+            self.log(f"[캐시] {url} — 이전 수집 결과 사용 (강제 새로고침으로 재수집)", "info")
+            self.progress(url, "done", models=hit[0], cta_types=hit[1], cached=True)
+            return key, (hit[0], hit[1])
+        return key, self._submit_collect(url, self.opts.api_direct)
+
+    def _fetch_result(self, url: str, fut, max_models, key=None):
+        if not isinstance(fut, Future): return fut
+        payloads, dom_models, cta_types, direct = fut.result()
+        with self.timeline.activate(), span("finalize", url=url) as sp:
+            out, cta_types = _finalize_models(url, payloads, dom_models, cta_types, self.opts, self.log,
+                                              max_models=max_models, learn=not direct)
+            sp["models"] = len(out)
+        if direct and not out:
+            return self._fetch_result(url, self._submit_collect(url, False), max_models, key)
+        if key and out and self.opts.har_mode == "off":
+            self.cache.put(key, "fetch_models", [out, cta_types])
+        self.progress(url, "done", models=out, cta_types=cta_types, cached=False)
+        return out, cta_types
+
+    def fetch_models(self, url: str, max_models=50):
+        with self.timeline.activate(), span("fetch_models", url=url):
+            key, job = self._start_fetch(url, max_models)
+            return self._fetch_result(url, job, max_models, key)
+
+    def fetch_models_pair(self, url_a: str, url_b: str, max_models=80):
+        """AS-IS / TO-BE 동시 수집 — 풀에서 컨텍스트 2개를 받아 병렬 로드 (캐시 적중분은 생략)"""
+        with self.timeline.activate(), span("fetch_models_pair"):
+            (ka, ja), (kb, jb) = self._start_fetch(url_a, max_models), self._start_fetch(url_b, max_models)
+            return self._fetch_result(url_a, ja, max_models, ka), self._fetch_result(url_b, jb, max_models, kb)
+
+    def classify_template_sample(self, url: str):
+        """모델 수집 없이 CTA 템플릿만 판정 (샘플 URL 점검용 공개 API — 수집 경로는 _collect_page 에서 같은 판정 사용)"""
+        VIEWPORT={"width":1280,"height":900}; NAV_TMO, IDLE_TMO = 35000, 9000
+        def _classify(ctx):
+            with self.timeline.activate(), span("classify_template_sample", url=url):
+                page=ctx.new_page()
+                try:
+                    page.goto(url, wait_until="domcontentloaded", timeout=NAV_TMO)
+                    try: page.wait_for_load_state("networkidle", timeout=IDLE_TMO)
+                    except Exception: pass
+                except Exception:
+                    pass
+                return _classify_template_on_page(page)
+        return self.pool.run(_classify, viewport=VIEWPORT, ignore_https_errors=True)
+
+# ========================= 매칭/표시 =========================
+def match_rows(a_models, b_models, a_types, b_types, want=2):
+    rows = []
+    def _lm_str(types):
+        t = types.get("LearnMore_Type", UNKNOWN)
+        s = types.get("LearnMore_Shape", UNKNOWN)
+        return f"{t}" + (f" ({s})" if s not in (None, "", UNKNOWN) else "")
+    pairs, _, _ = match_models(a_models, b_models, key_a=lambda r: r["Model"], fuzzy=MATCH_FUZZY, limit=want)
+    for a, b, tier in pairs:
+        rows.append({
+            "Model (AsIs)": a["Model"],
+            "Model (ToBe)": b["Model"],
+            "Learn More (AsIs)": _lm_str(a_types),
+            "Learn More (ToBe)": _lm_str(b_types),
+            "Buy Now (AsIs)": a_types.get("BuyNow_Shape", UNKNOWN),
+            "Buy Now (ToBe)": b_types.get("BuyNow_Shape", UNKNOWN),
+            "Compare (AsIs)": a_types.get("Compare_Pos", UNKNOWN),
+            "Compare (ToBe)": b_types.get("Compare_Pos", UNKNOWN),
+            "Match": "Fuzzy" if tier == "fuzzy" else "Matched"
+        })
+
+    if not rows and a_models and b_models:
+        rows.append({
+            "Model (AsIs)": a_models[0]["Model"],
+            "Model (ToBe)": b_models[0]["Model"],
+            "Learn More (AsIs)": _lm_str(a_types),
+            "Learn More (ToBe)": _lm_str(b_types),
+            "Buy Now (AsIs)": a_types.get("BuyNow_Shape", UNKNOWN),
+            "Buy Now (ToBe)": b_types.get("BuyNow_Shape", UNKNOWN),
+            "Compare (AsIs)": a_types.get("Compare_Pos", UNKNOWN),
+            "Compare (ToBe)": b_types.get("Compare_Pos", UNKNOWN),
+            "Match": "FirstInCategory"
+        })
+    return rows
+
+# ========================= CLI =========================
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="PLP 모델/CTA 수집 (URL 2개면 AS-IS ↔ TO-BE 비교행까지)")
+    ap.add_argument("urls", nargs="+", metavar="URL")
+    ap.add_argument("--viewport", choices=VIEWPORTS, default=VIEWPORTS[0])
+    ap.add_argument("--fast", action="store_true", help="이미지/폰트/애널리틱스 차단")
+    ap.add_argument("--debug", action="store_true")
+    ap.add_argument("--screens", action="store_true", help="페이지 스크린샷 저장")
+    ap.add_argument("--timeout", type=float, default=30, help="페이지 대기 시간(초)")
+    ap.add_argument("--retries", type=int, default=1)
+    ap.add_argument("--api-direct", action="store_true")
+    ap.add_argument("--refresh", action="store_true", help="결과 캐시 무시")
+    ap.add_argument("--har", choices=har_replay.MODES, default="off")
+    ap.add_argument("--keep-raw-json", action="store_true")
+    ap.add_argument("--capture-mb", type=int, default=64)
+    ap.add_argument("--max-models", type=int, default=80)
+    ap.add_argument("--want", type=int, default=2, help="비교행 수 (URL 2개일 때)")
+    ap.add_argument("--timeline", metavar="PATH", help="단계별 span 타임라인 JSON 저장 경로")
+    a = ap.parse_args(argv)
+    if len(a.urls) > 2: ap.error("URL 은 1개 또는 2개")
+    if sys.platform.startswith("win"):
+        import asyncio; asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+    opts = FetchOptions(viewport=a.viewport, fast_mode=a.fast, debug=a.debug, keep_raw_json=a.keep_raw_json,
+                        capture_mb=a.capture_mb, take_screens=a.screens, timeout_sec=a.timeout, retries=a.retries,
+                        api_direct=a.api_direct, force_refresh=a.refresh, har_mode=a.har)
+    log = lambda msg, level="debug": print(msg if isinstance(msg, str) else json.dumps(msg, ensure_ascii=False, default=str),
+                                           file=sys.stderr)
+    with PlpEngine(opts, log=log) as eng:
+        if len(a.urls) == 1:
+            models, types = eng.fetch_models(a.urls[0], max_models=a.max_models)
+            out = {"url": a.urls[0], "models": models, "cta_types": types}
+        else:
+            (am, at), (bm, bt) = eng.fetch_models_pair(a.urls[0], a.urls[1], max_models=a.max_models)
+            out = {"as_is": {"url": a.urls[0], "models": am, "cta_types": at},
+                   "to_be": {"url": a.urls[1], "models": bm, "cta_types": bt},
+                   "rows": match_rows(am, bm, at, bt, want=a.want)}
+    print("\n[단계별 시간]\n" + eng.timeline.format_table(), file=sys.stderr)
+    if a.timeline: print(f"타임라인 저장: {eng.timeline.write_json(a.timeline)}", file=sys.stderr)
+    json.dump(out, sys.stdout, ensure_ascii=False, indent=2, default=str); print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
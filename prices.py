@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# 시장별 가격 문자열 파싱 (compare_plp 가격 차이 계산)
+# - 숫자 형식은 markets.NUMBER_FORMATS (소수점/천 단위), 구분자가 둘 다 있으면 뒤쪽이 소수점
+# - 구분자가 한 종류면: 한 번만 나오고 뒤 숫자가 3자리가 아니면 소수점, 3자리면 시장 형식으로 판단
+#   (de "1.299" → 1299, uk "1,299" → 1299, de "1,5" → 1.5)
+# - 통화: 기호/ISO 코드, 없으면 시장 기본 통화 / 범위 "999 - 1.299" 와 "from/ab/dès/desde" 는 하한가
+# - 같은 문자열 반복이 많아 (문자열, 시장) 단위로 메모이즈, 열 단위는 고유값만 파싱
+import re, math
+from functools import lru_cache
+from typing import NamedTuple
+import pandas as pd
+import markets
+
+class Price(NamedTuple):
+    amount: float       # 대표 가격 (범위/from 이면 하한)
+    high: float         # 범위 상한 (없으면 NaN)
+    currency: str
+    is_from: bool
+
+NAN_PRICE = Price(math.nan, math.nan, "", False)
+
+_SYMBOLS = [("S$","SGD"),("A$","AUD"),("C$","CAD"),("NZ$","NZD"),("HK$","HKD"),("US$","USD"),("R$","BRL"),
+            ("RM","MYR"),("£","GBP"),("€","EUR"),("¥","JPY"),("₩","KRW"),("₹","INR"),("zł","PLN"),
+            ("Kč","CZK"),("Ft","HUF"),("₺","TRY"),("₱","PHP"),("฿","THB"),("₫","VND"),("₽","RUB")]
+_SYMBOL_RE = re.compile("|".join(re.escape(s) for s,_ in sorted(_SYMBOLS, key=lambda t: -len(t[0]))))
+_SYMBOL_MAP = dict(_SYMBOLS)
+_ISO = {v for _,v in _SYMBOLS} | {"USD","CHF","SEK","NOK","DKK","AED","MXN","ARS","CLP","COP","IDR"}
+_ISO_RE = re.compile(r"\b(" + "|".join(sorted(_ISO)) + r")\b")
+_DOLLAR_MARKETS = {"us":"USD","ca":"CAD","au":"AUD","nz":"NZD","sg":"SGD","hk":"HKD","mx":"MXN","ar":"ARS",
+                   "cl":"CLP","co":"COP"}
+_FROM_RE = re.compile(r"\b(from|starting at|ab|dès|à partir de|a partir de|desde|a partire da|vanaf|od|från|fra)\b",
+                      re.I)
+# 공백 계열은 뒤에 정확히 3자리가 올 때만 천 단위로 인정 ("999 1299" 는 두 숫자)
+_NUM_RE = re.compile(r"\d+(?:(?:[.,'’]|[ \u00a0\u202f](?=\d{3}(?!\d)))\d+)*")
+_RANGE_SEP_RE = re.compile(r"^\s*(?:-|–|—|~|to|bis|à|a|al)\s*$", re.I)
+
+def _to_float(tok:str, dec:str)->float:
+    t = re.sub("[ \u00a0\u202f'’]", "", tok)
+    seps = [c for c in t if c in ".,"]
+    if not seps: return float(t)
+    if len(set(seps)) == 2:
+        d = seps[-1]
+    else:
+        s = seps[0]; tail = t.rsplit(s, 1)[1]
+        if len(seps) > 1: d = None
+        elif len(tail) != 3: d = s
+        else: d = s if s == dec else None
+    if d is None: return float(t.replace(seps[0], ""))
+    g = "," if d == "." else "."
+    return float(t.replace(g, "").replace(d, "."))
+
+def _currency(text:str, market:str)->str:
+    m = _SYMBOL_RE.search(text)
+    if m: return _SYMBOL_MAP[m.group(0)]
+    m = _ISO_RE.search(text)
+    if m: return m.group(1)
+    if "$" in text: return _DOLLAR_MARKETS.get(market, "USD")
+    if re.search(r"\bkr\.?", text): return {"se":"SEK","no":"NOK","dk":"DKK"}.get(market, "SEK")
+    return markets.number_format(market)[2]
+
+@lru_cache(maxsize=65536)
+def parse(text:str, market:str="uk")->Price:
+    """가격 문자열 하나 → Price. 숫자가 없으면 amount=NaN"""
+    if not text: return NAN_PRICE
+    dec = markets.number_format(market)[0]
+    nums = list(_NUM_RE.finditer(text))
+    if not nums: return NAN_PRICE
+    try:
+        lo = _to_float(nums[0].group(0), dec)
+    except ValueError:
+        return NAN_PRICE
+    hi = math.nan
+    if len(nums) > 1:
+        between = _ISO_RE.sub("", _SYMBOL_RE.sub("", text[nums[0].end():nums[1].start()])).replace("$", "")
+        if _RANGE_SEP_RE.match(between):
+            try: hi = _to_float(nums[1].group(0), dec)
+            except ValueError: pass
+    return Price(lo, hi, _currency(text, market), bool(_FROM_RE.search(text)))
+
+def parse_col(s:pd.Series, market:str="uk")->pd.DataFrame:
+    """가격 열 → amount/high/currency/is_from 열 (고유 문자열만 파싱)"""
+    s = s.fillna("").astype(str)
+    uniq = {v: parse(v, market) for v in s.unique()}
+    return pd.DataFrame([uniq[v] for v in s], columns=Price._fields, index=s.index)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Playwright Chromium 부트스트랩 (Cloud 안전모드) — app.py 가 import 시 1번 호출
+# - 프로세스당 1번: 모듈 상태(_ready)로 Streamlit rerun 마다 다시 확인하지 않음
+# - 프로세스 간: BROWSERS_DIR/.plp-chromium-<playwright 버전> 스탬프에 실행 파일 경로 기록 → 다음 기동은 stat 2번
+# - 스탬프가 없으면 설치된 playwright 가 기대하는 rev 디렉터리(driver/package/browsers.json)만 확인 (재귀 glob 없음)
+#   → 업그레이드 후 남아 있는 이전 rev 는 새 버전 스탬프로 기록하지 않음. browsers.json 을 못 읽으면 install 먼저
+# - playwright 패키지는 import 하지 않음 (버전은 배포 메타데이터에서)
+import os, re, sys, json, pathlib, subprocess, threading
+from importlib import metadata
+from typing import List, Optional
+
+BROWSERS_DIR = os.environ.get("PLAYWRIGHT_BROWSERS_PATH") or "/home/appuser/.cache/ms-playwright"
+os.environ["PLAYWRIGHT_BROWSERS_PATH"] = BROWSERS_DIR
+LAUNCH_KW = {"headless": True, "args": ["--no-sandbox", "--disable-dev-shm-usage"]}
+
+# chromium-<rev>/, chromium_headless_shell-<rev>/ 아래 실행 파일 (버전별 배치 차이)
+_EXECUTABLES = ("chrome-linux/headless_shell", "chrome-headless-shell-linux64/chrome-headless-shell",
+                "chrome-linux/chrome", "chrome-linux64/chrome")
+
+_ready = False
+_lock = threading.Lock()
+
+def _pw_version()->str:
+    try: return metadata.version("playwright")
+    except metadata.PackageNotFoundError: return "unknown"
+
+def _stamp()->pathlib.Path:
+    return pathlib.Path(BROWSERS_DIR) / f".plp-chromium-{_pw_version()}"
+
+def _expected_dirs()->Optional[List[str]]:
+    """이 playwright 가 쓰는 chromium rev 디렉터리 이름 (chromium_headless_shell-1248, chromium-1248). 모르면 None"""
+    try:
+        f = metadata.distribution("playwright").locate_file("playwright/driver/package/browsers.json")
+        data = json.loads(pathlib.Path(f).read_text(encoding="utf-8"))
+        names = [f"{b['name'].replace('-', '_')}-{b['revision']}" for b in data["browsers"] if b["name"].startswith("chromium")]
+    except Exception:
+        return None
+    return sorted(names, reverse=True) or None   # headless shell 우선
+
+def _rev(d:pathlib.Path)->int:
+    m = re.search(r"-(\d+)$", d.name)
+    return int(m.group(1)) if m else -1
+
+def find_chromium()->Optional[pathlib.Path]:
+    root = pathlib.Path(BROWSERS_DIR)
+    want = _expected_dirs()
+    if want is not None:
+        dirs = [root / n for n in want]
+    else:
+        try: dirs = sorted((d for d in root.iterdir() if d.name.startswith("chromium")), key=_rev, reverse=True)
+        except OSError: return None
+    for d in dirs:
+        for rel in _EXECUTABLES:
+            exe = d / rel
+            if exe.is_file(): return exe
+    return None
+
+def _stamped()->bool:
+    try: exe = _stamp().read_text(encoding="utf-8").strip()
+    except OSError: return False
+    return bool(exe) and os.path.isfile(exe)
+
+def _install():
+    try:
+        subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=True)
+    except Exception as e:
+        try:
+            subprocess.run([sys.executable, "-m", "playwright", "install"], check=True)
+        except Exception as e2:
+            raise RuntimeError(f"Playwright 브라우저 설치 실패: {e} / {e2}")
+
+def ensure_chromium(force:bool=False):
+    """Chromium 이 없으면 설치. force 또는 FORCE_PW_INSTALL=1 이면 스탬프 무시하고 (프로세스당 1번) 설치"""
+    global _ready
+    if _ready and not force: return
+    with _lock:
+        if _ready and not force: return
+        force = force or os.environ.get("FORCE_PW_INSTALL") == "1"
+        if force or not _stamped():
+            exe = None if (force or _expected_dirs() is None) else find_chromium()   # rev 를 모르면 install(멱등) 후 기록
+            if exe is None:
+                _install(); exe = find_chromium()
+            if exe is not None:
+                try: _stamp().write_text(str(exe), encoding="utf-8")
+                except OSError: pass   # 읽기 전용이면 다음 프로세스에서 다시 스캔
+        _ready = True
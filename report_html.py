@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# 비교 HTML 리포트 (compare_plp.run_compare)
+# - 행 단위로 파일에 바로 씀 (전체 HTML 도, total 을 주면 행 목록도 메모리에 모으지 않음)
+# - page_size 개씩 report_<ts>_pN.html 로 나누고 report_<ts>.html 은 요약 인덱스
+# - 썸네일은 loading="lazy" + 원본 링크, "실패 항목만(sim < 기준)" 필터는 클라이언트(CSS 클래스 토글)
+import html, pathlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_HEAD = """<html><head><meta charset='utf-8'><title>{title}</title><style>
+body{{font-family:Arial;margin:16px}}table{{border-collapse:collapse;width:100%}}
+td,th{{border:1px solid #ddd;padding:6px}}th{{background:#fafafa}}
+.fail{{background:#ffe8e8}}.ok{{background:#eaffea}}.center{{text-align:center}}
+.shots{{display:flex;gap:8px}}.shots img{{height:180px;border:1px solid #ddd;border-radius:8px}}
+.shots img.vfail{{border:3px solid #e53935}}.nav a{{margin-right:8px}}
+body.only-fail tr.ok, body.only-fail .card:not(.has-fail), body.only-fail tr.row:not(.has-fail){{display:none}}
+</style></head><body>
+<div class='nav'>{nav}</div><h2>{title}</h2>
+<label><input type='checkbox' onchange="document.body.classList.toggle('only-fail', this.checked)"/> 실패 항목만 보기 (유사도 &lt; {thr})</label>
+"""
+_TAIL = "</body></html>\n"
+
+def _e(v)->str:
+    return html.escape("" if v is None else str(v))
+
+def _fails(row:Dict[str,Any], fields:Sequence[Tuple[str,str]], thr:float)->List[str]:
+    out = [label for col,label in fields if (row.get(col+"_sim") if row.get(col+"_sim") is not None else 100) < thr]
+    if row.get("visual_sim") is not None and row["visual_sim"] < thr: out.append("썸네일")
+    return out
+
+def _img(src:str, cls:str)->str:
+    if not src: return "<div class='center'>-</div>"
+    s = _e(src)
+    return f"<a href='{s}' target='_blank'><img{cls} src='{s}' loading='lazy' decoding='async'/></a>"
+
+def _card(f, row:Dict[str,Any], shots:Tuple[str,str], fields, thr:float, anchor:str):
+    model = row["model_code"] or "(Unmatched)"
+    fails = _fails(row, fields, thr)
+    f.write(f"<div class='card{' has-fail' if fails else ''}' id='{anchor}'><h3>{_e(model)}</h3>\n")
+    vsim = row.get("visual_sim")
+    s_as, s_tb = shots
+    if s_as or s_tb:
+        vcls = " class='vfail'" if vsim is not None and vsim < thr else ""
+        f.write(f"<div class='shots'><div><div class='center'><b>ASIS</b></div>{_img(s_as, vcls)}</div>"
+                f"<div><div class='center'><b>TOBE</b></div>{_img(s_tb, vcls)}</div></div>\n")
+    f.write("<table><tr><th>항목</th><th>AS-IS</th><th>TO-BE</th><th>유사도(%)</th></tr>\n")
+    for col,label in fields:
+        sim = row.get(col+"_sim")
+        sim = 100 if sim is None else sim
+        f.write(f"<tr class='{'ok' if sim>=thr else 'fail'}'><td>{label}</td><td>{_e(row.get(col+'_asis'))}</td>"
+                f"<td>{_e(row.get(col+'_tobe'))}</td><td class='center'>{sim:.0f}</td></tr>\n")
+    if vsim is not None:
+        prev = [f"{k} {row[c]:.0f}%" for k,c in (("AS-IS","visual_sim_prev_asis"),("TO-BE","visual_sim_prev_tobe"))
+                if row.get(c) is not None]
+        note = f" (직전 실행 대비: {', '.join(prev)})" if prev else ""
+        f.write(f"<tr class='{'ok' if vsim>=thr else 'fail'}'><td>썸네일</td><td colspan='2'>perceptual hash{note}</td>"
+                f"<td class='center'>{vsim:.0f}</td></tr>\n")
+    if row.get("price_diff_abs") is not None:
+        pdiff = row.get("price_diff_pct")
+        pct = f"{pdiff:+.2f}%" if pdiff is not None else "-"
+        f.write(f"<tr><td><b>가격 차이</b></td><td colspan='3'>Abs: {row['price_diff_abs']:.0f} | Pct: {pct}</td></tr>\n")
+    f.write("</table><hr/></div>\n")
+
+def write_report(pair_rows:Iterable[Dict[str,Any]], shots:Dict[str,Tuple[str,str]], path:pathlib.Path,
+                 fields:Sequence[Tuple[str,str]], page_size:int=50, threshold:float=85,
+                 title:str="PLP 카드 비교 리포트", extra:Dict[str,Any]=None, total:Optional[int]=None)->pathlib.Path:
+    """path = 인덱스 파일. 상세는 같은 폴더의 <stem>_p1.html ... 로 기록하고 인덱스 경로 반환
+    total(행 수)을 주면 pair_rows 는 generator 로 흘려보내며 페이지 단위로 씀 (행 전체를 메모리에 두지 않음),
+    인덱스에는 모델별 요약 값만 보관"""
+    path = pathlib.Path(path); page_size = max(1, int(page_size))
+    if total is None:
+        pair_rows = list(pair_rows); total = len(pair_rows)
+    n_pages = max(1, -(-total // page_size))
+    pname = lambda n: f"{path.stem}_p{n}.html"
+    nav = lambda cur: " ".join([f"<a href='{path.name}'>요약</a>"] +
+                               [f"<b>{n}</b>" if n == cur else f"<a href='{pname(n)}'>{n}</a>" for n in range(1, n_pages+1)])
+    # (페이지, 앵커, 모델, 실패 항목, 최저 유사도, 썸네일 유사도, 가격 차이 %)
+    index: List[Tuple[int,str,str,List[str],float,Optional[float],Optional[float]]] = []
+    f, pno = None, 0
+    try:
+        for i, row in enumerate(pair_rows):
+            if i % page_size == 0:
+                if f: f.write(_TAIL); f.close()
+                pno = i // page_size + 1
+                f = open(path.parent / pname(pno), "w", encoding="utf-8")
+                f.write(_HEAD.format(title=f"{_e(title)} ({pno}/{n_pages})", nav=nav(pno), thr=threshold))
+            anchor = f"m{i}"
+            _card(f, row, shots.get(row["model_code"], ("","")), fields, threshold, anchor)
+            sims = [row.get(c+"_sim") for c,_ in fields if row.get(c+"_sim") is not None]
+            index.append((pno, anchor, row["model_code"], _fails(row, fields, threshold),
+                          min(sims) if sims else 100, row.get("visual_sim"), row.get("price_diff_pct")))
+        if f is None:   # 행이 없어도 1페이지
+            f = open(path.parent / pname(1), "w", encoding="utf-8")
+            f.write(_HEAD.format(title=f"{_e(title)} (1/{n_pages})", nav=nav(1), thr=threshold))
+        f.write(_TAIL)
+    finally:
+        if f: f.close()
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_HEAD.format(title=_e(title), nav=nav(0), thr=threshold))
+        n_fail = sum(1 for it in index if it[3])
+        f.write(f"<p>매칭 {len(index)}개 · 실패 항목 있는 모델 {n_fail}개 · 페이지 {n_pages}개</p>\n")
+        for k, v in (extra or {}).items():
+            f.write(f"<p><b>{_e(k)}</b>: {_e(v)}</p>\n")
+        f.write("<table><tr><th>모델</th><th>실패 항목</th><th>최저 유사도</th><th>썸네일</th><th>가격 차이(%)</th></tr>\n")
+        for pno, anchor, model, fl, low, vs, pct in index:
+            f.write(f"<tr class='row{' has-fail' if fl else ''}'>"
+                    f"<td><a href='{pname(pno)}#{anchor}'>{_e(model)}</a></td><td>{_e(', '.join(fl))}</td>"
+                    f"<td class='center'>{low:.0f}</td>"
+                    f"<td class='center'>{'-' if vs is None else f'{vs:.0f}'}</td>"
+                    f"<td class='center'>{'-' if pct is None else f'{pct:+.2f}'}</td></tr>\n")
+        f.write("</table>\n" + _TAIL)
+    return path
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# 크롤링 결과 캐시 (SQLite) — fetch_models 결과(models + cta_types), _crawl_page 카드 목록
+# - 키: URL/뷰포트/로케일/셀렉터/패턴/옵션을 정렬 JSON 으로 만든 sha256
+# - TTL 지난 항목은 미스, 항목 수가 max_entries 를 넘으면 마지막 접근이 오래된 것부터 삭제(LRU)
+import json, time, sqlite3, hashlib, pathlib, threading
+from contextlib import contextmanager
+from typing import Any, Optional
+
+CACHE_PATH = pathlib.Path("outputs") / "cache.sqlite"
+
+def make_key(kind:str, **parts)->str:
+    blob = json.dumps({"kind": kind, **parts}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    def __init__(self, path:pathlib.Path=CACHE_PATH, ttl_sec:int=6*3600, max_entries:int=500):
+        self.path, self.ttl_sec, self.max_entries = pathlib.Path(path), ttl_sec, max_entries
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as c:
+            c.execute("""CREATE TABLE IF NOT EXISTS results(
+                key TEXT PRIMARY KEY, kind TEXT, created REAL, accessed REAL, value TEXT)""")
+            c.execute("CREATE INDEX IF NOT EXISTS ix_results_accessed ON results(accessed)")
+
+    @contextmanager
+    def _conn(self):
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        try:
+            with conn: yield conn
+        finally:
+            conn.close()
+
+    def get(self, key:str, ttl_sec:Optional[int]=None)->Optional[Any]:
+        ttl = self.ttl_sec if ttl_sec is None else ttl_sec
+        now = time.time()
+        with self._lock, self._conn() as c:
+            row = c.execute("SELECT created, value FROM results WHERE key=?", (key,)).fetchone()
+            if not row: return None
+            if now - row[0] > ttl:
+                c.execute("DELETE FROM results WHERE key=?", (key,)); return None
+            c.execute("UPDATE results SET accessed=? WHERE key=?", (now, key))
+        return json.loads(row[1])
+
+    def put(self, key:str, kind:str, value:Any):
+        now = time.time()
+        with self._lock, self._conn() as c:
+            c.execute("INSERT OR REPLACE INTO results(key, kind, created, accessed, value) VALUES(?,?,?,?,?)",
+                      (key, kind, now, now, json.dumps(value, ensure_ascii=False, default=str)))
+            c.execute("""DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)""", (self.max_entries,))
+
+    def clear(self, kind:Optional[str]=None):
+        with self._lock, self._conn() as c:
+            if kind: c.execute("DELETE FROM results WHERE kind=?", (kind,))
+            else: c.execute("DELETE FROM results")
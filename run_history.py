@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# 실행 이력 저장소 (SQLite, append-only) — compare_plp.run_compare 가 실행마다 추가
+# - runs: 실행 인덱스 / cards: 카드 전체(+ market, model_norm, 파싱된 price/currency) / diffs: 비교 결과 행
+# - 열은 들어오는 DataFrame 기준으로 필요 시 ALTER TABLE 로 추가 (Card 필드가 늘어도 이전 실행과 공존)
+# - runs.scope: 비교 대상 키 (페이지 이름+URL) — 여러 설정이 같은 저장소를 써도 직전 실행 값은 같은 scope 에서만
+# - 조회 헬퍼: 모델 가격 추이, 기준 시점 이후 바뀐 필드, 직전 실행 값(썸네일 해시/지문), 실행별 CSV 내보내기
+import json, time, sqlite3, pathlib, threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import pandas as pd
+from model_index import norm_model, base_model
+
+HISTORY_PATH = pathlib.Path("outputs") / "history.sqlite"
+COMPARE_FIELDS = ["title","price_text","discount_text","members_text","installment_text","rating_text",
+                  "review_count_text","badges_text","shipping_text","cta_text","img_hash"]
+
+class RunHistory:
+    def __init__(self, path:pathlib.Path=HISTORY_PATH):
+        self.path = pathlib.Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as c:
+            c.execute("""CREATE TABLE IF NOT EXISTS runs(
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT, started REAL, meta TEXT, scope TEXT)""")
+            if "scope" not in {r[1] for r in c.execute("PRAGMA table_info(runs)")}:
+                c.execute("ALTER TABLE runs ADD COLUMN scope TEXT")   # 이전 형식 (scope 없는 실행은 직전 값 조회에서 제외)
+            c.execute("CREATE TABLE IF NOT EXISTS cards(run_id INTEGER, page TEXT, model_norm TEXT)")
+            c.execute("CREATE TABLE IF NOT EXISTS diffs(run_id INTEGER, model_code TEXT)")
+            c.execute("CREATE INDEX IF NOT EXISTS ix_cards_model ON cards(model_norm, run_id)")
+            c.execute("CREATE INDEX IF NOT EXISTS ix_cards_run ON cards(run_id, page)")
+            c.execute("CREATE INDEX IF NOT EXISTS ix_diffs_run ON diffs(run_id)")
+
+    @contextmanager
+    def _conn(self):
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        conn.create_function("base_model", 1, lambda n: base_model(n or ""), deterministic=True)
+        try:
+            with conn: yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _append(c, table:str, df:pd.DataFrame):
+        have = {r[1] for r in c.execute(f"PRAGMA table_info({table})")}
+        for col in df.columns:
+            if col not in have: c.execute(f'ALTER TABLE {table} ADD COLUMN "{col}"')
+        if df.empty: return
+        cols = ",".join(f'"{x}"' for x in df.columns)
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        c.executemany(f"INSERT INTO {table}({cols}) VALUES({','.join('?'*len(df.columns))})", rows)
+
+    def add_run(self, ts:str, cards:pd.DataFrame, diffs:pd.DataFrame, meta:Dict[str,Any]=None, scope:str="")->int:
+        """실행 1건 추가 → run_id. cards 에 model_norm 이 없으면 채움. scope: last_values 조회 키"""
+        cards = cards.copy()
+        if "model_norm" not in cards: cards["model_norm"] = [norm_model(m) for m in cards.get("model_code", [])]
+        with self._lock, self._conn() as c:
+            cur = c.execute("INSERT INTO runs(ts, started, meta, scope) VALUES(?,?,?,?)",
+                            (ts, time.time(), json.dumps(meta or {}, ensure_ascii=False, default=str), scope))
+            run_id = cur.lastrowid
+            self._append(c, "cards", cards.assign(run_id=run_id))
+            self._append(c, "diffs", diffs.assign(run_id=run_id))
+        return run_id
+
+    def _query(self, sql:str, params:Iterable[Any]=())->pd.DataFrame:
+        with self._conn() as c:
+            return pd.read_sql_query(sql, c, params=list(params))
+
+    def runs(self, last_n:int=30)->pd.DataFrame:
+        return self._query("SELECT run_id, ts, started, meta FROM runs ORDER BY run_id DESC LIMIT ?", (last_n,))
+
+    def price_history(self, model_code:str, market:str=None, page:str=None, last_n:int=30)->pd.DataFrame:
+        """모델 가격 추이 — 최근 last_n 실행, 실행/페이지별 첫 카드
+        지역 접미사를 뺀 기본 코드로 비교 (OLED65C4 → OLED65C4AEK / OLED65C4PSA 모두)"""
+        b = base_model(norm_model(model_code)) or norm_model(model_code)
+        sql = ["""SELECT r.run_id, r.ts, c.page, c.market, c.model_code, c.price, c.currency, c.price_text, MIN(c.idx) AS idx
+                  FROM cards c JOIN runs r USING(run_id)
+                  WHERE c.model_norm LIKE ? || '%' AND base_model(c.model_norm) = ?
+                    AND c.run_id IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)"""]
+        params: List[Any] = [b, b, last_n]
+        if market: sql.append("AND c.market = ?"); params.append(market)
+        if page: sql.append("AND c.page = ?"); params.append(page)
+        sql.append("GROUP BY r.run_id, c.page ORDER BY r.run_id")
+        return self._query(" ".join(sql), params)
+
+    def _run_at(self, when:Union[None,str,float])->Optional[int]:
+        """when(epoch 또는 'YYYY-MM-DD[ HH:MM]', 기본 24시간 전) 이전의 마지막 run_id"""
+        if when is None: t = time.time() - 86400
+        elif isinstance(when, (int, float)): t = float(when)
+        else:
+            ts = pd.Timestamp(when)
+            t = ts.timestamp() if ts.tzinfo else time.mktime(ts.timetuple())   # 시간대 없으면 로컬 시각
+        df = self._query("SELECT MAX(run_id) AS r FROM runs WHERE started <= ?", (t,))
+        r = df["r"].iloc[0]
+        return None if pd.isna(r) else int(r)
+
+    def _cards(self, run_id:int, page:str=None)->pd.DataFrame:
+        sql, params = "SELECT * FROM cards WHERE run_id = ?", [run_id]
+        if page: sql += " AND page = ?"; params.append(page)
+        df = self._query(sql, params)
+        df = df[df["model_norm"].fillna("") != ""] if "model_norm" in df else df
+        return df.sort_values("idx").drop_duplicates(["page","model_norm"], keep="first") if len(df) else df
+
+    def changed_fields(self, since:Union[None,str,float]=None, page:str=None,
+                       fields:Iterable[str]=COMPARE_FIELDS)->pd.DataFrame:
+        """since 시점의 마지막 실행 대비 최신 실행에서 값이 바뀐 (page, model, field, before, after)"""
+        out_cols = ["page","model_code","field","before","after","run_before","run_after"]
+        last = self._query("SELECT MAX(run_id) AS r FROM runs")["r"].iloc[0]
+        base = self._run_at(since)
+        if pd.isna(last) or base is None or base == int(last): return pd.DataFrame(columns=out_cols)
+        a, b = self._cards(base, page), self._cards(int(last), page)
+        m = a.merge(b, on=["page","model_norm"], suffixes=("_a","_b"))
+        rows = []
+        for f in fields:
+            if f+"_a" not in m or f+"_b" not in m: continue
+            va, vb = m[f+"_a"].fillna("").astype(str), m[f+"_b"].fillna("").astype(str)
+            d = va != vb
+            rows.append(pd.DataFrame({"page": m.loc[d,"page"], "model_code": m.loc[d,"model_code_b"], "field": f,
+                                      "before": va[d], "after": vb[d]}))
+        out = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=out_cols[:5])
+        return out.assign(run_before=base, run_after=int(last))[out_cols]
+
+    def last_values(self, column:str="img_hash", scope:str="")->Dict[Tuple[str,str],str]:
+        """같은 scope 의 가장 최근 실행의 (page, model_code) → column 값 (같은 모델이 여러 번이면 첫 카드)"""
+        try:
+            df = self._query(f"""SELECT page, model_code, "{column}" AS v FROM cards
+                                 WHERE run_id = (SELECT MAX(run_id) FROM runs WHERE scope = ?) ORDER BY idx DESC""", (scope,))
+        except Exception:   # 열이 아직 없음 (이전 형식)
+            return {}
+        return {(r.page, r.model_code): r.v for r in df.dropna().itertuples(index=False)}
+
+    def export_csv(self, run_id:int, kind:str, path:pathlib.Path)->pathlib.Path:
+        """kind: cards | diffs — 실행 1건을 기존 raw_/diff_ CSV 형식으로"""
+        assert kind in ("cards", "diffs")
+        df = self._query(f"SELECT * FROM {kind} WHERE run_id = ?", (run_id,))
+        df.drop(columns=[c for c in ("run_id","model_norm") if c in df]).to_csv(path, index=False, encoding="utf-8-sig")
+        return pathlib.Path(path)
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="PLP 실행 이력 조회")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("price"); p.add_argument("model"); p.add_argument("--market"); p.add_argument("--page")
+    p.add_argument("--last", type=int, default=30)
+    p = sub.add_parser("changed"); p.add_argument("--since", help="YYYY-MM-DD[ HH:MM] (기본: 24시간 전)"); p.add_argument("--page")
+    p = sub.add_parser("runs"); p.add_argument("--last", type=int, default=30)
+    a = ap.parse_args()
+    h = RunHistory()
+    with pd.option_context("display.max_rows", 200, "display.width", 200):
+        if a.cmd == "price": print(h.price_history(a.model, a.market, a.page, a.last))
+        elif a.cmd == "changed": print(h.changed_fields(a.since, a.page))
+        else: print(h.runs(a.last))
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# 단계별 시간 측정 (span 타임라인) — plp_engine / compare_plp 공용
+# - Timeline 을 스레드에 activate() 해 두면 그 스레드의 span(name) 이 타임라인에 기록 (활성 타임라인 없으면 no-op)
+# - span 마다 소요 시간 + 그 사이 Playwright 프로토콜 호출 수 (Channel.send 계열을 1번만 감싸 스레드별 집계)
+#   → sync API 는 호출한 스레드에서 send 가 일어나므로 스레드 카운터 차이 = 그 span 의 호출 수
+# - 추가 수치(payloads, bytes, clicks ...)는 `with span(...) as sp: sp["bytes"] = n` 으로 기록
+# - to_dict()/write_json(): 실행 타임라인, summary(): 이름별 횟수/합계/최대/호출 수 + 숫자 속성 합계
+import json, time, pathlib, threading, functools
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+_tls = threading.local()
+_patch_lock = threading.Lock()
+_patched: Optional[bool] = None    # None: 아직 시도 안 함
+
+def _calls()->int:
+    return getattr(_tls, "calls", 0)
+
+def count_playwright_calls()->bool:
+    """playwright._impl._connection.Channel 의 send 계열에 호출 카운터 설치 (프로세스당 1번).
+    내부 API 가 없거나 바뀌었으면 False — 시간 측정은 그대로, pw_calls 만 0"""
+    global _patched
+    with _patch_lock:
+        if _patched is not None: return _patched
+        try:
+            from playwright._impl._connection import Channel
+        except Exception:
+            _patched = False; return False
+        def wrap(orig):
+            @functools.wraps(orig)
+            def counted(self, *a, **k):
+                if getattr(_tls, "in_send", False): return orig(self, *a, **k)   # send_may_fail → send 중복 집계 방지
+                _tls.calls = getattr(_tls, "calls", 0) + 1; _tls.in_send = True
+                try: return orig(self, *a, **k)
+                finally: _tls.in_send = False
+            counted._plp_counted = True
+            return counted
+        hooked = False
+        for name in ("send", "send_return_as_dict", "send_no_reply", "send_may_fail"):
+            if not hasattr(Channel, name): continue   # 버전에 따라 없는 메서드
+            orig = getattr(Channel, name)
+            if not callable(orig) or getattr(orig, "_plp_counted", False): continue
+            setattr(Channel, name, wrap(orig)); hooked = True
+        _patched = hooked
+        return hooked
+
+class Timeline:
+    def __init__(self, label:str=""):
+        self.label = label
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._spans: List[Dict[str,Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """현재 스레드의 span 을 이 타임라인에 기록 (풀 워커/작업 스레드마다 호출)"""
+        count_playwright_calls()
+        prev = getattr(_tls, "tl", None); _tls.tl = self
+        try: yield self
+        finally: _tls.tl = prev
+
+    def _add(self, rec:Dict[str,Any]):
+        with self._lock: self._spans.append(rec)
+
+    def spans(self)->List[Dict[str,Any]]:
+        with self._lock: return sorted(self._spans, key=lambda r: r["start_ms"])
+
+    def to_dict(self)->Dict[str,Any]:
+        return {"label": self.label, "started": self.started, "pw_counter": bool(_patched),
+                "spans": self.spans(), "summary": self.summary()}
+
+    def write_json(self, path)->pathlib.Path:
+        path = pathlib.Path(path); path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+        return path
+
+    def summary(self)->List[Dict[str,Any]]:
+        """span 이름별 합계 (총 소요 시간 내림차순)"""
+        agg: Dict[str,Dict[str,Any]] = {}
+        for r in self.spans():
+            a = agg.setdefault(r["name"], {"name": r["name"], "n": 0, "total_ms": 0.0, "max_ms": 0.0, "pw_calls": 0})
+            a["n"] += 1; a["total_ms"] += r["ms"]; a["max_ms"] = max(a["max_ms"], r["ms"]); a["pw_calls"] += r["pw_calls"]
+            for k, v in r.items():
+                if k not in _BASE and isinstance(v, (int, float)) and not isinstance(v, bool):
+                    a[k] = a.get(k, 0) + v
+        rows = sorted(agg.values(), key=lambda a: -a["total_ms"])
+        for a in rows: a["total_ms"], a["max_ms"] = round(a["total_ms"], 1), round(a["max_ms"], 1)
+        return rows
+
+    def format_table(self)->str:
+        """CLI 용 고정폭 요약표"""
+        rows = self.summary()
+        extra = sorted({k for r in rows for k in r} - {"name","n","total_ms","max_ms","pw_calls"})
+        cols = ["name","n","total_ms","max_ms","pw_calls"] + extra
+        cells = [cols] + [[str(r.get(c, "")) for c in cols] for r in rows]
+        w = [max(len(row[i]) for row in cells) for i in range(len(cols))]
+        return "\n".join("  ".join(v.ljust(w[i]) if i == 0 else v.rjust(w[i]) for i, v in enumerate(row)) for row in cells)
+
+@contextmanager
+def activated(tl:Optional[Timeline]):
+    """tl.activate() — tl 이 None 이면 아무것도 하지 않음"""
+    if tl is None:
+        yield None; return
+    with tl.activate(): yield tl
+
+_BASE = {"name","start_ms","ms","pw_calls","depth","thread","error"}
+
+@contextmanager
+def span(name:str, **attrs):
+    """활성 타임라인에 구간 기록. yield 한 dict 에 넣은 값도 함께 저장"""
+    tl: Optional[Timeline] = getattr(_tls, "tl", None)
+    if tl is None:
+        yield attrs; return
+    depth = getattr(_tls, "depth", 0); _tls.depth = depth + 1
+    c0, t0 = _calls(), time.perf_counter()
+    err = ""
+    try:
+        yield attrs
+    except BaseException as e:
+        err = type(e).__name__; raise
+    finally:
+        _tls.depth = depth
+        t1 = time.perf_counter()
+        tl._add({"name": name, "start_ms": round((t0 - tl._t0)*1000, 1), "ms": round((t1 - t0)*1000, 1),
+                 "pw_calls": _calls() - c0, "depth": depth, "thread": threading.current_thread().name,
+                 **({"error": err} if err else {}), **attrs})
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+# 저장소 루트의 평평한 모듈(compare_plp, prices, ...)을 그대로 import
+import sys, pathlib
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
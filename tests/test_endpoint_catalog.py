@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+import json
+import endpoint_catalog
+
+def test_learn_does_not_persist_api_key(tmp_path, monkeypatch):
+    path = tmp_path / "endpoint_catalog.json"
+    monkeypatch.setattr(endpoint_catalog, "CATALOG_PATH", path)
+    path.write_text(json.dumps({"uk": {"https://x/uk/old/": {"endpoints": [
+        {"url": "https://x/api/old", "headers": {"X-Api-Key": "OLDKEY", "accept": "*/*"}}]}}}))
+    endpoint_catalog.learn("https://x/uk/tvs/", "uk", [{
+        "url": "https://x/api/products?page=1", "method": "get", "paths": ["data.products"],
+        "headers": {"x-api-key": "SECRET", "Accept": "application/json", "cookie": "sid=1"}}], {})
+    text = path.read_text()
+    assert "SECRET" not in text and "OLDKEY" not in text      # 이전 실행이 남긴 키도 지움
+    ep = endpoint_catalog.lookup("https://x/uk/tvs/", "uk")["endpoints"][0]
+    assert ep["headers"] == {"Accept": "application/json"}
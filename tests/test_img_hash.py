@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import math
+import numpy as np
+from PIL import Image
+import img_hash
+
+def _gradient(w=64, h=48, flip=False):
+    a = np.tile(np.linspace(0, 255, w, dtype=np.uint8), (h, 1))
+    return Image.fromarray(a[:, ::-1] if flip else a)
+
+def test_hash_format_and_stability():
+    h = img_hash.hash_image(_gradient())
+    assert len(h) == 32 and int(h, 16) >= 0
+    assert img_hash.hash_image(_gradient().resize((128, 96))) == h   # 크기만 다르면 같은 해시
+    assert img_hash.hash_image(_gradient().convert("RGB")) == h
+
+def test_hash_differs_for_mirrored_image():
+    a, b = img_hash.hash_image(_gradient()), img_hash.hash_image(_gradient(flip=True))
+    assert img_hash.similarity([a], [b])[0] < 50
+
+def test_similarity_bits():
+    z, f = "0" * 32, "f" * 32
+    one = "0" * 31 + "1"                       # 1비트 차이
+    low = "0" * 16 + "f" * 16                  # dHash 64비트만 다름
+    sim = img_hash.similarity([z, z, z, z], [z, f, one, low])
+    assert sim.tolist() == [100.0, 0.0, 100.0 * 127 / 128, 50.0]
+
+def test_similarity_missing_is_nan():
+    sim = img_hash.similarity(["0" * 32, "", None, "abc"], [None, "0" * 32, "0" * 32, "0" * 32])
+    assert all(math.isnan(x) for x in sim)
+    assert img_hash.similarity([], []).shape == (0,)
+
+def test_popcount_without_bitwise_count(monkeypatch):
+    x = np.array([[0, 1], [2**64 - 1, 0xF0F0]], dtype=np.uint64)
+    expect = [[0, 1], [64, 8]]
+    assert img_hash._popcount(x).tolist() == expect
+    monkeypatch.delattr(np, "bitwise_count", raising=False)   # numpy < 2.0 경로
+    assert img_hash._popcount(x).tolist() == expect
+
+def test_hash_file_memo(tmp_path):
+    p = tmp_path / "abc123.png"
+    _gradient().save(p)
+    h = img_hash.hash_file(p)
+    assert h == img_hash.hash_image(_gradient())
+    p.unlink()
+    assert img_hash.hash_file(p) == h                 # 같은 파일명은 재계산하지 않음
+    assert img_hash.hash_file(tmp_path / "missing.png") == ""
+
+def test_memo_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(img_hash, "MEMO_MAX", 3)
+    monkeypatch.setattr(img_hash, "_memo", img_hash.OrderedDict())
+    for n in "abc": img_hash.remember(n, n * 32)
+    assert img_hash._recall("a") == "a" * 32          # 최근 사용으로 갱신
+    img_hash.remember("d", "d" * 32)
+    assert list(img_hash._memo) == ["c", "a", "d"]    # 가장 오래 안 쓴 b 부터 버림
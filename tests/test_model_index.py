@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from model_index import ModelIndex, base_model, match, norm_model, same_model
+
+def test_norm_and_base():
+    assert norm_model("oled65-c4.aek") == "OLED65C4AEK"
+    assert norm_model("OLED TV 65C4") == "OLED65C4"
+    assert base_model("OLED65C46LA") == "OLED65C46"
+    assert base_model("OLED65C4") == "OLED65C4"
+    assert same_model("OLED65C4AEK", "oled65c4psa")
+    assert not same_model("OLED65C4AEK", "OLED55C4AEK")
+
+def test_exact_before_suffix():
+    idx = ModelIndex(["OLED65C4PSA", "OLED65C4AEK"])
+    assert idx.find("OLED65C4AEK") == (1, "exact")
+    assert idx.find("OLED65C4AEK") == (0, "suffix")   # 정확 키는 이미 소비됨
+    assert idx.find("OLED65C4AEK") is None
+
+def test_suffix_match():
+    pairs, only_a, only_b = match(["OLED65C4AEK", "QNED86AEK"], ["OLED65C4PSA", "NANO81PSA"])
+    assert pairs == [("OLED65C4AEK", "OLED65C4PSA", "suffix")]
+    assert only_a == ["QNED86AEK"] and only_b == ["NANO81PSA"]
+
+def test_fuzzy_only_when_enabled():
+    a, b = ["OLED65C4AEK"], ["OLED65C44LA"]
+    assert match(a, b)[0] == []
+    pairs, _, _ = match(a, b, fuzzy=80)
+    assert pairs == [("OLED65C4AEK", "OLED65C44LA", "fuzzy")]
+    assert match(a, b, fuzzy=99)[0] == []
+
+def test_one_to_one_and_keys():
+    a = [{"m": "OLED65C4AEK"}, {"m": "OLED65C4AEK"}]
+    b = [{"code": "OLED65C4AEK"}]
+    pairs, only_a, only_b = match(a, b, key_a=lambda r: r["m"], key_b=lambda r: r["code"])
+    assert [(x["m"], y["code"], t) for x, y, t in pairs] == [("OLED65C4AEK", "OLED65C4AEK", "exact")]
+    assert only_a == [{"m": "OLED65C4AEK"}] and only_b == []
+
+def test_limit_cutoff():
+    codes = [f"OLED{n}C4AEK" for n in (42, 48, 55, 65, 77)]
+    pairs, only_a, only_b = match(codes, list(reversed(codes)), limit=3)
+    assert [a for a, _, _ in pairs] == codes[:3]
+    assert only_a == []                                  # limit 이후 a 는 보지 않음
+    assert sorted(only_b) == sorted(codes[3:])
+    assert len(match(codes, codes, limit=0)[0]) == 0
+
+def test_empty_codes_never_match():
+    assert match(["", None], ["", "OLED65C4AEK"])[0] == []
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import math
+import pandas as pd
+import pytest
+import prices
+from compare_plp import _diff_frame
+
+@pytest.mark.parametrize("text, market, amount, currency", [
+    ("1.299", "de", 1299.0, "EUR"),
+    ("1,5", "de", 1.5, "EUR"),
+    ("£1,299", "uk", 1299.0, "GBP"),
+    ("1 299,00 €", "fr", 1299.0, "EUR"),
+    ("1 299,00 €", "fr", 1299.0, "EUR"),
+    ("CHF 1'299.00", "ch", 1299.0, "CHF"),
+    ("1’299.–", "ch", 1299.0, "CHF"),
+    ("S$1,299", "sg", 1299.0, "SGD"),
+    ("$1,299.99", "us", 1299.99, "USD"),
+])
+def test_parse_locale(text, market, amount, currency):
+    p = prices.parse(text, market)
+    assert p.amount == amount and p.currency == currency
+    assert math.isnan(p.high) and not p.is_from
+
+@pytest.mark.parametrize("text, market, lo, hi", [
+    ("£999 - £1,299", "uk", 999.0, 1299.0),
+    ("999 – 1.299 €", "de", 999.0, 1299.0),
+    ("999 bis 1.299 €", "de", 999.0, 1299.0),
+])
+def test_parse_range(text, market, lo, hi):
+    p = prices.parse(text, market)
+    assert (p.amount, p.high) == (lo, hi)
+
+@pytest.mark.parametrize("text, market, amount", [
+    ("From £1,099.99", "uk", 1099.99),
+    ("ab 1.299 €", "de", 1299.0),
+    ("à partir de 1 299 €", "fr", 1299.0),
+])
+def test_parse_from(text, market, amount):
+    p = prices.parse(text, market)
+    assert p.is_from and p.amount == amount
+
+def test_parse_no_number():
+    assert math.isnan(prices.parse("Sold out", "uk").amount)
+    assert math.isnan(prices.parse("", "uk").amount)
+
+def test_parse_col_keeps_index():
+    s = pd.Series(["£1,299", None, "£1,299"], index=[5, 6, 7])
+    df = prices.parse_col(s, "uk")
+    assert list(df.index) == [5, 6, 7]
+    assert df["amount"].tolist()[0] == 1299.0 and math.isnan(df["amount"].tolist()[1])
+
+def test_diff_frame_price_currency():
+    a = pd.DataFrame({"model_code": ["M1", "M2"], "price_text": ["£1,000", "£1,000"], "img_hash": ["", ""]})
+    b = pd.DataFrame({"model_code": ["M1", "M2"], "price_text": ["£1,100", "€1,100"], "img_hash": ["", ""]})
+    d = _diff_frame(a, b, "uk", "uk")
+    assert d["price_diff_abs"].tolist()[0] == 100.0
+    assert d["price_diff_pct"].tolist()[0] == pytest.approx(10.0)
+    # 통화가 다르면 (GBP vs EUR) 차이는 비움 (NaN)
+    assert math.isnan(d["price_diff_abs"].tolist()[1]) and math.isnan(d["price_diff_pct"].tolist()[1])
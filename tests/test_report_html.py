@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import re
+import report_html
+
+FIELDS = [("title", "상품명"), ("price_text", "가격")]
+
+def _row(i, **kw):
+    r = {"model_code": f"M{i:03d}", "title_sim": 100.0, "title_asis": "LG OLED", "title_tobe": "LG OLED",
+         "price_text_sim": 100.0, "price_text_asis": "£999", "price_text_tobe": "£999",
+         "visual_sim": None, "price_diff_abs": 0.0, "price_diff_pct": 0.0}
+    r.update(kw); return r
+
+def test_values_are_escaped(tmp_path):
+    evil = "<script>alert('x')</script>"
+    rows = [_row(0, model_code="M<1>&", title_asis=evil, title_tobe='"quoted"', title_sim=10.0)]
+    idx = report_html.write_report(rows, {"M<1>&": ("ASIS/a'b.webp", "")}, tmp_path / "report.html", FIELDS,
+                                   extra={"<k>": "<v>"}, title="T & <b>")
+    page = (tmp_path / "report_p1.html").read_text(encoding="utf-8")
+    index = idx.read_text(encoding="utf-8")
+    for text in (page, index):
+        assert "<script>" not in text and "<1>" not in text
+        assert "M&lt;1&gt;&amp;" in text
+        assert "T &amp; &lt;b&gt;" in text
+    assert "&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt;" in page
+    assert "&quot;quoted&quot;" in page
+    assert "src='ASIS/a&#x27;b.webp'" in page
+    assert "<b>&lt;k&gt;</b>: &lt;v&gt;" in index
+
+def test_pages_split_at_page_size(tmp_path):
+    rows = [_row(i) for i in range(7)]
+    idx = report_html.write_report(rows, {}, tmp_path / "r.html", FIELDS, page_size=3)
+    pages = sorted(p.name for p in tmp_path.glob("r_p*.html"))
+    assert pages == ["r_p1.html", "r_p2.html", "r_p3.html"]
+    cards = [re.findall(r"<h3>(M\d+)</h3>", (tmp_path / p).read_text(encoding="utf-8")) for p in pages]
+    assert cards == [["M000", "M001", "M002"], ["M003", "M004", "M005"], ["M006"]]
+    index = idx.read_text(encoding="utf-8")
+    assert "페이지 3개" in index
+    assert "href='r_p3.html#m6'" in index and "href='r_p1.html#m0'" in index
+
+def test_empty_report_still_has_one_page(tmp_path):
+    report_html.write_report([], {}, tmp_path / "r.html", FIELDS, page_size=50)
+    assert [p.name for p in tmp_path.glob("r_p*.html")] == ["r_p1.html"]
+    assert "매칭 0개" in (tmp_path / "r.html").read_text(encoding="utf-8")
+
+def test_streams_rows_with_total(tmp_path):
+    seen = []
+    def rows():
+        for i in range(5):
+            seen.append(i)
+            # 2페이지 첫 행(i=2)을 쓰기 시작할 때 1페이지 파일은 이미 닫혀 있음
+            if i == 3: assert (tmp_path / "r_p1.html").read_text(encoding="utf-8").endswith("</html>\n")
+            yield _row(i, title_sim=50.0 if i == 4 else 100.0)
+    idx = report_html.write_report(rows(), {}, tmp_path / "r.html", FIELDS, page_size=2, total=5)
+    assert seen == [0, 1, 2, 3, 4]
+    assert sorted(p.name for p in tmp_path.glob("r_p*.html")) == ["r_p1.html", "r_p2.html", "r_p3.html"]
+    index = idx.read_text(encoding="utf-8")
+    assert "매칭 5개 · 실패 항목 있는 모델 1개 · 페이지 3개" in index
+    assert "<a href='r_p3.html'>3</a>" in (tmp_path / "r_p1.html").read_text(encoding="utf-8")
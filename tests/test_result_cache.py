@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import types
+import pytest
+import result_cache
+from result_cache import ResultCache, make_key
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(result_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def test_make_key_order_independent():
+    assert make_key("k", a=1, b={"x": 1, "y": 2}) == make_key("k", b={"y": 2, "x": 1}, a=1)
+    assert make_key("k", a=1) != make_key("other", a=1)
+
+def test_ttl_expiry(tmp_path, clock):
+    c = ResultCache(tmp_path / "c.sqlite", ttl_sec=60)
+    c.put("k", "fetch_models", {"models": ["OLED65C4"]})
+    clock[0] += 59
+    assert c.get("k") == {"models": ["OLED65C4"]}
+    clock[0] += 2                               # 생성 후 61초 (읽어도 TTL 은 생성 시각 기준)
+    assert c.get("k") is None
+    c.put("k", "fetch_models", [1]); clock[0] += 61
+    assert c.get("k", ttl_sec=3600) == [1]      # 호출별 TTL 덮어쓰기
+    assert c.get("k") is None                   # 만료 항목은 삭제됨
+    assert c.get("k", ttl_sec=3600) is None
+
+def _keys(c):
+    """접근 시각을 건드리지 않고 남은 키 조회"""
+    with c._conn() as conn:
+        return sorted(r[0] for r in conn.execute("SELECT key FROM results"))
+
+def test_lru_eviction(tmp_path, clock):
+    c = ResultCache(tmp_path / "c.sqlite", max_entries=3)
+    for k in "abc":
+        c.put(k, "crawl_page", k); clock[0] += 1
+    assert c.get("a") == "a"                    # a 접근 → 가장 오래 안 쓴 것은 b
+    clock[0] += 1
+    c.put("d", "crawl_page", "d")
+    assert _keys(c) == ["a", "c", "d"]
+    clock[0] += 1
+    c.put("e", "crawl_page", "e")               # 이제 가장 오래 안 쓴 것은 c
+    assert _keys(c) == ["a", "d", "e"]
+    clock[0] += 1
+    c.put("a", "crawl_page", "a2")              # 같은 키 덮어쓰기는 항목 수를 늘리지 않음
+    assert _keys(c) == ["a", "d", "e"] and c.get("a") == "a2"
+
+def test_clear_by_kind(tmp_path, clock):
+    c = ResultCache(tmp_path / "c.sqlite")
+    c.put("a", "fetch_models", 1); c.put("b", "crawl_page", 2)
+    c.clear("crawl_page")
+    assert c.get("a") == 1 and c.get("b") is None
+
+def test_crawl_key_covers_crawl_options():
+    from compare_plp import _crawl_key
+    page = {"name": "ASIS", "url": "https://x.example/uk/tvs/", "selectors": {"card": ".c"}}
+    defaults = {"shots": True, "scroll": {"step_px": 1400}, "screenshots": {"format": "webp"}}
+    base = _crawl_key(page, defaults, [])
+    assert _crawl_key(dict(page), dict(defaults), []) == base
+    for p, d in [({**page, "accept_cookie_selector": "#ok"}, defaults),
+                 ({**page, "scroll": {"max_steps": 5}}, defaults),
+                 (page, {**defaults, "scroll": {"step_px": 800}}),
+                 (page, {**defaults, "screenshots": {"format": "jpeg"}}),
+                 (page, {**defaults, "shots": False}),
+                 (page, {**defaults, "wait_until": "load"}),
+                 ({**page, "network": {"block_types": ["media"]}}, defaults)]:
+        assert _crawl_key(p, d, []) != base
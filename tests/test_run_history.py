@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import compare_plp
+from compare_plp import Card
+from run_history import RunHistory
+
+def _cards(pages, price, ph=""):
+    return [Card(page=name, url=url, idx=0, model_code="OLED65C4", title="LG OLED C4", price_text=price, img_hash=ph)
+            for name, url in pages]
+
+def test_last_values_scoped(tmp_path):
+    h = RunHistory(tmp_path / "h.sqlite")
+    card = lambda fp: pd.DataFrame([{"page": "ASIS", "model_code": "M1", "idx": 0, "fingerprint": fp}])
+    h.add_run("1", card("a1"), pd.DataFrame(), scope="A")
+    h.add_run("2", card("b1"), pd.DataFrame(), scope="B")
+    assert h.last_values("fingerprint", "A") == {("ASIS", "M1"): "a1"}
+    assert h.last_values("fingerprint", "B") == {("ASIS", "M1"): "b1"}
+    assert h.last_values("fingerprint", "C") == {}
+
+def _run_abab(tmp_path, monkeypatch, incremental):
+    """설정 A → B → A 순서로 run_compare (크롤링은 고정 카드)"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(compare_plp, "OUT", tmp_path)
+    pages = {"a.yml": [("ASIS", "https://a.example/uk/tvs/"), ("TOBE", "https://a.example/uk/tvs-new/")],
+             "b.yml": [("ASIS", "https://b.example/uk/tvs/"), ("TOBE", "https://b.example/uk/tvs-new/")]}
+    price = {"a.yml": "£1,299", "b.yml": "£999"}
+    ph = {"a.yml": "0"*32, "b.yml": "f"*32}
+    def read_config(path):
+        return {"defaults": {"cache": {"enabled": False}, "history": {"enabled": True}},
+                "pages": [{"name": n, "url": u, "selectors": {}} for n, u in pages[path]]}
+    def crawl(pool, cfg_page, *a, **k):
+        return [c for c in _cards(pages[cur], price[cur], ph[cur]) if c.page == cfg_page["name"]]
+    monkeypatch.setattr(compare_plp, "_read_config", read_config)
+    monkeypatch.setattr(compare_plp, "_crawl_page", crawl)
+    out = []
+    for cur in ["a.yml", "b.yml", "a.yml"]:
+        out.append(compare_plp.run_compare(cur, pool=object(), incremental=incremental))
+    return out
+
+def test_incremental_compares_with_same_config(tmp_path, monkeypatch):
+    """두 번째 A 는 B 가 아니라 첫 번째 A 와 비교"""
+    out = _run_abab(tmp_path, monkeypatch, True)
+    assert out[0]["changes"] == {"new": 1, "changed": 0, "unchanged": 0}
+    assert out[1]["changes"] == {"new": 1, "changed": 0, "unchanged": 0}
+    assert out[2]["changes"] == {"new": 0, "changed": 0, "unchanged": 1}
+
+def test_visual_sim_prev_same_config(tmp_path, monkeypatch):
+    """썸네일도 같은 설정의 직전 실행과 비교 (B 의 해시와는 비트가 모두 다름)"""
+    out = _run_abab(tmp_path, monkeypatch, False)
+    diff = pd.read_csv(out[2]["csv_path"])
+    assert diff["visual_sim_prev_asis"].tolist() == [100.0]
+    assert diff["visual_sim_prev_tobe"].tolist() == [100.0]
+
+def test_price_history_base_code(tmp_path):
+    h = RunHistory(tmp_path / "h.sqlite")
+    cards = pd.DataFrame([{"page": "ASIS", "model_code": m, "idx": i, "market": "uk", "price": p,
+                           "currency": "GBP", "price_text": f"£{p}"}
+                          for i, (m, p) in enumerate([("OLED65C4AEK", 1299.0), ("OLED65C46LA", 1599.0),
+                                                      ("OLED55C4AEK", 999.0)])])
+    h.add_run("1", cards, pd.DataFrame())
+    h.add_run("2", cards.assign(price=cards["price"] - 100), pd.DataFrame())
+    df = h.price_history("OLED65C4")
+    assert df["model_code"].tolist() == ["OLED65C4AEK", "OLED65C4AEK"]
+    assert df["price"].tolist() == [1299.0, 1199.0]
+    assert h.price_history("oled65c4-aek")["price"].tolist() == [1299.0, 1199.0]
+    assert h.price_history("OLED65C46LA")["model_code"].tolist() == ["OLED65C46LA"] * 2
+    assert h.price_history("OLED77C4").empty